@@ -1,15 +1,20 @@
+import json
 import logging
 import math
 import os
+import posixpath
 import random
+import shutil
 from copy import deepcopy
 from typing import Dict, Tuple, List, Callable, Optional, Any, Generator
 from twisted.internet.defer import Deferred, inlineCallbacks
 
 import numpy
 
-from apps.blender.resources.scenefileeditor import generate_blender_crop_file
+from apps.blender.resources.scenefileeditor import \
+    generate_blender_crop_file, generate_blender_crops_file
 from golem.core.common import timeout_to_deadline
+from golem.docker.job import DockerJob
 from golem.task.localcomputer import ComputerAdapter
 
 logger = logging.getLogger("apps.blender.blender_reference_generator")
@@ -189,9 +194,18 @@ CropRenderedFailureCallbackType = Callable[[Exception], None]
 
 class BlenderReferenceGenerator:
     DEFAULT_CROPS_NUMBER = 3
+    # Files rendered in batch mode are prefixed with the crop id
+    BATCH_CROP_PREFIX = "crop{}_"
+    BATCH_TIMINGS_FILE = "crop_timings.json"
 
-    def __init__(self, computer: Optional[ComputerAdapter] = None) -> None:
+    def __init__(self, computer: Optional[ComputerAdapter] = None,
+                 batch: bool = False) -> None:
+        """
+        :param batch: Render all the crops of a subtask in a single Docker job
+        and Blender run, loading the scene once, instead of one job per crop
+        """
         self.computer = computer or ComputerAdapter()
+        self.batch = batch
         self.crops_desc: List[Crop] = []
         self.rendered_crops_results: Dict[int, List[Any]] = {}
         self.crop_jobs: Dict[str, Deferred] = dict()
@@ -322,34 +336,40 @@ class BlenderReferenceGenerator:
               verification_context: VerificationContext,
               crop_count: int) -> Generator:
 
-        for i in range(0, crop_count):
-            if self.stopped:
-                break
-
-            crop = verification_context.get_crop_with_id(str(i))
-            if not crop:
-                raise Exception("Crop %s not found " % i)
-
-            left, top, right, bottom = crop.calculate_borders().to_tuple()
-
-            script_src = generate_blender_crop_file(
-                resolution=(verification_context.subtask_info['res_x'],
-                            verification_context.subtask_info['res_y']),
-                borders_x=(left, right),
-                borders_y=(bottom, top),
-                use_compositing=False,
-                samples=verification_context.subtask_info['samples']
-            )
-            task_definition = BlenderReferenceGenerator\
-                .generate_computational_task_definition(
-                    verification_context.subtask_info,
-                    script_src)
-
-            yield self.schedule_crop_job(verification_context, task_definition,
-                                         i)
+        if self.batch:
+            yield self.schedule_crops_batch_job(verification_context,
+                                                crop_count)
+        else:
+            for i in range(0, crop_count):
+                if self.stopped:
+                    break
+
+                crop = verification_context.get_crop_with_id(str(i))
+                if not crop:
+                    raise Exception("Crop %s not found " % i)
+
+                left, top, right, bottom = crop.calculate_borders().to_tuple()
+
+                script_src = generate_blender_crop_file(
+                    resolution=(verification_context.subtask_info['res_x'],
+                                verification_context.subtask_info['res_y']),
+                    borders_x=(left, right),
+                    borders_y=(bottom, top),
+                    use_compositing=False,
+                    samples=verification_context.subtask_info['samples']
+                )
+                task_definition = BlenderReferenceGenerator\
+                    .generate_computational_task_definition(
+                        verification_context.subtask_info,
+                        script_src)
+
+                yield self.schedule_crop_job(verification_context,
+                                             task_definition, i)
 
         if not self.stopped:
             for i in range(0, crop_count):
+                logger.info("Crop %r rendered in %.2fs",
+                            i, self.rendered_crops_results[i][1])
                 verification_context.finished[i].callback((
                     self.rendered_crops_results[i][0],
                     self.rendered_crops_results[i][1],
@@ -389,6 +409,102 @@ class BlenderReferenceGenerator:
 
         return defer
 
+    def schedule_crops_batch_job(self, verification_context, crop_count):
+        subtask_info = verification_context.subtask_info
+        extra_data = subtask_info['ctd']['extra_data']
+        crops = []
+        output_paths = {}
+
+        for i in range(0, crop_count):
+            crop = verification_context.get_crop_with_id(str(i))
+            if not crop:
+                raise Exception("Crop %s not found " % i)
+
+            left, top, right, bottom = crop.calculate_borders().to_tuple()
+            crops.append((crop.crop_id, (left, right), (bottom, top)))
+            output_paths[crop.crop_id] = posixpath.join(
+                DockerJob.OUTPUT_DIR,
+                "{}ref_{}_{}".format(
+                    self.BATCH_CROP_PREFIX.format(crop.crop_id),
+                    subtask_info['outfilebasename'],
+                    extra_data['start_task']))
+
+        script_src = generate_blender_crops_file(
+            resolution=(subtask_info['res_x'], subtask_info['res_y']),
+            crops=crops,
+            use_compositing=False,
+            samples=subtask_info['samples'],
+            frames=extra_data['frames'],
+            output_format=extra_data['output_format'],
+            output_paths=output_paths,
+            timings_path=posixpath.join(DockerJob.OUTPUT_DIR,
+                                        self.BATCH_TIMINGS_FILE)
+        )
+        task_definition = BlenderReferenceGenerator\
+            .generate_computational_task_definition(subtask_info, script_src)
+
+        defer = Deferred()
+
+        def success(results: Dict[str, List[str]], time_spent: float):
+            self._split_batch_results(results, time_spent,
+                                      verification_context, crop_count)
+            defer.callback(True)
+
+        def failure(exc):
+            self.stopped = True
+            logger.error(exc)
+            for finished in verification_context.finished:
+                finished.errback(False)
+
+        verification_context.computer.start_computation(
+            root_path=os.path.dirname(verification_context.get_crop_path('0')),
+            success_callback=success,
+            error_callback=failure,
+            compute_task_def=task_definition,
+            resources=verification_context.resources,
+            additional_resources=[]
+        )
+
+        return defer
+
+    def _split_batch_results(self, results: Dict[str, List[str]],
+                             time_spent: float,
+                             verification_context: VerificationContext,
+                             crop_count: int) -> None:
+        """ Move files rendered in batch mode to the directories of their
+        crops, under the names they would have if the crops were rendered
+        one by one, and store the results of every crop """
+        timings: Dict[str, float] = {}
+        crop_files: Dict[str, List[str]] = \
+            {str(i): [] for i in range(crop_count)}
+        common_files = []
+
+        for path in results['data']:
+            name = os.path.basename(path)
+            if name == self.BATCH_TIMINGS_FILE:
+                with open(path) as f:
+                    timings = json.load(f)
+                continue
+
+            for crop_id, files in crop_files.items():
+                prefix = self.BATCH_CROP_PREFIX.format(crop_id)
+                if name.startswith(prefix):
+                    crop_dir = verification_context.get_crop_path(crop_id)
+                    os.makedirs(crop_dir, exist_ok=True)
+                    files.append(shutil.move(
+                        path, os.path.join(crop_dir, name[len(prefix):])))
+                    break
+            else:
+                common_files.append(path)
+
+        for i in range(crop_count):
+            crop_id = str(i)
+            self.rendered_crops_results[i] = [
+                {'data': crop_files[crop_id] + common_files},
+                timings.get(crop_id, time_spent / crop_count),
+                verification_context
+            ]
+
     @staticmethod
     def generate_computational_task_definition(subtask_info: Dict[str, Any],
                                                script_src: str) \
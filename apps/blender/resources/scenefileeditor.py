@@ -10,6 +10,14 @@ if BLENDER_CROP_TEMPLATE_PATH is None:
                   'Template file not found: %s' % os.path.join(
                       common.get_golem_path(), 'apps', 'blender'))
 
+BLENDER_CROP_BATCH_TEMPLATE_PATH = dirmanager.find_task_script(
+    os.path.join(common.get_golem_path(), 'apps', 'blender'),
+    "blendercropbatch.py.template")
+if BLENDER_CROP_BATCH_TEMPLATE_PATH is None:
+    raise IOError(None,
+                  'Template file not found: %s' % os.path.join(
+                      common.get_golem_path(), 'apps', 'blender'))
+
 
 def generate_blender_crop_file(resolution, borders_x, borders_y,
                                use_compositing, samples):
@@ -28,3 +36,38 @@ def generate_blender_crop_file(resolution, borders_x, borders_y,
     }
 
     return contents
+
+
+# pylint: disable=too-many-arguments
+def generate_blender_crops_file(resolution, crops, use_compositing, samples,
+                                frames, output_format, output_paths,
+                                timings_path):
+    """
+    Generate a script rendering all the given crops in a single Blender run.
+    :param crops: list of (crop_id, borders_x, borders_y) tuples
+    :param output_paths: output path in the container by crop id, as given
+                         to the -o option of Blender
+    :param timings_path: path in the container of the JSON file to which
+                         rendering times of the crops are written
+    """
+    _, borders_x, borders_y = crops[0]
+    contents = generate_blender_crop_file(resolution, borders_x, borders_y,
+                                          use_compositing, samples)
+
+    with open(BLENDER_CROP_BATCH_TEMPLATE_PATH) as f:
+        batch_contents = f.read()
+
+    batch_contents %= {
+        'crops': [
+            (crop_id,
+             (float(borders_x[0]), float(borders_x[1])),
+             (float(borders_y[0]), float(borders_y[1])))
+            for crop_id, borders_x, borders_y in crops
+        ],
+        'frames': list(frames),
+        'output_format': output_format,
+        'output_paths': output_paths,
+        'timings_path': timings_path,
+    }
+
+    return contents + '\n' + batch_contents
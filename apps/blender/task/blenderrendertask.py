@@ -40,6 +40,10 @@ ImageFile.LOAD_TRUNCATED_IMAGES = True
 
 logger = logging.getLogger(__name__)
 
+# Minimal time between writes of the preview files (in seconds). Previews are
+# also written whenever they are requested through the RPC.
+PREVIEW_UPDATE_INTERVAL = 5
+
 
 class BlenderDefaults(RendererDefaults):
     def __init__(self):
@@ -59,6 +63,11 @@ class BlenderNVGPUDefaults(BlenderDefaults):
 
 
 class PreviewUpdater(object):
+    """ Pastes chunks of a task (or of a single frame) into a preview.
+
+    The preview is kept in memory as a NumPy array, so that every chunk is
+    decoded and pasted once; the preview file is only written by flush().
+    """
     def __init__(self, preview_file_path, preview_res_x, preview_res_y,
                  expected_offsets):
         # pairs of (subtask_number, its_image_filepath)
@@ -75,6 +84,50 @@ class PreviewUpdater(object):
         self.perfect_match_area_y = 0
         self.perfectly_placed_subtasks = 0
 
+        # [y, x, RGB] array, loaded from the preview file when needed
+        self._canvas = None
+        self._dirty = False
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if not self._dirty:
+            state['_canvas'] = None
+        return state
+
+    def __setstate__(self, state):
+        # Defaults for attributes that could be missing in pickles from
+        # before the preview was kept in memory
+        migration_defaults = (
+            ('_canvas', None),
+            ('_dirty', False),
+        )
+        for key, default_value in migration_defaults:
+            if key not in state:
+                state[key] = default_value
+        self.__dict__.update(state)
+
+    def _new_canvas(self):
+        return numpy.zeros((self.preview_res_y, self.preview_res_x, 3),
+                           dtype=numpy.uint8)
+
+    def _get_canvas(self):
+        if self._canvas is None:
+            self._canvas = self._new_canvas()
+            if os.path.exists(self.preview_file_path):
+                with Image.open(self.preview_file_path) as img, \
+                        img.convert("RGB") as img_rgb:
+                    if img_rgb.size == (self.preview_res_x,
+                                        self.preview_res_y):
+                        self._canvas[:] = numpy.asarray(img_rgb)
+        return self._canvas
+
+    def _paste(self, img, offset):
+        canvas = self._get_canvas()
+        with img.convert("RGB") as img_rgb:
+            rows = canvas[offset:offset + img_rgb.size[1]]
+            rows[:] = numpy.asarray(img_rgb)[:len(rows)]
+        self._dirty = True
+
     def get_offset(self, subtask_number):
         if 0 < subtask_number < len(self.expected_offsets):
             return self.expected_offsets[subtask_number]
@@ -106,16 +159,9 @@ class PreviewUpdater(object):
             with subtask_img.resize((self.preview_res_x, height),
                                     resample=Image.BILINEAR) \
                     as subtask_img_resized:
-                def open_or_create_image():
-                    if not os.path.exists(self.preview_file_path) \
-                            or len(self.chunks) == 1:
-                        return Image.new("RGB", (self.preview_res_x,
-                                                 self.preview_res_y))
-                    return Image.open(self.preview_file_path)
-
-                with open_or_create_image() as preview_img:
-                    preview_img.paste(subtask_img_resized, (0, offset))
-                    preview_img.save(self.preview_file_path, PREVIEW_EXT)
+                if len(self.chunks) == 1:
+                    self.clear()
+                self._paste(subtask_img_resized, offset)
 
         if not handler_result.success:
             return
@@ -125,22 +171,50 @@ class PreviewUpdater(object):
             self.update_preview(self.chunks[subtask_number + 1],
                                 subtask_number + 1)
 
+    def clear(self, part=None):
+        """ Clear the whole preview or area of a given part """
+        if part is None:
+            self._canvas = self._new_canvas()
+        else:
+            canvas = self._get_canvas()
+            canvas[self.get_offset(part):self.get_offset(part + 1)] = 0
+        self._dirty = True
+
+    def flush(self):
+        """ Write the preview file if there are changes
+        :return bool: whether the file has been written
+        """
+        if not self._dirty:
+            return False
+        with handle_image_error(logger), \
+                Image.fromarray(self._canvas, "RGB") as img:
+            img.save(self.preview_file_path, PREVIEW_EXT)
+        self._dirty = False
+        return True
+
+    def release(self):
+        """ Drop the in-memory preview together with unsaved changes """
+        self._canvas = None
+        self._dirty = False
+
     def restart(self):
         self.chunks = {}
         self.perfect_match_area_y = 0
         self.perfectly_placed_subtasks = 0
         if os.path.exists(self.preview_file_path):
-            with handle_image_error(logger), \
-                 Image.new("RGB", (self.preview_res_x, self.preview_res_y)) \
-                    as img:
-                img.save(self.preview_file_path, PREVIEW_EXT)
+            self.clear()
+            self.flush()
+        self.release()
 
 
 class RenderingTaskTypeInfo(CoreTaskTypeInfo):
 
     @classmethod
-    def get_preview(cls, task, single=False):
+    def get_preview(cls, task, single=False, force=True):
         result = None
+        if task:
+            task.flush_previews(force=force)
+
         if not task:
             pass
         elif task.use_frames:
@@ -367,9 +441,10 @@ class BlenderNVGPURendererOptions(BlenderRendererOptions):
 
 class BlenderRenderTask(FrameRenderingTask):
     ENVIRONMENT_CLASS: Type[BlenderEnvironment] = BlenderEnvironment
-    VERIFIER_CLASS = functools.partial(BlenderVerifier,
-                                       cropper_cls=BlenderReferenceGenerator,
-                                       docker_task_cls=DockerTaskThread)
+    VERIFIER_CLASS = functools.partial(
+        BlenderVerifier,
+        cropper_cls=functools.partial(BlenderReferenceGenerator, batch=True),
+        docker_task_cls=DockerTaskThread)
 
     BLENDER_MIN_BOX = [8, 8]
     BLENDER_MIN_SAMPLE = 5
@@ -380,6 +455,9 @@ class BlenderRenderTask(FrameRenderingTask):
     def __init__(self, task_definition, **kwargs):
         self.preview_updater = None
         self.preview_updaters = None
+        # previews with marked subtasks are generated in flush_previews()
+        self._task_preview_outdated = False
+        self._previews_flushed = 0.0
 
         super().__init__(task_definition=task_definition, **kwargs)
 
@@ -396,6 +474,18 @@ class BlenderRenderTask(FrameRenderingTask):
                            "for this type of task, turning compositing off",
                            task_definition.task_id)
 
+    def __setstate__(self, state):
+        # Defaults for attributes that could be missing in pickles from
+        # before previews were flushed periodically
+        migration_defaults = (
+            ('_task_preview_outdated', False),
+            ('_previews_flushed', 0.0),
+        )
+        for key, default_value in migration_defaults:
+            if key not in state:
+                state[key] = default_value
+        super().__setstate__(state)
+
     def initialize(self, dir_manager):
         super(BlenderRenderTask, self).initialize(dir_manager)
 
@@ -602,10 +692,55 @@ class BlenderRenderTask(FrameRenderingTask):
     def _update_preview(self, new_chunk_file_path, num_start):
         self.preview_updater.update_preview(new_chunk_file_path, num_start)
 
+    def _update_task_preview(self):
+        self._task_preview_outdated = True
+        self.flush_previews(force=False)
+
+    def _update_frame_task_preview(self):
+        self._task_preview_outdated = True
+        self.flush_previews(force=False)
+
+    def _remove_from_preview(self, subtask_id):
+        if self.use_frames:
+            super()._remove_from_preview(subtask_id)
+            return
+        subtask = self.subtasks_given[subtask_id]
+        self.preview_updater.clear(subtask['start_task'])
+        self._task_preview_outdated = True
+
+    def flush_previews(self, force=True):
+        """ Write pending changes of previews to disk and generate previews
+        with marked subtasks. Unless forced, does nothing if that was done
+        less than PREVIEW_UPDATE_INTERVAL seconds ago.
+        """
+        now = time.time()
+        if not force and \
+                now - self._previews_flushed < PREVIEW_UPDATE_INTERVAL:
+            return
+        self._previews_flushed = now
+
+        if self.use_frames:
+            updaters = self.preview_updaters or []
+        else:
+            updaters = [self.preview_updater] if self.preview_updater else []
+        for updater in updaters:
+            if updater.flush():
+                self._task_preview_outdated = True
+
+        if not self._task_preview_outdated:
+            return
+        self._task_preview_outdated = False
+        if self.use_frames:
+            super()._update_frame_task_preview()
+        else:
+            super()._update_task_preview()
+
     def _update_frame_preview(self, new_chunk_file_path, frame_num, part=1,
                               final=False):
         num = self.frames.index(frame_num)
         if final:
+            # The preview of the whole frame replaces pasted chunks
+            self.preview_updaters[num].release()
             with handle_image_error(logger), \
                  handle_none(load_as_pil(new_chunk_file_path),
                              raise_if_none=IOError("load_as_pil failed")) \
@@ -646,19 +781,19 @@ class BlenderRenderTask(FrameRenderingTask):
         lower = preview_updater.get_offset(part)
         upper = preview_updater.get_offset(part + 1)
         res_x = preview_updater.preview_res_x
-        for i in range(0, res_x):
-            for j in range(lower, upper):
-                img_task.putpixel((i, j), color)
+        if upper > lower:
+            img_task.paste(color, (0, lower, res_x, upper))
 
     def _mark_task_area(self, subtask, img_task, color, frame_index=0):
         if not self.use_frames:
             self.mark_part_on_preview(subtask['start_task'], img_task, color,
                                       self.preview_updater)
         elif self.total_tasks <= len(self.frames):
-            for i in range(0, int(math.floor(self.res_x * self.scale_factor))):
-                for j in range(0,
-                               int(math.floor(self.res_y * self.scale_factor))):
-                    img_task.putpixel((i, j), color)
+            img_task.paste(color, (0, 0,
+                                   int(math.floor(self.res_x *
+                                                  self.scale_factor)),
+                                   int(math.floor(self.res_y *
+                                                  self.scale_factor))))
         else:
             parts = int(self.total_tasks / len(self.frames))
             pu = self.preview_updaters[frame_index]
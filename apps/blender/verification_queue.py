@@ -1,18 +1,35 @@
+import heapq
+import itertools
 import logging
-import queue
+import math
+import multiprocessing
+import time
 from functools import partial
 from types import FunctionType
-from typing import Optional, Type, Dict, Tuple
+from typing import Any, Optional, Type, Dict, List, Tuple
 
+import psutil
 from twisted.internet.defer import Deferred, gatherResults
 
 from apps.blender.verification_task import VerificationTask
+from golem.diag.service import DiagnosticsProvider
 from golem_verificator.verifier import Verifier
 
 logger = logging.getLogger("apps.blender.verification")
 
+# Queued verification: (deadline, submission number, time of submission,
+# task, verifier class)
+QueueEntry = Tuple[int, int, float, VerificationTask, Type[Verifier]]
+
 
 class VerificationQueue:
+    """ Runs verifications of subtask results, up to `concurrency` at once.
+
+    The next verification is the one with the earliest deadline among tasks
+    which run fewer verifications than their fair share of `concurrency`,
+    so that many results of one task can't hold back the other tasks.
+    Verifications with equal deadlines run in the order of submission.
+    """
 
     #  We assume that after 30 minutes verification tasks is stalled (possibly
     #  to bugs in third party docker api). After this period we finish
@@ -20,19 +37,51 @@ class VerificationQueue:
     #  configurable from config, and will be relative to nodes benchmark
     #  results.
     VERIFICATION_TIMEOUT = 1800
-
-    def __init__(self, concurrency: int = 1) -> None:
+    # Resources needed by a single verification, which renders crops of the
+    # subtask result and compares them with the result
+    CORES_PER_VERIFICATION = 2
+    MEMORY_PER_VERIFICATION = 2 * 1024 ** 3  # B
+    MAX_CONCURRENCY = 4
+
+    def __init__(self, concurrency: Optional[int] = None) -> None:
+        """
+        :param concurrency: Maximum number of verifications running at once,
+        by default sized from the number of cores and available memory
+        """
+        if concurrency is None:
+            concurrency = self.default_concurrency()
         self._concurrency = concurrency
-        self._queue: queue.Queue = queue.Queue()
+        # Heaps of queued verifications by task id
+        self._queues: Dict[str, List[QueueEntry]] = dict()
+        self._counter = itertools.count()
         self._jobs: Dict[str, Deferred] = dict()
+        # Task ids of running verifications, by subtask id
+        self._running: Dict[str, str] = dict()
         self.callbacks: Dict[VerificationTask, FunctionType] = dict()
         self._paused = False
+        self._stats = dict(
+            started=0,
+            verified=0,
+            timed_out=0,
+            total_queue_wait=0.,
+            max_queue_wait=0.,
+            total_verification_time=0.,
+            max_verification_time=0.,
+        )
+
+    @classmethod
+    def default_concurrency(cls) -> int:
+        by_cores = multiprocessing.cpu_count() // cls.CORES_PER_VERIFICATION
+        by_memory = psutil.virtual_memory().available \
+            // cls.MEMORY_PER_VERIFICATION
+        return max(1, min(by_cores, by_memory, cls.MAX_CONCURRENCY))
 
     def submit(self,
                verifier_class: Type[Verifier],
                subtask_id: str,
                deadline: int,
                cb: FunctionType,
+               task_id: Optional[str] = None,
                **kwargs) -> None:
 
         logger.debug(
@@ -43,7 +92,10 @@ class VerificationQueue:
 
         entry = VerificationTask(subtask_id, deadline, kwargs)
         self.callbacks[entry] = cb
-        self._queue.put((entry, verifier_class))
+        heapq.heappush(
+            self._queues.setdefault(task_id or subtask_id, []),
+            (deadline, next(self._counter), time.time(), entry,
+             verifier_class))
         self._process_queue()
 
     def pause(self) -> Deferred:
@@ -59,31 +111,73 @@ class VerificationQueue:
     def can_run(self) -> bool:
         return not self._paused and len(self._jobs) < self._concurrency
 
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Returns numbers of queued and running verifications, and their mean
+        and maximum queue wait and verification times in seconds.
+        """
+        stats = dict(self._stats)
+        stats['queued'] = sum(len(queue) for queue in self._queues.values())
+        stats['running'] = len(self._jobs)
+        stats['concurrency'] = self._concurrency
+        stats['mean_queue_wait'] = \
+            stats.pop('total_queue_wait') / max(1, stats['started'])
+        stats['mean_verification_time'] = \
+            stats.pop('total_verification_time') / max(1, stats['verified'])
+        return stats
+
     def _process_queue(self) -> None:
-        if self.can_run:
-            entry, verifier_cls = self._next()
-            if entry and verifier_cls:
-                self._run(entry, verifier_cls)
-
-    def _next(self) -> Tuple[Optional[VerificationTask], Optional[Verifier]]:
-        try:
-            return self._queue.get(block=False)
-        except queue.Empty:
+        while self.can_run:
+            task_id, queued = self._next()
+            if not queued:
+                return
+            _, _, submitted, entry, verifier_cls = queued
+            self._run(entry, verifier_cls, task_id, submitted)
+
+    def _next(self) -> Tuple[Optional[str], Optional[QueueEntry]]:
+        if not self._queues:
             return None, None
 
+        running: Dict[str, int] = dict()
+        for task_id in self._running.values():
+            running[task_id] = running.get(task_id, 0) + 1
+        fair_share = math.ceil(
+            self._concurrency / len(self._queues.keys() | running.keys()))
+
+        by_deadline = sorted(self._queues, key=lambda t: self._queues[t][0])
+        task_id = next(
+            (t for t in by_deadline if running.get(t, 0) < fair_share),
+            by_deadline[0])
+
+        queue = self._queues[task_id]
+        queued = heapq.heappop(queue)
+        if not queue:
+            del self._queues[task_id]
+        return task_id, queued
+
+    # pylint: disable=too-many-arguments
     def _run(self, entry: VerificationTask,
-             verifier_cls: Type[Verifier]) -> None:
+             verifier_cls: Type[Verifier],
+             task_id: Optional[str] = None,
+             submitted: Optional[float] = None) -> None:
         subtask_id = entry.subtask_id
+        started = time.time()
+        self._stats['started'] += 1
+        if submitted is not None:
+            self._update_stats('queue_wait', started - submitted)
 
         logger.info("Running verification of subtask %r", subtask_id)
 
         def callback(*args):
             logger.info("Finished verification of subtask %r", subtask_id)
+            self._stats['verified'] += 1
+            self._update_stats('verification_time', time.time() - started)
             try:
                 self.callbacks[entry](subtask_id=args[0][0], verdict=args[0][1],
                                       result=args[0][2])
             finally:
                 self._jobs.pop(subtask_id, None)
+                self._running.pop(subtask_id, None)
                 self._process_queue()
 
         def errback(_):
@@ -103,13 +197,30 @@ class VerificationQueue:
             result.addTimeout(VerificationQueue.VERIFICATION_TIMEOUT, reactor,
                               onTimeoutCancel=fn_timeout)
             self._jobs[subtask_id] = result
+            self._running[subtask_id] = task_id or subtask_id
 
     def _verification_timed_out(self, _result, _timeout, task, event,
                                 subtask_id):
         logger.warning("Timeout detected for subtask %s", subtask_id)
+        self._stats['timed_out'] += 1
         task.stop(event)
 
+    def _update_stats(self, name: str, value: float) -> None:
+        self._stats['total_' + name] += value
+        self._stats['max_' + name] = max(self._stats['max_' + name], value)
+
     def _reset(self) -> None:
-        self._queue = queue.Queue()
+        self._queues = dict()
         self._jobs = dict()
+        self._running = dict()
         self.callbacks = dict()
+
+
+class VerificationDiagnosticsProvider(DiagnosticsProvider):
+
+    def __init__(self, verification_queue: VerificationQueue) -> None:
+        self.verification_queue = verification_queue
+
+    def get_diagnostics(self, output_format):
+        return self._format_diagnostics(self.verification_queue.get_stats(),
+                                        output_format)
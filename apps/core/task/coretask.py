@@ -64,7 +64,7 @@ class CoreTaskTypeInfo(TaskTypeInfo):
 
     @classmethod
     # pylint:disable=unused-argument
-    def get_preview(cls, task, single=False):
+    def get_preview(cls, task, single=False, force=True):
         pass
 
     # pylint:disable=no-else-return
@@ -217,6 +217,7 @@ class CoreTask(Task):
             subtask_id,
             self._deadline,
             verification_finished_,
+            task_id=self.header.task_id,
             subtask_info={**self.subtasks_given[subtask_id],
                           **{'owner': self.header.task_owner.key}},
             results=result_files,
@@ -312,6 +313,37 @@ class CoreTask(Task):
     def update_task_state(self, task_state):
         pass
 
+    def get_subtask_delta(self, subtask_id):
+        subtask = self.subtasks_given.get(subtask_id)
+        node_id = subtask.get('node_id') if subtask else None
+        return {
+            'subtask': subtask,
+            'client': self.counting_nodes.get(node_id),
+            'last_task': self.last_task,
+            'num_tasks_received': self.num_tasks_received,
+            'num_failed_subtasks': self.num_failed_subtasks,
+            'stdout': self.stdout.get(subtask_id),
+            'stderr': self.stderr.get(subtask_id),
+            'results': self.results.get(subtask_id),
+        }
+
+    def apply_subtask_delta(self, subtask_id, delta):
+        subtask = delta.get('subtask')
+        if subtask is None:
+            return
+
+        self.subtasks_given[subtask_id] = subtask
+        if delta['client'] is not None:
+            self.counting_nodes[subtask['node_id']] = delta['client']
+
+        self.last_task = delta['last_task']
+        self.num_tasks_received = delta['num_tasks_received']
+        self.num_failed_subtasks = delta['num_failed_subtasks']
+
+        for name in ('stdout', 'stderr', 'results'):
+            if delta[name] is not None:
+                getattr(self, name)[subtask_id] = delta[name]
+
     @handle_key_error
     def get_trust_mod(self, subtask_id):
         return 1.0
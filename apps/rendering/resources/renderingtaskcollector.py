@@ -1,13 +1,21 @@
 import logging
 import math
-from typing import Optional
+import os
+import tempfile
+from typing import Optional, Tuple
 
+import numpy
+import OpenEXR
 from PIL import Image, ImageChops
 
 from apps.rendering.resources.imgrepr import OpenCVImgRepr
 
 logger = logging.getLogger("apps.rendering")
 
+# Final images bigger than this are assembled in a memory-mapped temporary
+# file instead of memory
+MEMMAP_THRESHOLD = 256 * 1024 * 1024  # B
+
 
 class RenderingTaskCollector(object):
     def __init__(self, width=None, height=None):
@@ -36,32 +44,66 @@ class RenderingTaskCollector(object):
         return self.finalize_img()
 
     def finalize_img(self):
+        """
+        Paste all collected parts one under another. The size of the final
+        image is read from headers of the parts, so each part is decoded
+        only once, when it is pasted. Only one part at a time is held
+        in memory if the final image is memory-mapped.
+        """
         res_x, res_y = 0, 0
 
         for name in self.accepted_img_files:
-            image = OpenCVImgRepr()
-            image.load_from_file(name)
-            img_y, res_x = image.img.shape[:2]
+            res_x, img_y = self._read_size(name)
             res_y += img_y
-            self.dtype = image.img.dtype
-            if len(image.img.shape) == 3:
-                self.channels = image.img.shape[2]
 
         self.width = res_x
         self.height = res_y
 
         final_img = OpenCVImgRepr()
-        final_img.empty(self.width, self.height,
-                        self.channels,
-                        self.dtype)
         offset = 0
         for img_path in self.accepted_img_files:
             image = OpenCVImgRepr()
             image.load_from_file(img_path)
+            if final_img.img is None:
+                self.dtype = image.img.dtype
+                if len(image.img.shape) == 3:
+                    self.channels = image.img.shape[2]
+                self._empty(final_img)
             final_img.paste_image(image.img, x=0, y=offset)
             offset += image.img.shape[0]
         return final_img
 
+    @staticmethod
+    def _read_size(path: str) -> Tuple[int, int]:
+        """ Read width and height of the image without decoding it """
+        try:
+            if os.path.splitext(path)[1].upper() == ".EXR":
+                data_window = OpenEXR.InputFile(path).header()['dataWindow']
+                return (data_window.max.x - data_window.min.x + 1,
+                        data_window.max.y - data_window.min.y + 1)
+            with Image.open(path) as img:
+                return img.size
+        except (OSError, KeyError):
+            # Formats not supported by PIL
+            image = OpenCVImgRepr()
+            image.load_from_file(path)
+            height, width = image.img.shape[:2]
+            return width, height
+
+    def _empty(self, final_img: OpenCVImgRepr) -> None:
+        shape = (self.height, self.width, self.channels)
+        size = int(numpy.prod(shape)) * numpy.dtype(self.dtype).itemsize
+        if size <= MEMMAP_THRESHOLD:
+            final_img.empty(self.width, self.height, self.channels,
+                            self.dtype)
+            return
+        logger.debug("Assembling %dx%d image in a memory-mapped file",
+                     self.width, self.height)
+        # The file is removed when the image is no longer used
+        with tempfile.TemporaryFile() as tmp_file:
+            final_img.img = numpy.memmap(tmp_file, dtype=self.dtype,
+                                         mode='w+', shape=shape)
+
     def _paste_image(self, final_img, new_part, num):
         with Image.new("RGB", (self.width, self.height)) as img_offset:
             offset = int(math.floor(num * float(self.height)
@@ -6,6 +6,11 @@ import OpenEXR
 
 # converting .exr file to .png if user gave .exr file as a rendered scene
 def ConvertEXRToPNG(exrfile, pngfile):
+    EXRToImage(exrfile).save(pngfile, "PNG")
+
+
+# converting .exr file to 8-bit RGB image in memory
+def EXRToImage(exrfile):
     File = OpenEXR.InputFile(exrfile)
     PixType = Imath.PixelType(Imath.PixelType.FLOAT)
     DW = File.header()['dataWindow']
@@ -17,7 +22,7 @@ def ConvertEXRToPNG(exrfile, pngfile):
                           (rgb[i] * 12.92) * 255.0,
                           (1.055 * (rgb[i] ** (1.0 / 2.4)) - 0.055) * 255.0)
     rgb8 = [Image.frombytes("F", Size, c.tostring()).convert("L") for c in rgb]
-    Image.merge("RGB", rgb8).save(pngfile, "PNG")
+    return Image.merge("RGB", rgb8)
 
 
 # converting .tga file to .png if user gave .tga file as a rendered scene
@@ -7,10 +7,11 @@ import numpy as np
 import cv2
 import OpenEXR
 import pywt
+from PIL import Image
 from skimage.measure import compare_ssim as ssim
 
 from .img_format_converter import \
-    ConvertTGAToPNG, ConvertEXRToPNG
+    EXRToImage
 from .imgmetrics import \
     ImgMetrics
 
@@ -43,6 +44,62 @@ def compare_crop_window(cropped_img_path,
     return path_to_metrics
 
 
+def compare_crop_windows(crops, rendered_scene_path,
+                         output_filename_paths=None):
+    """
+    Calculate metrics for many samples generated for comparison with the
+    same rendered_scene, which is loaded only once.
+    :param crops: list of (cropped_img_path, xres, yres) tuples
+    :param rendered_scene_path:
+    :param output_filename_paths: list of paths of the metrics files, one for
+    each crop, metrics_<crop number>.txt by default
+    :return: list of paths to the metrics files
+    """
+    if output_filename_paths is None:
+        output_filename_paths = [
+            'metrics_{}.txt'.format(i) for i in range(len(crops))
+        ]
+
+    rendered_scene = load_image(rendered_scene_path)
+    paths_to_metrics = []
+    for (cropped_img_path, xres, yres), output_filename_path in \
+            zip(crops, output_filename_paths):
+        cropped_img = cv2.imread(cropped_img_path)
+        scene_crop = _crop_to_fit(rendered_scene, cropped_img, xres, yres)
+        img_metrics = compare_images(cropped_img, scene_crop)
+        paths_to_metrics.append(
+            img_metrics.write_to_file(output_filename_path))
+
+    return paths_to_metrics
+
+
+def load_image(path):
+    """
+    Load an image as an 8-bit BGR array, as cv2.imread() does. EXR and TGA
+    images are converted in memory, with the same result as converting them
+    to PNG first.
+    :param path:
+    :return: numpy array of shape (height, width, 3)
+    """
+    extension = os.path.splitext(path)[1]
+    if extension == ".exr":
+        check_input = OpenEXR.InputFile(path).header()['channels']
+        if 'RenderLayer.Combined.R' in check_input:
+            sys.exit("There is no support for OpenEXR multilayer")
+        image = EXRToImage(path)
+    elif extension == ".tga":
+        image = Image.open(path)
+    else:
+        return cv2.imread(path)
+
+    return np.ascontiguousarray(np.asarray(image.convert("RGB"))[:, :, ::-1])
+
+
+def _crop_to_fit(rendered_scene, cropped_img, xres, yres):
+    (crop_height, crop_width) = cropped_img.shape[:2]
+    return rendered_scene[yres:yres + crop_height, xres:xres + crop_width]
+
+
 def _load_and_prepare_img_for_comparison(cropped_img_path,
                                          rendered_scene_path,
                                          xres, yres):
@@ -57,27 +114,9 @@ def _load_and_prepare_img_for_comparison(cropped_img_path,
     :param yres: as above
     :return:
     """
-    rendered_scene = None
-    # if rendered scene has .exr format need to convert it for .png format
-    if os.path.splitext(rendered_scene_path)[1] == ".exr":
-        check_input = OpenEXR.InputFile(rendered_scene_path).header()[
-            'channels']
-        if 'RenderLayer.Combined.R' in check_input:
-            sys.exit("There is no support for OpenEXR multilayer")
-        file_name = "/tmp/scene.png"
-        ConvertEXRToPNG(rendered_scene_path, file_name)
-        rendered_scene = cv2.imread(file_name)
-    elif os.path.splitext(rendered_scene_path)[1] == ".tga":
-        file_name = "/tmp/scene.png"
-        ConvertTGAToPNG(rendered_scene_path, file_name)
-        rendered_scene = cv2.imread(file_name)
-    else:
-        rendered_scene = cv2.imread(rendered_scene_path)
-
+    rendered_scene = load_image(rendered_scene_path)
     cropped_img = cv2.imread(cropped_img_path)
-    (crop_height, crop_width) = cropped_img.shape[:2]
-
-    scene_crop = rendered_scene[yres:yres + crop_height, xres:xres + crop_width]
+    scene_crop = _crop_to_fit(rendered_scene, cropped_img, xres, yres)
 
     # print("x, x + crop_width, y, y + crop_height:",
     #       xres, xres + crop_width, yres,
@@ -89,6 +128,8 @@ def compare_images(image_a, image_b) -> ImgMetrics:
     """
     This the entry point for calculating metrics between image_a, image_b
     once they are cropped to the same size.
+    Greyscale versions of the images are computed once and shared by the
+    metrics which need them.
     :param image_a:
     :param image_b:
     :return: ImgMetrics
@@ -97,16 +138,17 @@ def compare_images(image_a, image_b) -> ImgMetrics:
     # ImageA/B are images read by: cv2.imread(img.png)
     (crop_height, crop_width) = image_a.shape[:2]
 
-    imageA_wavelet, imageB_wavelet = images_to_wavelet_transform(
-        image_a, image_b, mode='db1')
+    grey_a = cv2.cvtColor(image_a, cv2.COLOR_BGR2GRAY)
+    grey_b = cv2.cvtColor(image_b, cv2.COLOR_BGR2GRAY)
 
-    SSIM_normal, MSE_normal = compare_mse_ssim(image_a, image_b)
+    SSIM_normal, MSE_normal = compare_images_transformed(grey_a, grey_b)
 
     SSIM_canny, MSE_canny = compare_images_transformed(
         cv2.Canny(image_a, 0, 0), cv2.Canny(image_b, 0, 0))
 
     SSIM_wavelet, MSE_wavelet = compare_images_transformed(
-        imageA_wavelet, imageB_wavelet)
+        grey_to_wavelet_transform(grey_a, mode='db1'),
+        grey_to_wavelet_transform(grey_b, mode='db1'))
 
     data = {
         "imgCorr": compare_histograms(image_a, image_b),
@@ -124,37 +166,33 @@ def compare_images(image_a, image_b) -> ImgMetrics:
 
 # converting crop windows to histogram transfrom
 def compare_histograms(image_a, image_b):
-    color = [(255, 0, 0), (0, 255, 0), (0, 0, 255)]
-    hist_item = 0
-    hist_item1 = 0
-    for ch in range(len(color)):
-        hist_item = cv2.calcHist([image_a], [ch], None, [256], [0, 255])
-        hist_item1 = cv2.calcHist([image_b], [ch], None, [256], [0, 255])
-        cv2.normalize(hist_item, hist_item, 0, 255, cv2.NORM_MINMAX)
-        cv2.normalize(hist_item1, hist_item1, 0, 255, cv2.NORM_MINMAX)
+    # Only the histograms of the last channel have ever been compared,
+    # so the other ones are not calculated
+    ch = 2
+    hist_item = cv2.calcHist([image_a], [ch], None, [256], [0, 255])
+    hist_item1 = cv2.calcHist([image_b], [ch], None, [256], [0, 255])
+    cv2.normalize(hist_item, hist_item, 0, 255, cv2.NORM_MINMAX)
+    cv2.normalize(hist_item1, hist_item1, 0, 255, cv2.NORM_MINMAX)
     result = cv2.compareHist(hist_item, hist_item1, cv2.HISTCMP_CORREL)
     return result
 
 
 # MSE metric
 def mean_squared_error(image_a, image_b):
-    mse = np.sum((image_a.astype("float") - image_b.astype("float")) ** 2)
+    diff = image_a.astype("float")
+    diff -= image_b
+    np.square(diff, out=diff)
+    mse = np.sum(diff)
     mse /= float(image_a.shape[0] * image_a.shape[1])
     return mse
 
 
 # MSE and SSIM metric for crop windows without any transform
 def compare_mse_ssim(image_a, image_b):
-    meanSquaredError = mean_squared_error(
+    return compare_images_transformed(
         cv2.cvtColor(image_a, cv2.COLOR_BGR2GRAY),
         cv2.cvtColor(image_b, cv2.COLOR_BGR2GRAY))
 
-    structualSim = ssim(
-        cv2.cvtColor(image_a, cv2.COLOR_BGR2GRAY),
-        cv2.cvtColor(image_b, cv2.COLOR_BGR2GRAY))
-
-    return structualSim, meanSquaredError
-
 
 # MSE and SSIM metric from crop windows with transform
 def compare_images_transformed(image_a, image_b):
@@ -166,22 +204,20 @@ def compare_images_transformed(image_a, image_b):
 
 # converting crop windows to wavelet transform
 def images_to_wavelet_transform(image_a, image_b, mode='db1'):
-    image_a = cv2.cvtColor(image_a, cv2.COLOR_BGR2GRAY)
-    image_b = cv2.cvtColor(image_b, cv2.COLOR_BGR2GRAY)
-    image_a = np.float32(image_a)
-    image_b = np.float32(image_b)
-    image_a /= 255
-    image_b /= 255
-    coeffs = pywt.dwt2(image_a, mode)
-    coeffs2 = pywt.dwt2(image_b, mode)
-    coeffs_H = list(coeffs)
-    coeffs_H2 = list(coeffs2)
-    coeffs_H[0] *= 0
-    coeffs_H2[0] *= 0
-    imArray_H = pywt.idwt2(coeffs_H, mode)
-    imArray_H *= 255
-    imArray_H = np.uint8(imArray_H)
-    imArray_H2 = pywt.idwt2(coeffs_H2, mode)
-    imArray_H2 *= 255
-    imArray_H2 = np.uint8(imArray_H2)
-    return imArray_H, imArray_H2
+    return (
+        grey_to_wavelet_transform(
+            cv2.cvtColor(image_a, cv2.COLOR_BGR2GRAY), mode),
+        grey_to_wavelet_transform(
+            cv2.cvtColor(image_b, cv2.COLOR_BGR2GRAY), mode),
+    )
+
+
+# wavelet transform of a greyscale crop window without its approximation
+def grey_to_wavelet_transform(image, mode='db1'):
+    image = np.float32(image)
+    image /= 255
+    coeffs = list(pywt.dwt2(image, mode))
+    coeffs[0] *= 0
+    imArray = pywt.idwt2(coeffs, mode)
+    imArray *= 255
+    return np.uint8(imArray)
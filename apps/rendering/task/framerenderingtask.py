@@ -151,6 +151,25 @@ class FrameRenderingTask(RenderingTask):
         super(FrameRenderingTask, self).restart_subtask(subtask_id)
         self._update_subtask_frame_status(subtask_id)
 
+    def get_subtask_delta(self, subtask_id):
+        delta = super(FrameRenderingTask, self).get_subtask_delta(subtask_id)
+        subtask = self.subtasks_given.get(subtask_id) or {}
+        frame_keys = [str(frame) for frame in subtask.get('frames', [])]
+        delta['frames'] = {
+            frame_key: (
+                dict(self.frames_given[frame_key]),
+                self.frames_state[frame_key],
+                list(self.frames_subtasks[frame_key]),
+            ) for frame_key in frame_keys if frame_key in self.frames_state
+        }
+        return delta
+
+    def apply_subtask_delta(self, subtask_id, delta):
+        super(FrameRenderingTask, self).apply_subtask_delta(subtask_id, delta)
+        for frame_key, frame in delta.get('frames', {}).items():
+            self.frames_given[frame_key], self.frames_state[frame_key], \
+                self.frames_subtasks[frame_key] = frame
+
     def get_output_names(self):
         if self.use_frames:
             dir_ = os.path.dirname(self.output_file)
@@ -104,6 +104,33 @@ class RenderingTask(CoreTask):
         elif self.preview_file_path:
             task_state.extra_data['result_preview'] = self.preview_file_path
 
+    def get_subtask_delta(self, subtask_id):
+        delta = super().get_subtask_delta(subtask_id)
+        subtask = self.subtasks_given.get(subtask_id) or {}
+        start_task = subtask.get('start_task')
+        # Assigning a subtask resends a failed one with the same range,
+        # see _get_next_task
+        delta['statuses'] = {
+            sid: sub['status'] for sid, sub in self.subtasks_given.items()
+            if sid != subtask_id and start_task is not None
+            and sub.get('start_task') == start_task
+        }
+        # Results of the subtask are collected by its first part or frames
+        keys = [start_task] + list(subtask.get('frames', []))
+        delta['collected_file_names'] = {
+            key: self.collected_file_names[key] for key in keys
+            if key in self.collected_file_names
+        }
+        return delta
+
+    def apply_subtask_delta(self, subtask_id, delta):
+        super().apply_subtask_delta(subtask_id, delta)
+        for sid, status in delta.get('statuses', {}).items():
+            if sid in self.subtasks_given:
+                self.subtasks_given[sid]['status'] = status
+        self.collected_file_names.update(
+            delta.get('collected_file_names', {}))
+
     #########################
     # Specific task methods #
     #########################
@@ -43,6 +43,10 @@ PINGS_INTERVALS = 120
 GETTING_PEERS_INTERVAL = 4.0
 GETTING_TASKS_INTERVAL = 4.0
 TASK_REQUEST_INTERVAL = 5.0
+# Max number of subtasks computed at the same time
+MAX_CONCURRENT_SUBTASKS = 1
+# Number of warm Docker containers kept for each image, 0 disables the pool
+CONTAINER_POOL_SIZE = 0
 PUBLISH_BALANCE_INTERVAL = 3.0
 PUBLISH_TASKS_INTERVAL = 1.0
 NODE_SNAPSHOT_INTERVAL = 10.0
@@ -51,6 +55,8 @@ MASK_UPDATE_INTERVAL = 30.0
 MAX_SENDING_DELAY = 360
 # How frequently task archive should be saved to disk (in seconds)
 TASKARCHIVE_MAINTENANCE_INTERVAL = 30
+# How frequently buffered local rank updates are saved (in seconds)
+LOCAL_RANK_FLUSH_INTERVAL = 10
 # Filename for task archive disk file
 TASKARCHIVE_FILENAME = "task_archive.pickle"
 # Number of past days task archive will store aggregated information for
@@ -138,6 +144,8 @@ class AppConfig:
             enable_monitor=ENABLE_MONITOR,
             # hardware
             hardware_preset_name=CUSTOM_HARDWARE_PRESET_NAME,
+            max_concurrent_subtasks=MAX_CONCURRENT_SUBTASKS,
+            container_pool_size=CONTAINER_POOL_SIZE,
             # price and trust
             min_price=MIN_PRICE,
             max_price=MAX_PRICE,
@@ -19,7 +19,10 @@ from twisted.internet.defer import (
 
 import golem
 from apps.appsmanager import AppsManager
-from golem.appconfig import TASKARCHIVE_MAINTENANCE_INTERVAL, AppConfig
+from apps.blender.verification_queue import VerificationDiagnosticsProvider
+from apps.core.task.coretask import CoreTask
+from golem.appconfig import TASKARCHIVE_MAINTENANCE_INTERVAL, \
+    LOCAL_RANK_FLUSH_INTERVAL, AppConfig
 from golem.clientconfigdescriptor import ConfigApprover, ClientConfigDescriptor
 from golem.config.presets import HardwarePresetsMixin
 from golem.core import variables
@@ -38,11 +41,11 @@ from golem.core.simpleserializer import DictSerializer
 from golem.database import Database
 from golem.diag.service import DiagnosticsService, DiagnosticsOutputFormat
 from golem.diag.vm import VMDiagnosticsProvider
+from golem.docker.pool import ContainerPoolDiagnosticsProvider
 from golem.environments.environmentsmanager import EnvironmentsManager
 from golem.manager.nodestatesnapshot import ComputingSubtaskStateSnapshot
 from golem.ethereum.exceptions import NotEnoughFunds
 from golem.ethereum.fundslocker import FundsLocker
-from golem.ethereum.paymentskeeper import PaymentStatus
 from golem.ethereum.transactionsystem import TransactionSystem
 from golem.monitor.model.nodemetadatamodel import NodeMetadataModel
 from golem.monitor.monitor import SystemMonitor
@@ -54,8 +57,10 @@ from golem.network.hyperdrive.daemon_manager import HyperdriveDaemonManager
 from golem.network.p2p.node import Node
 from golem.network.p2p.p2pservice import P2PService
 from golem.network.p2p.peersession import PeerSessionInfo
+from golem.network.transport.spamprotector import SpamDiagnosticsProvider
 from golem.network.transport.tcpnetwork import SocketAddress
 from golem.network.upnp.mapper import PortMapperManager
+from golem.ranking.manager import database_manager as rank_dm
 from golem.ranking.ranking import Ranking
 from golem.report import Component, Stage, StatusPublisher, report_calls
 from golem.resource.base.resourceserver import BaseResourceServer
@@ -162,6 +167,7 @@ class Client(HardwarePresetsMixin):
                 self,
                 int(self.config_desc.network_check_interval)),
             TaskArchiverService(self.task_archiver),
+            LocalRankFlushService(),
             MessageHistoryService(),
             DoWorkService(self),
         ]
@@ -553,6 +559,10 @@ class Client(HardwarePresetsMixin):
             VMDiagnosticsProvider(),
             self.monitor.on_vm_snapshot
         )
+        self.diag_service.register(SpamDiagnosticsProvider())
+        self.diag_service.register(
+            VerificationDiagnosticsProvider(CoreTask.VERIFICATION_QUEUE))
+        self.diag_service.register(ContainerPoolDiagnosticsProvider())
         self.diag_service.start()
 
     def stop_monitor(self):
@@ -779,55 +789,78 @@ class Client(HardwarePresetsMixin):
 
     def get_task_count(self):
         if self.task_server:
-            return len(self.task_server.task_keeper.get_all_tasks())
+            return len(self.task_server.task_keeper.task_headers)
         return 0
 
     @rpc_utils.expose('comp.task')
     def get_task(self, task_id: str) -> Optional[dict]:
         assert isinstance(self.task_server, TaskServer)
 
-        task_dict = self.task_server.task_manager.get_task_dict(task_id)
-        if not task_dict:
-            return None
-
-        task_state = self.task_server.task_manager.query_task_state(task_id)
-        subtask_ids = list(task_state.subtask_states.keys())
-
-        # Get total value and total fee for payments for the given subtask IDs
-        subtasks_payments = \
-            self.transaction_system.get_subtasks_payments(subtask_ids)
-        all_sent = all(
-            p.status in [PaymentStatus.sent, PaymentStatus.confirmed]
-            for p in subtasks_payments)
-        if not subtasks_payments or not all_sent:
-            task_dict['cost'] = None
-            task_dict['fee'] = None
-        else:
-            # Because details are JSON field
-            task_dict['cost'] = sum(p.value or 0 for p in subtasks_payments)
-            task_dict['fee'] = \
-                sum(p.details.fee or 0 for p in subtasks_payments)
-
-        # Convert to string because RPC serializer fails on big numbers
-        for k in ('cost', 'fee', 'estimated_cost', 'estimated_fee'):
-            if task_dict[k] is not None:
-                task_dict[k] = str(task_dict[k])
-
-        return task_dict
+        tasks = self._get_tasks_dicts([task_id])
+        return tasks[0] if tasks else None
 
     @rpc_utils.expose('comp.tasks')
-    def get_tasks(self, task_id: Optional[str] = None) \
+    def get_tasks(self,
+                  task_id: Optional[str] = None,
+                  status: Optional[Union[str, List[str]]] = None,
+                  offset: int = 0,
+                  limit: Optional[int] = None) \
             -> Union[Optional[dict], Iterable[dict]]:
+        """ Return tasks created by this node
+        :param task_id: if given, return a single task (or None)
+        :param status: return only tasks with this status (or one of these
+         statuses), e.g. "Computing"
+        :param offset: number of tasks to skip
+        :param limit: maximum number of tasks to return
+        """
         if not self.task_server:
             return []
 
         if task_id:
             return self.get_task(task_id)
 
-        task_ids = list(self.task_server.task_manager.tasks.keys())
-        tasks = (self.get_task(task_id) for task_id in task_ids)
-        # Filter Nones because get_task returns Optional[dict]
-        return list(filter(None, tasks))
+        task_manager = self.task_server.task_manager
+        task_ids = list(task_manager.tasks.keys())
+        if status:
+            statuses = {status} if isinstance(status, str) else set(status)
+            task_ids = [
+                task_id for task_id in task_ids
+                if task_id in task_manager.tasks_states
+                and task_manager.tasks_states[task_id].status.value
+                in statuses
+            ]
+
+        end = offset + limit if limit is not None else None
+        return self._get_tasks_dicts(task_ids[offset:end])
+
+    def _get_tasks_dicts(self, task_ids: List[str]) -> List[dict]:
+        task_manager = self.task_server.task_manager
+        tasks = []
+        subtasks = {}
+
+        for task_id in task_ids:
+            task_dict = task_manager.get_task_dict(task_id)
+            # Skip tasks removed in the meantime
+            if not task_dict:
+                continue
+            tasks.append(task_dict)
+            task_state = task_manager.tasks_states[task_id]
+            subtasks.update(
+                dict.fromkeys(task_state.subtask_states.keys(), task_id))
+
+        # Get total value and total fee of payments for subtasks of all tasks
+        totals = self.transaction_system.get_tasks_payments_totals(subtasks)
+
+        for task_dict in tasks:
+            task_dict['cost'], task_dict['fee'] = \
+                totals.get(task_dict['id'], (None, None))
+
+            # Convert to string because RPC serializer fails on big numbers
+            for k in ('cost', 'fee', 'estimated_cost', 'estimated_fee'):
+                if task_dict[k] is not None:
+                    task_dict[k] = str(task_dict[k])
+
+        return tasks
 
     @rpc_utils.expose('comp.task.subtasks')
     def get_subtasks(self, task_id: str) \
@@ -1307,14 +1340,15 @@ class Client(HardwarePresetsMixin):
         task_computer = self.task_server.task_computer
 
         # computing
-        subtask_progress: Optional[ComputingSubtaskStateSnapshot] = \
+        subtasks_progress: List[ComputingSubtaskStateSnapshot] = \
             task_computer.get_progress()
-        if subtask_progress is not None:
+        if subtasks_progress:
             environment: Optional[str] = \
                 task_computer.get_environment()
             return {
                 'status': 'Computing',
-                'subtask': subtask_progress.__dict__,
+                'subtask': subtasks_progress[0].__dict__,
+                'subtasks': [p.__dict__ for p in subtasks_progress],
                 'environment': environment
             }
 
@@ -1420,7 +1454,7 @@ class MonitoringPublisherService(LoopingCallService):
         dispatcher.send(
             signal='golem.monitor',
             event='stats_snapshot',
-            known_tasks=len(self._task_server.task_keeper.get_all_tasks()),
+            known_tasks=len(self._task_server.task_keeper.task_headers),
             supported_tasks=len(self._task_server.task_keeper.supported_tasks),
             stats=self._task_server.task_computer.stats,
         )
@@ -1469,6 +1503,19 @@ class TaskArchiverService(LoopingCallService):
         self._task_archiver.do_maintenance()
 
 
+class LocalRankFlushService(LoopingCallService):
+
+    def __init__(self) -> None:
+        super().__init__(interval_seconds=LOCAL_RANK_FLUSH_INTERVAL)
+
+    def stop(self):
+        super().stop()
+        rank_dm.flush_local_ranks()
+
+    def _run(self):
+        rank_dm.flush_local_ranks()
+
+
 class ResourceCleanerService(LoopingCallService):
     _client = None  # type: Client
     older_than_seconds = 0  # type: int
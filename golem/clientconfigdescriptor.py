@@ -48,6 +48,8 @@ class ClientConfigDescriptor(object):
         self.max_resource_size = 0  # KiB
         self.max_memory_size = 0  # KiB
         self.hardware_preset_name = ""
+        self.max_concurrent_subtasks = 1
+        self.container_pool_size = 0
 
         self.use_distributed_resource_management = 1
 
@@ -89,7 +91,7 @@ class ConfigApprover(object):
     to_int_opt = {
         'seed_port', 'num_cores', 'opt_peer_num', 'p2p_session_timeout',
         'task_session_timeout', 'pings_interval', 'max_results_sending_delay',
-        'key_difficulty',
+        'key_difficulty', 'max_concurrent_subtasks', 'container_pool_size',
     }
     to_big_int_opt = {
         'min_price', 'max_price',
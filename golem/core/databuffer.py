@@ -2,12 +2,33 @@ import struct
 
 from .variables import LONG_STANDARD_SIZE
 
+ULONG = struct.Struct("!L")
+
+# Consumed bytes are dropped from the front of the buffer only when there is
+# at least this many of them and they take more than half of the buffer
+COMPACT_THRESHOLD = 64 * 1024
+
 
 class DataBuffer:
-    """ Data buffer that helps with network communication. """
+    """ Data buffer that helps with network communication.
+
+    Data is kept in a single bytearray together with an offset of the first
+    unread byte. Reading only moves the offset and copies the bytes that are
+    returned; the consumed part of the buffer is dropped from time to time
+    when new data is appended. Receiving a message in many small chunks is
+    therefore linear in the size of the message.
+    """
     def __init__(self):
         """ Create new data buffer """
-        self.buffered_data = b""
+        self._buffer = bytearray()
+        self._offset = 0
+
+    @property
+    def buffered_data(self):
+        """ Copy of the data that has not been read yet
+        :return bytes: unread data
+        """
+        return self._get_bytes(self._offset, len(self._buffer))
 
     def append_ulong(self, num):
         """
@@ -17,32 +38,32 @@ class DataBuffer:
         """
         if num < 0:
             raise AttributeError("num must be grater than 0")
-        bytes_num_rep = struct.pack("!L", num)
-        self.buffered_data += bytes_num_rep
+        bytes_num_rep = ULONG.pack(num)
+        self.append_bytes(bytes_num_rep)
         return bytes_num_rep
 
     def append_bytes(self, data):
         """ Append given bytes to data buffer
         :param bytes data: bytes to append
         """
-        self.buffered_data += data
+        self._compact()
+        self._buffer += data
 
     def data_size(self):
         """ Return size of data in buffer
         :return int: size of data in buffer
         """
-        return len(self.buffered_data)
+        return len(self._buffer) - self._offset
 
     def peek_ulong(self):
         """
         Check long number that is located at the beginning of this data buffer
         :return (long|None): number at the beginning of the buffer if it's there
         """
-        if len(self.buffered_data) < LONG_STANDARD_SIZE:
+        if self.data_size() < LONG_STANDARD_SIZE:
             return None
 
-        (ret_val,) = \
-            struct.unpack("!L", self.buffered_data[0:LONG_STANDARD_SIZE])
+        (ret_val,) = ULONG.unpack_from(self._buffer, self._offset)
         return ret_val
 
     def read_ulong(self):
@@ -54,7 +75,7 @@ class DataBuffer:
         if val_ is None:
             raise ValueError(
                 "buffer_data is shorter than {}".format(LONG_STANDARD_SIZE))
-        self.buffered_data = self.buffered_data[LONG_STANDARD_SIZE:]
+        self._offset += LONG_STANDARD_SIZE
 
         return val_
 
@@ -64,11 +85,10 @@ class DataBuffer:
         :param long num_bytes: how many bytes should be read from buffer
         :return bytes: first <num_bytes> bytes from buffer
         """
-        if num_bytes > len(self.buffered_data):
+        if num_bytes > self.data_size():
             raise AttributeError("num_bytes is grater than buffer length")
 
-        ret_bytes = self.buffered_data[:num_bytes]
-        return ret_bytes
+        return self._get_bytes(self._offset, self._offset + num_bytes)
 
     def read_bytes(self, num_bytes):
         """
@@ -78,7 +98,7 @@ class DataBuffer:
         :return bytes: bytes removed form buffer
         """
         val_ = self.peek_bytes(num_bytes)
-        self.buffered_data = self.buffered_data[num_bytes:]
+        self._offset += len(val_)
 
         return val_
 
@@ -88,7 +108,7 @@ class DataBuffer:
         :return bytes: all data that was in the buffer.
         """
         ret_data = self.buffered_data
-        self.buffered_data = b""
+        self.clear_buffer()
 
         return ret_data
 
@@ -100,8 +120,7 @@ class DataBuffer:
         """
         ret_bytes = None
 
-        if (self.data_size() > LONG_STANDARD_SIZE and
-                self.data_size() >= (self.peek_ulong() + LONG_STANDARD_SIZE)):
+        if self._has_len_prefixed_bytes():
             num_bytes = self.read_ulong()
             ret_bytes = self.read_bytes(num_bytes)
 
@@ -112,8 +131,7 @@ class DataBuffer:
         Generator function that return from buffer datas preceded with
         their length (long)
         """
-        while (self.data_size() > LONG_STANDARD_SIZE and
-               self.data_size() >= (self.peek_ulong() + LONG_STANDARD_SIZE)):
+        while self._has_len_prefixed_bytes():
             num_bytes = self.read_ulong()
             yield self.read_bytes(num_bytes)
 
@@ -127,4 +145,26 @@ class DataBuffer:
 
     def clear_buffer(self):
         """ Remove all data from the buffer """
-        self.buffered_data = b""
+        self._buffer = bytearray()
+        self._offset = 0
+
+    def _has_len_prefixed_bytes(self):
+        size = self.data_size()
+        return (size > LONG_STANDARD_SIZE and
+                size >= self.peek_ulong() + LONG_STANDARD_SIZE)
+
+    def _get_bytes(self, start, end):
+        # Slicing a memoryview does not copy, so the data is copied only once
+        with memoryview(self._buffer) as view:
+            with view[start:end] as data:
+                return data.tobytes()
+
+    def _compact(self):
+        if self._offset == len(self._buffer):
+            # Everything has been read, reuse the allocated memory
+            del self._buffer[:]
+            self._offset = 0
+        elif self._offset >= COMPACT_THRESHOLD \
+                and self._offset * 2 > len(self._buffer):
+            del self._buffer[:self._offset]
+            self._offset = 0
@@ -55,11 +55,40 @@ class FileEncryptor(object, metaclass=abc.ABCMeta):
         pass
 
 
+class AESStreamEncryptor(object):
+    """ Encrypts data written in chunks of any size. The output is the same
+    as the one of AESFileEncryptor.encrypt """
+
+    def __init__(self, dst, cipher, block_size):
+        self._dst = dst
+        self._cipher = cipher
+        self._block_size = block_size
+        self._pending = bytes()
+
+    def write(self, data):
+        size = len(data)
+        if self._pending:
+            data = self._pending + data
+        split = len(data) - len(data) % self._block_size
+
+        if split:
+            self._dst.write(self._cipher.encrypt(data[:split]))
+        self._pending = bytes(data[split:])
+        return size
+
+    def finish(self):
+        """ Pad and encrypt the remaining data """
+        pad_len = self._block_size - len(self._pending)
+        self._dst.write(self._cipher.encrypt(
+            self._pending + chr(pad_len).encode() * pad_len))
+        self._pending = bytes()
+
+
 class AESFileEncryptor(FileEncryptor):
 
     aes_mode = AES.MODE_CBC
     block_size = AES.block_size
-    chunk_size = 1024
+    chunk_size = 64 * 1024
     salt_prefix = b'salt_'
     salt_prefix_len = len(salt_prefix)
 
@@ -80,30 +109,30 @@ class AESFileEncryptor(FileEncryptor):
         return digest[:key_len], digest[key_len:total_len]
 
     @classmethod
-    def encrypt(cls, file_in, file_out, secret, key_len=32):
-
+    def stream_encryptor(cls, dst, secret, key_len=32):
+        """ Write the salt to dst and return an AESStreamEncryptor writing
+        encrypted data to dst """
         block_size = cls.block_size
         salt = cls.gen_salt(block_size)
         key, iv = cls.get_key_and_iv(secret, salt, key_len, block_size)
         cipher = AES.new(key, cls.aes_mode, iv)
 
-        with FileHelper(file_in, 'rb') as src, FileHelper(file_out, 'wb') as dst:
+        dst.write(cls.salt_prefix + salt)
+        return AESStreamEncryptor(dst, cipher, block_size)
 
-            dst.write(cls.salt_prefix + salt)
+    @classmethod
+    def encrypt(cls, file_in, file_out, secret, key_len=32):
 
-            working = True
-            while working:
+        with FileHelper(file_in, 'rb') as src, FileHelper(file_out, 'wb') as dst:
 
-                chunk = src.read(cls.chunk_size * block_size)
-                chunk_len = len(chunk)
-                chunk_len_mod = chunk_len % block_size
+            encryptor = cls.stream_encryptor(dst, secret, key_len)
 
-                if chunk_len == 0 or chunk_len_mod != 0:
-                    pad_len = (block_size - chunk_len_mod) or block_size
-                    chunk += chr(pad_len).encode() * pad_len
-                    working = False
+            chunk = src.read(cls.chunk_size * cls.block_size)
+            while chunk:
+                encryptor.write(chunk)
+                chunk = src.read(cls.chunk_size * cls.block_size)
 
-                dst.write(cipher.encrypt(chunk))
+            encryptor.finish()
 
     @classmethod
     def decrypt(cls, file_in, file_out, secret, key_len=32):
@@ -1,11 +1,12 @@
 import json
 import logging
 import math
+import multiprocessing
 import os
 import sys
 import time
 from hashlib import sha256
-from typing import Optional, Tuple, Union
+from typing import Iterator, Optional, Tuple, Union
 
 from eth_keyfile import create_keyfile_json, decode_keyfile_json
 from eth_utils import encode_hex, decode_hex
@@ -15,6 +16,18 @@ from golem_messages.cryptography import ECCx, mk_privkey, ecdsa_verify, \
 
 logger = logging.getLogger(__name__)
 
+# Below this difficulty starting worker processes takes longer than
+# generating the keys
+KEYGEN_POOL_MIN_DIFFICULTY = 16
+# How long a worker process looks for keys before reporting back (in seconds)
+KEYGEN_BATCH_TIME = 1.0
+# How often key generation checks for results and reactor shutdown
+KEYGEN_POLL_INTERVAL = 0.01
+# How often key generation progress is logged (in seconds)
+KEYGEN_PROGRESS_INTERVAL = 10.0
+
+KeyPair = Tuple[bytes, bytes]
+
 
 def sha2(seed: Union[str, bytes]) -> int:
     if isinstance(seed, str):
@@ -46,6 +59,24 @@ def get_random_float() -> float:
     return float(random) / sys.maxsize
 
 
+def _find_difficult_keys(difficulty: int, duration: float) \
+        -> Tuple[Optional[KeyPair], int]:
+    """ Look for a key pair of the given difficulty for at most `duration`
+    seconds. Module level, so that it can be run in a worker process.
+    :return: the key pair (or None) and the number of keys tried
+    """
+    deadline = time.time() + duration
+    tried = 0
+    while True:
+        tried += 1
+        priv_key = mk_privkey(str(get_random_float()))
+        pub_key = privtopub(priv_key)
+        if KeysAuth.is_pubkey_difficult(pub_key, difficulty):
+            return (priv_key, pub_key), tried
+        if time.time() >= deadline:
+            return None, tried
+
+
 class WrongPassword(Exception):
     pass
 
@@ -148,24 +179,105 @@ class KeysAuth:
         return priv_key, pub_key
 
     @staticmethod
-    def _generate_keys(difficulty: int) -> Tuple[bytes, bytes]:
+    def _generate_keys(difficulty: int,
+                       processes: Optional[int] = None) -> KeyPair:
+        """
+        Generate a key pair of the given difficulty. Unless the difficulty is
+        low, keys are looked for in a pool of worker processes.
+
+        :param difficulty: desired key difficulty level
+        :param processes: number of worker processes, defaults to the number
+            of CPUs
+        """
         from twisted.internet import reactor
         reactor_started = reactor.running
         logger.info("Generating new key pair")
-        started = time.time()
+        started = last_report = time.time()
+
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        if processes > 1 and difficulty >= KEYGEN_POOL_MIN_DIFFICULTY:
+            search = KeysAuth._search_keys_in_pool(difficulty, processes)
+        else:
+            search = KeysAuth._search_keys(difficulty)
+
+        tried = 0
+        try:
+            for keys, batch_tried in search:
+                tried += batch_tried
+                if keys:
+                    break
+
+                # lets be responsive to reactor stop (eg. ^C hit by user)
+                if reactor_started and not reactor.running:
+                    logger.warning(
+                        "reactor stopped, aborting key generation ..")
+                    raise Exception("aborting key generation")
+
+                now = time.time()
+                if tried and now - last_report >= KEYGEN_PROGRESS_INTERVAL:
+                    last_report = now
+                    KeysAuth._log_progress(difficulty, tried, now - started)
+        finally:
+            # Stops the worker processes
+            search.close()
+
+        logger.info("Keys generated in %.2fs (%d keys tried)",
+                    time.time() - started, tried)
+        return keys
+
+    @staticmethod
+    def _search_keys(difficulty: int) \
+            -> Iterator[Tuple[Optional[KeyPair], int]]:
         while True:
-            priv_key = mk_privkey(str(get_random_float()))
-            pub_key = privtopub(priv_key)
-            if KeysAuth.is_pubkey_difficult(pub_key, difficulty):
-                break
+            yield _find_difficult_keys(difficulty, KEYGEN_POLL_INTERVAL)
 
-            # lets be responsive to reactor stop (eg. ^C hit by user)
-            if reactor_started and not reactor.running:
-                logger.warning("reactor stopped, aborting key generation ..")
-                raise Exception("aborting key generation")
+    @staticmethod
+    def _search_keys_in_pool(difficulty: int, processes: int) \
+            -> Iterator[Tuple[Optional[KeyPair], int]]:
+        """
+        Look for keys in worker processes, each one reporting back after
+        KEYGEN_BATCH_TIME. Yields (None, 0) every KEYGEN_POLL_INTERVAL while
+        there are no results. Workers are terminated when the generator is
+        closed.
+        """
+        logger.debug("Starting %d key generation processes", processes)
+        # Keys are usually generated in a reactor thread; forking a process
+        # with other threads running may leave locks in the child acquired
+        pool = multiprocessing.get_context('spawn').Pool(processes)
+        args = (difficulty, KEYGEN_BATCH_TIME)
+        try:
+            pending = [pool.apply_async(_find_difficult_keys, args)
+                       for _ in range(processes)]
+            while True:
+                ready = [result for result in pending if result.ready()]
+                if not ready:
+                    time.sleep(KEYGEN_POLL_INTERVAL)
+                    yield None, 0
+                    continue
+
+                for result in ready:
+                    pending.remove(result)
+                    yield result.get()
+                    pending.append(
+                        pool.apply_async(_find_difficult_keys, args))
+        finally:
+            pool.terminate()
+            pool.join()
 
-        logger.info("Keys generated in %.2fs", time.time() - started)
-        return priv_key, pub_key
+    @staticmethod
+    def _log_progress(difficulty: int, tried: int, elapsed: float) -> None:
+        # Each key is difficult with the probability of 2^-difficulty
+        # independently of the ones tried before
+        rate = tried / elapsed if elapsed else 0.
+        expected = 2 ** difficulty
+        logger.info(
+            "Generating keys: %d keys tried in %.0fs (%.0f keys/s), "
+            "%.0f%% chance to have found one by now, "
+            "expected time to find one: %s",
+            tried, elapsed, rate,
+            100. * (1. - math.exp(-tried / expected)),
+            "{:.0f}s".format(expected / rate) if rate else "unknown")
 
     @staticmethod
     def _save_private_key(key, key_path, password: str):
@@ -1,7 +1,16 @@
 # Generating, solving and checking solutions of crypto-puzzles for proof of work system
 
-from random import sample
+import hashlib
+import itertools
+import multiprocessing
+import threading
 import time
+from collections import deque
+from random import sample
+from typing import Optional, Tuple
+
+from twisted.internet import threads
+from twisted.internet.defer import Deferred
 
 from golem.core.keysauth import get_random, sha2
 
@@ -9,6 +18,13 @@ __author__ = 'Magda.Stasiewicz'
 
 CHALLENGE_HISTORY_LIMIT = 100
 MAX_RANDINT = 100000000000000000000000000
+# How many solutions are checked in a single batch
+SOLVE_BATCH_SIZE = 50000
+# Below this difficulty starting worker processes takes longer than
+# solving the challenge
+SOLVE_POOL_MIN_DIFFICULTY = 16
+# How often a solver waiting for a batch checks whether it was closed
+SOLVE_POLL_INTERVAL = 0.1
 
 
 def create_challenge(history, prev):
@@ -33,14 +49,113 @@ def solve_challenge(challenge, difficulty):
     representation of solution's hash returns solution and computation time in seconds
     """
     start = time.time()
-    min_hash = pow(2, 256 - difficulty)     # could be done prettier
-    solution = 0
-    while sha2(challenge + str(solution)) > min_hash:
-        solution += 1
+    solution = None
+    for nonce in itertools.count(0, SOLVE_BATCH_SIZE):
+        solution = _solve_range(
+            challenge, difficulty, nonce, nonce + SOLVE_BATCH_SIZE)
+        if solution is not None:
+            break
     end = time.time()
     return solution, end - start
 
 
+def _solve_range(challenge: str, difficulty: int, start: int,
+                 stop: int) -> Optional[int]:
+    """
+    Returns the lowest solution in range [start, stop) or None if there is no
+    solution in that range. Module level, so that it can be run in a worker
+    process.
+    """
+    if difficulty <= 0:
+        return start
+    # Big-endian digests compare in the same order as the hashes
+    max_digest = pow(2, 256 - difficulty).to_bytes(32, 'big')
+    prefix = hashlib.sha256(challenge.encode())
+    for solution in range(start, stop):
+        digest = prefix.copy()
+        digest.update(b'%d' % solution)
+        if digest.digest() <= max_digest:
+            return solution
+    return None
+
+
+class ChallengeSolverClosed(Exception):
+    pass
+
+
+class ChallengeSolver:
+    """
+    Solves challenges off the reactor thread. Challenges of difficulty
+    SOLVE_POOL_MIN_DIFFICULTY and above are solved in a pool of worker
+    processes, which is started on first use and shared by all challenges.
+    """
+
+    def __init__(self, processes: Optional[int] = None) -> None:
+        self.processes = processes or multiprocessing.cpu_count()
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def solve(self, challenge: str, difficulty: int) -> Deferred:
+        """ Solve the challenge in a reactor thread
+        :return Deferred: fired with the solution and computation time
+                          in seconds
+        """
+        return threads.deferToThread(self.solve_sync, challenge, difficulty)
+
+    def solve_sync(self, challenge: str, difficulty: int) \
+            -> Tuple[int, float]:
+        if self.processes < 2 or difficulty < SOLVE_POOL_MIN_DIFFICULTY:
+            return solve_challenge(challenge, difficulty)
+
+        start = time.time()
+        pool = self._get_pool()
+        nonces = itertools.count(0, SOLVE_BATCH_SIZE)
+
+        def submit():
+            with self._lock:
+                if self._pool is not pool:
+                    raise ChallengeSolverClosed()
+                nonce = next(nonces)
+                return pool.apply_async(
+                    _solve_range,
+                    (challenge, difficulty, nonce, nonce + SOLVE_BATCH_SIZE))
+
+        # Batches are checked in order, so the solution is the same as the
+        # one found by solve_challenge. Two batches per process are kept
+        # in flight, so that the workers do not wait for the next batch.
+        pending = deque(submit() for _ in range(2 * self.processes))
+        while True:
+            result = pending.popleft()
+            while not result.ready():
+                # Results of a terminated pool are never ready
+                if self._pool is not pool:
+                    raise ChallengeSolverClosed()
+                result.wait(SOLVE_POLL_INTERVAL)
+            solution = result.get()
+            if solution is not None:
+                # Remaining batches are short, they are not cancelled
+                return solution, time.time() - start
+            pending.append(submit())
+
+    def close(self) -> None:
+        """ Stop the worker processes """
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                # Challenges are solved in reactor threads; forking a process
+                # with other threads running may leave locks in the child
+                # acquired
+                self._pool = multiprocessing.get_context('spawn').Pool(
+                    self.processes)
+            return self._pool
+
+
 def accept_challenge(challenge, solution, difficulty):
     """ Returns true if solution is valid for given challenge and difficulty, false otherwise
     :param challenge:
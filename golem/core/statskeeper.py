@@ -1,8 +1,9 @@
 import logging
 from threading import Lock
+from typing import Dict
 
 from golem.core.common import HandleAttributeError
-from golem.model import Stats
+from golem.model import Stats, db
 
 logger = logging.getLogger(__name__)
 
@@ -49,8 +50,14 @@ class StatsKeeper(object):
 
 
 class IntStatsKeeper(StatsKeeper):
+    """ Counters are increased in memory only. Increments are written to the
+    database in a single transaction by flush(), which should be called
+    periodically and at shutdown.
+    """
 
     def __init__(self, stat_class):
+        # Increments not written to the database yet, by stat name
+        self._pending: Dict[str, int] = {}
         super(IntStatsKeeper, self).__init__(stat_class, '0')
 
     @StatsKeeper.handle_attribute_error
@@ -58,14 +65,40 @@ class IntStatsKeeper(StatsKeeper):
         with self._lock:
             val = getattr(self.session_stats, stat_name)
             setattr(self.session_stats, stat_name, val + 1)
-            global_val = self._retrieve_stat(stat_name)
-            if global_val is not None:
-                setattr(self.global_stats, stat_name, global_val + increment)
-                try:
-                    Stats.update(value="{}".format(global_val+increment)) \
-                        .where(Stats.name == stat_name).execute()
-                except Exception as err:
-                    logger.error("Exception occured while updating stat %r: %r", stat_name, err)
+            global_val = getattr(self.global_stats, stat_name)
+            setattr(self.global_stats, stat_name, global_val + increment)
+            self._pending[stat_name] = \
+                self._pending.get(stat_name, 0) + increment
+
+    def flush(self):
+        """ Add pending increments to the stats saved in the database """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        try:
+            with db.transaction():
+                for stat_name, increment in pending.items():
+                    self._save_increment(stat_name, increment)
+        except Exception as err:
+            logger.error("Exception occured while saving stats: %r", err)
+            # Try again with the next flush
+            with self._lock:
+                for stat_name, increment in pending.items():
+                    self._pending[stat_name] = \
+                        self._pending.get(stat_name, 0) + increment
+
+    def _save_increment(self, stat_name, increment):
+        stat, _ = Stats.get_or_create(name=stat_name,
+                                      defaults={'value': self.default})
+        try:
+            value = int(stat.value)
+        except (ValueError, TypeError) as err:
+            logger.warning("Wrong stat %r format: %r", stat_name, err)
+            return
+        Stats.update(value="{}".format(value + increment)) \
+            .where(Stats.name == stat_name).execute()
 
     def _retrieve_stat(self, name):
         try:
@@ -0,0 +1,11 @@
+# pylint: disable=no-member
+# pylint: disable=unused-argument
+SCHEMA_VERSION = 23
+
+
+def migrate(migrator, database, fake=False, **kwargs):
+    migrator.add_index('networkmessage', 'msg_date', unique=False)
+
+
+def rollback(migrator, database, fake=False, **kwargs):
+    migrator.drop_index('networkmessage', 'msg_date')
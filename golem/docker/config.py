@@ -77,6 +77,29 @@ class DockerConfigManager(object):
 
         self.container_host_config.update(host_config)
 
+    def get_slot_host_config(self, slot: int,
+                             num_slots: int) -> Dict[str, Any]:
+        """ Host config of a container running in one of `num_slots`
+        concurrent computation slots. The CPU set and the memory limit are
+        split evenly between the slots.
+        """
+        host_config = dict(self.container_host_config)
+        if num_slots <= 1:
+            return host_config
+
+        cpu_set = host_config.get('cpuset')
+        if cpu_set:
+            cpus = cpu_set.split(',')
+            per_slot = max(len(cpus) // num_slots, 1)
+            start = (slot * per_slot) % len(cpus)
+            host_config['cpuset'] = ','.join(cpus[start:start + per_slot])
+
+        mem_limit = host_config.get('mem_limit')
+        if mem_limit:
+            host_config['mem_limit'] = str(int(mem_limit) // num_slots)
+
+        return host_config
+
     @classmethod
     def install(cls, *args, **kwargs):
         if not DockerTaskThread.docker_manager:
@@ -112,6 +112,27 @@ class DockerJob(object):
         self.resources_dir_mod = self._host_dir_chmod(self.resources_dir, "rw")
         self.output_dir_mod = self._host_dir_chmod(self.output_dir, "rw")
 
+        self._write_files()
+
+        # The location of the task script when mounted in the container
+        container_script_path = self._get_container_script_path()
+        self.container = self.create_container(
+            self.image,
+            self.host_config,
+            resources_dir=self.resources_dir,
+            work_dir=self.work_dir,
+            output_dir=self.output_dir,
+            command=[container_script_path],
+        )
+        self.container_id = self.container["Id"]
+        if self.container_id is None:
+            raise KeyError("container does not have key: Id")
+
+        logger.debug("Container %s prepared, image: %s, dirs: %s; %s; %s",
+                     self.container_id, self.image.name, self.work_dir,
+                     self.resources_dir, self.output_dir)
+
+    def _write_files(self):
         # Save parameters in work_dir/PARAMS_FILE
         params_file_path = self._get_host_params_path()
         with open(params_file_path, "wb") as params_file:
@@ -124,27 +145,48 @@ class DockerJob(object):
         with open(task_script_path, "wb") as script_file:
             script_file.write(bytearray(self.script_src, "utf-8"))
 
-        # Setup volumes for the container
+    # pylint:disable=too-many-locals
+    @classmethod
+    def create_container(cls,
+                         image: DockerImage,
+                         host_config: Dict,
+                         resources_dir: str,
+                         work_dir: str,
+                         output_dir: str,
+                         extra_binds: Optional[Dict[str, str]] = None,
+                         **kwargs) -> Dict:
+        """ Create a container of the image with the task directories
+        mounted in it
+        :param extra_binds: additional container dirs by host dirs
+        :param kwargs: passed to create_container of the Docker client
+        :returns: the container, as returned by the Docker client
+        """
         client = local_client()
 
-        container_config = dict(self.host_config)
+        container_config = dict(host_config)
         cpuset = container_config.pop('cpuset', None)
 
-        volumes = [self.WORK_DIR, self.RESOURCES_DIR, self.OUTPUT_DIR]
+        volumes = [cls.WORK_DIR, cls.RESOURCES_DIR, cls.OUTPUT_DIR]
         binds = {
-            posix_path(self.work_dir): {
-                "bind": self.WORK_DIR,
+            posix_path(work_dir): {
+                "bind": cls.WORK_DIR,
                 "mode": "rw"
             },
-            posix_path(self.resources_dir): {
-                "bind": self.RESOURCES_DIR,
+            posix_path(resources_dir): {
+                "bind": cls.RESOURCES_DIR,
                 "mode": "rw"
             },
-            posix_path(self.output_dir): {
-                "bind": self.OUTPUT_DIR,
+            posix_path(output_dir): {
+                "bind": cls.OUTPUT_DIR,
                 "mode": "rw"
             },
         }
+        for host_dir, container_dir in (extra_binds or {}).items():
+            volumes.append(container_dir)
+            binds[posix_path(host_dir)] = {
+                "bind": container_dir,
+                "mode": "rw"
+            }
 
         if is_windows():
             environment = {}
@@ -154,12 +196,12 @@ class DockerJob(object):
             environment = dict(LOCAL_USER_ID=os.getuid())
 
         environment.update(
-            WORK_DIR=self.WORK_DIR,
-            RESOURCES_DIR=self.RESOURCES_DIR,
-            OUTPUT_DIR=self.OUTPUT_DIR
+            WORK_DIR=cls.WORK_DIR,
+            RESOURCES_DIR=cls.RESOURCES_DIR,
+            OUTPUT_DIR=cls.OUTPUT_DIR
         )
 
-        docker_env = EnvironmentsManager().get_environment_by_image(self.image)
+        docker_env = EnvironmentsManager().get_environment_by_image(image)
 
         if docker_env:
             env_config = docker_env.get_container_config()
@@ -170,7 +212,7 @@ class DockerJob(object):
             devices = env_config['devices']
             runtime = env_config['runtime']
         else:
-            logger.debug('No Docker environment found for image %r', self.image)
+            logger.debug('No Docker environment found for image %r', image)
 
             devices = None
             runtime = None
@@ -183,23 +225,14 @@ class DockerJob(object):
             **container_config
         )
 
-        # The location of the task script when mounted in the container
-        container_script_path = self._get_container_script_path()
-        self.container = client.create_container(
-            image=self.image.name,
+        return client.create_container(
+            image=image.name,
             volumes=volumes,
             host_config=host_cfg,
-            command=[container_script_path],
-            working_dir=self.WORK_DIR,
+            working_dir=cls.WORK_DIR,
             environment=environment,
+            **kwargs
         )
-        self.container_id = self.container["Id"]
-        if self.container_id is None:
-            raise KeyError("container does not have key: Id")
-
-        logger.debug("Container %s prepared, image: %s, dirs: %s; %s; %s",
-                     self.container_id, self.image.name, self.work_dir,
-                     self.resources_dir, self.output_dir)
 
     def _cleanup(self):
         if self.container:
@@ -0,0 +1,588 @@
+import json
+import logging
+import os
+import posixpath
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
+
+import docker.errors
+import requests
+
+from golem.diag.service import DiagnosticsProvider
+from golem.docker.image import DockerImage
+from .client import local_client
+from .job import DockerJob, container_logger
+
+__all__ = ['ContainerPool', 'PooledDockerJob',
+           'ContainerPoolDiagnosticsProvider']
+
+logger = logging.getLogger(__name__)
+
+# Number of idle containers kept for each image and host config
+POOL_SIZE = 1
+# Number of jobs run in a container before it is removed
+MAX_USES = 20
+# Idle containers which have not been used for so long are removed
+IDLE_TIMEOUT = 600  # s
+
+# Command keeping a pooled container running between jobs
+IDLE_COMMAND = ['tail', '-f', '/dev/null']
+# Directories of a slot, mounted in a pooled container
+SLOT_DIRS = ('resources', 'work', 'output', 'logs')
+# Arguments of the image entrypoint preparing a new container: the
+# entrypoint sets up the user running the task script and runs python
+WARM_UP_ARGS = ['-c', 'pass']
+# Command run as root before a container is recycled: tmpfs mounts are not
+# reported by `docker diff`, so /dev/shm is wiped and checked to be empty
+WIPE_TMPFS_COMMAND = [
+    '/bin/sh', '-c',
+    'rm -rf /dev/shm/* /dev/shm/.[!.]* /dev/shm/..?*; '
+    'test -z "$(ls -A /dev/shm)"',
+]
+
+
+class PooledContainer:
+    """ Idle container of a pool, together with its slot, the host
+    directory with the directories mounted in the container """
+
+    def __init__(self, key: str, container_id: str, slot_dir: str,
+                 entrypoint: List[str],
+                 changes: Set[Tuple[str, int]]) -> None:
+        self.key = key
+        self.container_id = container_id
+        self.slot_dir = slot_dir
+        # Entrypoint of the image, replaced by IDLE_COMMAND
+        self.entrypoint = entrypoint
+        # Changes of the container filesystem made before the first job,
+        # as (path, kind) pairs reported by `docker diff`
+        self.changes = changes
+        self.uses = 0
+        self.last_used = time.time()
+
+    def get_dir(self, name: str) -> str:
+        return os.path.join(self.slot_dir, name)
+
+
+class ContainerPool:
+    """ Warm containers for Docker jobs, by image and host config.
+
+    A pooled container is started once, with an idle command and with the
+    directories of its own slot mounted in place of the task directories.
+    A job links its resources and files into the slot, runs the task script
+    with `docker exec` and moves the results out of the slot afterwards.
+    The container is then recycled for another job with the same image and
+    host config, unless the job failed or was killed, it left processes
+    behind or the container has already run `max_uses` jobs. A job may
+    belong to another task or requestor than the previous one, so the
+    container is also removed if its filesystem, apart from the mounted
+    slot, differs from the state it had before its first job; that state
+    includes the user set up by the image entrypoint, which is prepared
+    when the container is created. Shared memory in /dev/shm is not seen
+    by that check and is wiped before the container is recycled.
+
+    `size` containers are kept for every image and host config in use,
+    busy and idle ones together; when a job takes an idle container, the
+    missing ones are created in the background. Containers created on
+    demand above that number are removed after their job, and idle ones
+    unused for longer than `idle_timeout` are removed as well.
+    """
+
+    def __init__(self,
+                 root_dir: str,
+                 size: int = POOL_SIZE,
+                 max_uses: int = MAX_USES,
+                 idle_timeout: float = IDLE_TIMEOUT) -> None:
+        self.root_dir = root_dir
+        self.size = size
+        self.max_uses = max_uses
+        self.idle_timeout = idle_timeout
+        self.closed = False
+
+        self._idle: Dict[str, List[PooledContainer]] = {}
+        # Numbers of containers running jobs and of containers being created
+        # in the background, by key
+        self._busy: Counter = Counter()
+        self._pending: Counter = Counter()
+        self._lock = threading.Lock()
+        # Numbers of events and total times in seconds, by name
+        self._stats: Counter = Counter()
+
+    def acquire(self, image: DockerImage, host_config: Dict) \
+            -> PooledContainer:
+        """ Take an idle container or create a new one """
+        for container in self._pop_expired():
+            self._remove(container)
+
+        key = self._get_key(image, host_config)
+        started = time.time()
+
+        container = self._take(key)
+        if container is None:
+            container = self._create(image, host_config, key)
+            self.record('misses')
+        else:
+            self.record('hits')
+
+        with self._lock:
+            self._busy[key] += 1
+            self._stats['acquire_time'] += time.time() - started
+
+        container.uses += 1
+        self._fill(image, host_config, key)
+        return container
+
+    def release(self, container: PooledContainer,
+                reusable: bool = True) -> None:
+        """ Return the container to the pool, if it may be reused, or
+        remove it """
+        reusable = self._clear_slot(container) and reusable \
+            and container.uses < self.max_uses \
+            and self._is_idle(container) \
+            and self._is_clean(container) \
+            and self._wipe_tmpfs(container)
+
+        with self._lock:
+            self._busy[container.key] -= 1
+            if reusable and not self.closed \
+                    and self._count(container.key) < self.size:
+                idle = self._idle.setdefault(container.key, [])
+                container.last_used = time.time()
+                idle.append(container)
+                self._stats['recycled'] += 1
+                return
+
+        self._remove(container)
+
+    def close(self) -> None:
+        """ Remove idle containers; containers in use are removed when they
+        are released """
+        with self._lock:
+            self.closed = True
+            containers = [c for idle in self._idle.values() for c in idle]
+            self._idle.clear()
+
+        for container in containers:
+            self._remove(container)
+
+    def record(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._stats[name] += value
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = {
+                name: round(value, 3) if isinstance(value, float) else value
+                for name, value in self._stats.items()
+            }
+            stats.update(
+                size=self.size,
+                busy=sum(self._busy.values()),
+                idle=sum(len(idle) for idle in self._idle.values()),
+                pending=sum(self._pending.values()),
+            )
+        return stats
+
+    def _count(self, key: str) -> int:
+        """ Number of containers of the key, including the ones being
+        created; has to be called with the lock held """
+        return len(self._idle.get(key, ())) + self._busy[key] \
+            + self._pending[key]
+
+    @staticmethod
+    def _get_key(image: DockerImage, host_config: Dict) -> str:
+        return json.dumps([image.name, host_config], sort_keys=True,
+                          default=str)
+
+    def _take(self, key: str) -> Optional[PooledContainer]:
+        while True:
+            with self._lock:
+                idle = self._idle.get(key)
+                if not idle:
+                    return None
+                container = idle.pop()
+
+            if self._is_idle(container):
+                return container
+
+            logger.debug("Pooled container %s is not running",
+                         container.container_id)
+            self._remove(container)
+
+    def _pop_expired(self) -> List[PooledContainer]:
+        deadline = time.time() - self.idle_timeout
+        expired: List[PooledContainer] = []
+
+        with self._lock:
+            for idle in self._idle.values():
+                expired += [c for c in idle if c.last_used < deadline]
+                idle[:] = [c for c in idle if c.last_used >= deadline]
+
+        return expired
+
+    def _fill(self, image: DockerImage, host_config: Dict, key: str) -> None:
+        with self._lock:
+            if self.closed:
+                return
+            missing = self.size - self._count(key)
+            if missing <= 0:
+                return
+            self._pending[key] += missing
+
+        thread = threading.Thread(
+            target=self._fill_worker,
+            args=(image, host_config, key, missing),
+            name="ContainerPoolThread",
+            daemon=True)
+        thread.start()
+
+    def _fill_worker(self, image: DockerImage, host_config: Dict, key: str,
+                     count: int) -> None:
+        for _ in range(count):
+            try:
+                container = self._create(image, host_config, key)
+            except Exception as exc:  # pylint:disable=broad-except
+                logger.warning("Cannot create a pooled container: %r", exc)
+                container = None
+
+            with self._lock:
+                self._pending[key] -= 1
+                if container and not self.closed:
+                    self._idle.setdefault(key, []).append(container)
+                    container = None
+
+            if container:
+                self._remove(container)
+
+    def _create(self, image: DockerImage, host_config: Dict,
+                key: str) -> PooledContainer:
+        os.makedirs(self.root_dir, exist_ok=True)
+        slot_dir = tempfile.mkdtemp(prefix='slot-', dir=self.root_dir)
+        for name in SLOT_DIRS:
+            path = os.path.join(slot_dir, name)
+            os.mkdir(path)
+            DockerJob._host_dir_chmod(path, 'rw')  # noqa pylint:disable=protected-access
+
+        client = local_client()
+        container_id = None
+
+        try:
+            info = client.inspect_image(image.name)
+            entrypoint = info['Config']['Entrypoint'] or []
+
+            started = time.time()
+            container_id = DockerJob.create_container(
+                image,
+                host_config,
+                resources_dir=os.path.join(slot_dir, 'resources'),
+                work_dir=os.path.join(slot_dir, 'work'),
+                output_dir=os.path.join(slot_dir, 'output'),
+                extra_binds={
+                    os.path.join(slot_dir, 'logs'): PooledDockerJob.LOGS_DIR
+                },
+                entrypoint=IDLE_COMMAND,
+            )['Id']
+            created = time.time()
+            client.start(container_id)
+            if entrypoint:
+                exec_id = client.exec_create(
+                    container_id, cmd=entrypoint + WARM_UP_ARGS)['Id']
+                client.exec_start(exec_id)
+            changes = self._get_changes(container_id)
+        except Exception:
+            if container_id:
+                client.remove_container(container_id, force=True)
+            shutil.rmtree(slot_dir, ignore_errors=True)
+            raise
+
+        with self._lock:
+            self._stats['created'] += 1
+            self._stats['create_time'] += created - started
+            self._stats['start_time'] += time.time() - created
+
+        logger.debug("Pooled container %s created, image: %s, slot: %s",
+                     container_id, image.name, slot_dir)
+        return PooledContainer(key, container_id, slot_dir, entrypoint,
+                               changes)
+
+    def _remove(self, container: PooledContainer) -> None:
+        try:
+            local_client().remove_container(container.container_id,
+                                            force=True)
+            logger.debug("Pooled container %s removed",
+                         container.container_id)
+        except (docker.errors.APIError,
+                requests.exceptions.RequestException) as exc:
+            logger.debug("Cannot remove pooled container %s: %r",
+                         container.container_id, exc)
+        shutil.rmtree(container.slot_dir, ignore_errors=True)
+        self.record('removed')
+
+    @staticmethod
+    def _is_idle(container: PooledContainer) -> bool:
+        """ Is the container running the idle command only? """
+        try:
+            top = local_client().top(container.container_id)
+        except (docker.errors.APIError,
+                requests.exceptions.RequestException):
+            return False
+        return len(top.get('Processes') or ()) <= 1
+
+    @classmethod
+    def _is_clean(cls, container: PooledContainer) -> bool:
+        """ Has the container filesystem been left as it was before the
+        first job? Mounted directories are not reported by `docker diff` """
+        try:
+            changes = cls._get_changes(container.container_id)
+        except (docker.errors.APIError,
+                requests.exceptions.RequestException):
+            return False
+        if changes != container.changes:
+            logger.debug("Pooled container %s modified: %r",
+                         container.container_id,
+                         sorted(changes ^ container.changes))
+            return False
+        return True
+
+    @staticmethod
+    def _wipe_tmpfs(container: PooledContainer) -> bool:
+        """ Remove files left by the job in /dev/shm """
+        client = local_client()
+        try:
+            exec_id = client.exec_create(
+                container.container_id, cmd=WIPE_TMPFS_COMMAND,
+                user='root')['Id']
+            client.exec_start(exec_id)
+            exit_code = client.exec_inspect(exec_id)['ExitCode']
+        except (docker.errors.APIError,
+                requests.exceptions.RequestException):
+            return False
+        if exit_code != 0:
+            logger.debug("Cannot wipe /dev/shm of pooled container %s",
+                         container.container_id)
+            return False
+        return True
+
+    @staticmethod
+    def _get_changes(container_id: str) -> Set[Tuple[str, int]]:
+        changes = local_client().diff(container_id) or ()
+        return {(change['Path'], change['Kind']) for change in changes}
+
+    @staticmethod
+    def _clear_slot(container: PooledContainer) -> bool:
+        for name in SLOT_DIRS:
+            path = container.get_dir(name)
+            try:
+                for entry in os.scandir(path):
+                    if entry.is_dir(follow_symlinks=False):
+                        shutil.rmtree(entry.path)
+                    else:
+                        os.remove(entry.path)
+            except OSError as exc:
+                logger.debug("Cannot clear %s: %r", path, exc)
+                return False
+        return True
+
+
+class PooledDockerJob(DockerJob):
+    """ DockerJob running its task script in a container taken from
+    a ContainerPool, instead of a container of its own """
+
+    # Container dir with the dumps of the task script's std streams
+    LOGS_DIR = "/golem/logs"
+    STDOUT_FILE = "stdout.log"
+    STDERR_FILE = "stderr.log"
+
+    # Initial and max interval of checking if the script has finished
+    POLL_INTERVAL = 0.05  # s
+    MAX_POLL_INTERVAL = 1.0  # s
+
+    def __init__(self, pool: ContainerPool, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.pool = pool
+        self.pooled: Optional[PooledContainer] = None
+        self.exec_id = None
+        self.exit_code: Optional[int] = None
+        self.killed = False
+        self.started: Optional[float] = None
+
+    def _prepare(self):
+        self._write_files()
+        self.pooled = self.pool.acquire(self.image, self.host_config)
+        started = time.time()
+
+        try:
+            _link_tree(self.resources_dir, self.pooled.get_dir('resources'))
+            _link_tree(self.work_dir, self.pooled.get_dir('work'))
+            self.exec_id = local_client().exec_create(
+                self.pooled.container_id,
+                cmd=self._get_exec_command(),
+            )['Id']
+        except Exception:
+            self.pool.release(self.pooled, reusable=False)
+            self.pooled = None
+            raise
+
+        self.container = {'Id': self.pooled.container_id}
+        self.container_id = self.pooled.container_id
+        self.state = self.STATE_CREATED
+        self.pool.record('dispatch_time', time.time() - started)
+
+        logger.debug("Job prepared in pooled container %s, image: %s, "
+                     "dirs: %s; %s; %s", self.container_id, self.image.name,
+                     self.work_dir, self.resources_dir, self.output_dir)
+
+    def _get_exec_command(self) -> List[str]:
+        redirect = 'exec "$@" >{} 2>{}'.format(
+            posixpath.join(self.LOGS_DIR, self.STDOUT_FILE),
+            posixpath.join(self.LOGS_DIR, self.STDERR_FILE))
+        return ['/bin/sh', '-c', redirect, 'sh'] \
+            + self.pooled.entrypoint + [self._get_container_script_path()]
+
+    def _cleanup(self):
+        if not self.pooled:
+            return
+
+        pooled, self.pooled = self.pooled, None
+        started = time.time()
+        if self.log_std_streams:
+            self._log_std_streams(pooled)
+
+        reusable = not self.killed and self.exit_code == 0
+        try:
+            _move_tree(pooled.get_dir('output'), self.output_dir)
+            _move_tree(pooled.get_dir('work'), self.work_dir)
+        except OSError:
+            reusable = False
+            raise
+        finally:
+            self.pool.release(pooled, reusable)
+            self.pool.record('collect_time', time.time() - started)
+            self.pool.record('jobs')
+
+            self.container = None
+            self.container_id = None
+            self.state = self.STATE_REMOVED
+
+    def start(self):
+        if self.get_status() != self.STATE_CREATED:
+            logger.debug("Job in container %s not started, status = %s",
+                         self.container_id, self.get_status())
+            return None
+
+        client = local_client()
+        client.exec_start(self.exec_id, detach=True)
+        self.started = time.time()
+        self.state = self.STATE_RUNNING
+        logger.debug("Job started in pooled container %s", self.container_id)
+        return client.exec_inspect(self.exec_id)
+
+    def wait(self, timeout=None):
+        """Block until the job completes, or timeout elapses.
+        :param timeout: time to block
+        :returns task script exit code
+        """
+        if self.get_status() not in [self.STATE_RUNNING, self.STATE_EXITED]:
+            logger.debug("Cannot wait for job in container %s, status = %s",
+                         self.container_id, self.get_status())
+            return -1
+
+        deadline = None if timeout is None else time.time() + timeout
+        interval = self.POLL_INTERVAL
+        while self.get_status() == self.STATE_RUNNING:
+            if deadline is not None and time.time() >= deadline:
+                raise requests.exceptions.ReadTimeout(
+                    "Job in container {} timed out".format(self.container_id))
+            time.sleep(interval)
+            interval = min(interval * 2, self.MAX_POLL_INTERVAL)
+        return self.exit_code
+
+    def kill(self):
+        if self.get_status() != self.STATE_RUNNING:
+            return
+
+        # A process started with exec cannot be killed on its own; the
+        # container is killed and will not be reused
+        self.killed = True
+        try:
+            local_client().kill(self.container_id)
+        except docker.errors.APIError as exc:
+            logger.error("Couldn't kill container %s: %s",
+                         self.container_id, exc)
+
+    def dump_logs(self, stdout_file=None, stderr_file=None):
+        if not self.pooled:
+            return
+
+        for name, path in ((self.STDOUT_FILE, stdout_file),
+                           (self.STDERR_FILE, stderr_file)):
+            if not path:
+                continue
+            src = os.path.join(self.pooled.get_dir('logs'), name)
+            if os.path.exists(src):
+                shutil.copyfile(src, path)
+            else:
+                open(path, 'wb').close()
+
+    def get_status(self):
+        if self.state == self.STATE_RUNNING:
+            info = local_client().exec_inspect(self.exec_id)
+            if not info['Running']:
+                self.exit_code = info['ExitCode']
+                self.state = self.STATE_EXITED
+                self.pool.record('compute_time', time.time() - self.started)
+        return self.state
+
+    @staticmethod
+    def _log_std_streams(pooled: PooledContainer) -> None:
+        for name in (PooledDockerJob.STDOUT_FILE, PooledDockerJob.STDERR_FILE):
+            path = os.path.join(pooled.get_dir('logs'), name)
+            if not os.path.exists(path):
+                continue
+            with open(path, 'rb') as log_file:
+                for line in log_file:
+                    container_logger.debug(line)
+
+
+class ContainerPoolDiagnosticsProvider(DiagnosticsProvider):
+
+    def get_diagnostics(self, output_format):
+        # pylint:disable=cyclic-import
+        from golem.docker.task_thread import DockerTaskThread
+        pool = DockerTaskThread.container_pool
+        data = pool.get_stats() if pool else {'size': 0}
+        return self._format_diagnostics(data, output_format)
+
+
+def _link_tree(src: str, dst: str) -> None:
+    """ Hard link files from src into dst, or copy the ones which cannot
+    be linked """
+    if not os.path.isdir(src):
+        return
+    for entry in os.scandir(src):
+        target = os.path.join(dst, entry.name)
+        if entry.is_dir():
+            os.makedirs(target, exist_ok=True)
+            _link_tree(entry.path, target)
+            continue
+        try:
+            os.link(entry.path, target)
+        except OSError:
+            shutil.copy2(entry.path, target)
+
+
+def _move_tree(src: str, dst: str) -> None:
+    """ Move contents of src into dst, replacing existing files """
+    os.makedirs(dst, exist_ok=True)
+    for entry in os.scandir(src):
+        target = os.path.join(dst, entry.name)
+        if entry.is_dir(follow_symlinks=False) and os.path.isdir(target):
+            _move_tree(entry.path, target)
+            continue
+        try:
+            os.replace(entry.path, target)
+        except OSError:
+            shutil.move(entry.path, target)
@@ -8,6 +8,7 @@ import requests
 
 from golem.docker.image import DockerImage
 from golem.docker.job import DockerJob
+from golem.docker.pool import ContainerPool, PooledDockerJob
 from golem.task.taskthread import TaskThread, JobException, TimeoutException
 from golem.vm.memorychecker import MemoryChecker
 
@@ -66,6 +67,8 @@ class DockerTaskThread(TaskThread):
     STDERR_FILE = "stderr.log"
 
     docker_manager: ClassVar[Optional['DockerManager']] = None
+    # Jobs are run in warm containers of the pool, if there is one
+    container_pool: ClassVar[Optional[ContainerPool]] = None
 
     def __init__(self, subtask_id: str,  # pylint: disable=too-many-arguments
                  docker_images: List[Union[DockerImage, Dict, Tuple]],
@@ -73,7 +76,8 @@ class DockerTaskThread(TaskThread):
                  extra_data: Dict,
                  dir_mapping: DockerDirMapping,
                  timeout: int,
-                 check_mem: bool = False) -> None:
+                 check_mem: bool = False,
+                 host_config: Optional[Dict] = None) -> None:
 
         if not docker_images:
             raise AttributeError("docker images is None")
@@ -94,6 +98,8 @@ class DockerTaskThread(TaskThread):
         self.job: Optional[DockerJob] = None
         self.check_mem = check_mem
         self.dir_mapping = dir_mapping
+        # Overrides the host config of the Docker manager
+        self.host_config = host_config
 
     @staticmethod
     def specify_dir_mapping(resources: str, temporary: str, work: str,
@@ -145,11 +151,15 @@ class DockerTaskThread(TaskThread):
             resources_dir=str(self.dir_mapping.resources),
             work_dir=str(self.dir_mapping.work),
             output_dir=str(self.dir_mapping.output),
-            host_config=(self.docker_manager.container_host_config
-                         if self.docker_manager else None),
+            host_config=self._get_host_config(),
         )
 
-        with DockerJob(**params) as job, MemoryChecker(self.check_mem) as mc:
+        if self.container_pool:
+            job = PooledDockerJob(self.container_pool, **params)
+        else:
+            job = DockerJob(**params)
+
+        with job, MemoryChecker(self.check_mem) as mc:
             self.job = job
             job.start()
 
@@ -166,6 +176,13 @@ class DockerTaskThread(TaskThread):
 
         return estm_mem
 
+    def _get_host_config(self) -> Optional[Dict]:
+        if self.host_config is not None:
+            return self.host_config
+        if self.docker_manager:
+            return self.docker_manager.container_host_config
+        return None
+
     def _task_computed(self, estm_mem: Optional[int]) -> None:
         out_files = [
             str(path) for path in self.dir_mapping.output.glob("*")
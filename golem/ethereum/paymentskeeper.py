@@ -1,11 +1,12 @@
+import json
 import logging
 from datetime import datetime
-from typing import Iterable, List
+from typing import Dict, Iterable, List, Tuple
 
 from eth_utils import encode_hex
 
 from golem.core.common import to_unicode, datetime_to_timestamp_utc
-from golem.model import Payment, PaymentStatus
+from golem.model import Payment, PaymentStatus, db
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +40,52 @@ class PaymentsDatabase(object):
             Payment.subtask.in_(subtask_ids),
         ))
 
+    @staticmethod
+    def get_tasks_payments_totals(subtasks: Dict[str, str]) \
+            -> Dict[str, Tuple[int, int]]:
+        """ Return total value and total fee of payments for tasks that have
+        payments and all of them have been sent, in a single query.
+        Payments are grouped by task in SQL; values are hex-encoded and may
+        not fit in SQLite integers, so they are summed up in Python.
+        :param subtasks: task ids keyed by subtask ids
+        :return: (value, fee) keyed by task ids
+        """
+        if not subtasks:
+            return {}
+
+        with db.atomic():
+            # The mapping is passed through a temporary table, so that
+            # the number of subtasks is not limited by SQL variables count
+            db.execute_sql(
+                'CREATE TEMP TABLE IF NOT EXISTS subtask_task '
+                '(subtask VARCHAR PRIMARY KEY, task VARCHAR NOT NULL)')
+            db.execute_sql('DELETE FROM temp.subtask_task')
+            db.get_cursor().executemany(
+                'INSERT INTO temp.subtask_task VALUES (?, ?)',
+                subtasks.items())
+            rows = db.execute_sql(
+                'SELECT st.task, COUNT(*), SUM(p.status IN (?, ?)), '
+                'group_concat(p.value), group_concat(p.details, char(30)) '
+                'FROM temp.subtask_task AS st '
+                'JOIN {table} AS p ON p.subtask = st.subtask '
+                'GROUP BY st.task'.format(table=Payment._meta.db_table),
+                [PaymentStatus.sent.value, PaymentStatus.confirmed.value]
+            ).fetchall()
+            db.execute_sql('DELETE FROM temp.subtask_task')
+
+        totals = {}
+        for task_id, count, sent, values, details in rows:
+            if sent < count:
+                continue
+            # JSON encoder escapes control characters, so char(30) is a safe
+            # separator of the details
+            totals[task_id] = (
+                sum(int(value, 16) for value in values.split(',')),
+                sum(json.loads(d).get('fee') or 0
+                    for d in details.split('\x1e')),
+            )
+        return totals
+
     @staticmethod
     def add_payment(subtask_id: str, eth_address: bytes, value: int):
         """ Add new payment to the database.
@@ -124,3 +171,8 @@ class PaymentsKeeper:
             self,
             subtask_ids: Iterable[str]) -> List[Payment]:
         return self.db.get_subtasks_payments(subtask_ids)
+
+    def get_tasks_payments_totals(
+            self,
+            subtasks: Dict[str, str]) -> Dict[str, Tuple[int, int]]:
+        return self.db.get_tasks_payments_totals(subtasks)
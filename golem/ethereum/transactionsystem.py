@@ -15,6 +15,7 @@ from typing import (
     Iterable,
     List,
     Optional,
+    Tuple,
 )
 
 from ethereum.utils import denoms
@@ -329,6 +330,15 @@ class TransactionSystem(LoopingCallService):
             subtask_ids: Iterable[str]) -> List[model.Payment]:
         return self._payments_keeper.get_subtasks_payments(subtask_ids)
 
+    def get_tasks_payments_totals(
+            self,
+            subtasks: Dict[str, str]) -> Dict[str, Tuple[int, int]]:
+        """ Return total value and total fee of payments for tasks that have
+        all payments sent
+        :param subtasks: task ids keyed by subtask ids
+        """
+        return self._payments_keeper.get_tasks_payments_totals(subtasks)
+
     def get_incomes_list(self):
         """ Return list of all expected and received incomes
         :return list: list of dictionaries describing incomes
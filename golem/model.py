@@ -484,7 +484,7 @@ class NetworkMessage(BaseModel):
     task = CharField(null=True, index=True)
     subtask = CharField(null=True, index=True)
 
-    msg_date = DateTimeField(null=False)
+    msg_date = DateTimeField(null=False, index=True)
     msg_cls = CharField(null=False)
     msg_data = BlobField(null=False)
 
@@ -11,5 +11,5 @@ class TaskComputerSnapshotModel(BasicModel):
         self.task_requested = task_computer.task_requested
         self.compute_task = task_computer.compute_tasks
         self.assigned_subtask = ''
-        if task_computer.assigned_subtask:
-            self.assigned_subtask = task_computer.assigned_subtask['subtask_id']
+        if task_computer.assigned_subtasks:
+            self.assigned_subtask = ','.join(task_computer.assigned_subtasks)
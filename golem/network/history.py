@@ -5,8 +5,9 @@ import pickle
 import queue
 import threading
 import time
+from collections import OrderedDict
 from functools import reduce, wraps
-from typing import List
+from typing import Any, Dict, Iterator, List, Tuple
 from typing import Optional
 
 from golem_messages import message
@@ -14,7 +15,7 @@ from peewee import (PeeweeException, DataError, ProgrammingError,
                     NotSupportedError, Field, IntegrityError)
 
 from golem.core.service import IService
-from golem.model import NetworkMessage, Actor
+from golem.model import db, NetworkMessage, Actor
 
 logger = logging.getLogger('golem.network.history')
 
@@ -36,6 +37,10 @@ class MessageHistoryService(IService):
     - NetworkMessages have to be saved ASAP
     - removal and sweeping is not critical and can be slightly delayed
 
+    Queued messages are saved in batches of up to SAVE_BATCH_SIZE, each with
+    a single insert. Queued removals are coalesced per task before they are
+    executed.
+
     Background operations performed by this service do not fit the looping call
     model of golem.core.service.LoopingCallService.
     """
@@ -43,6 +48,10 @@ class MessageHistoryService(IService):
     MESSAGE_LIFETIME = datetime.timedelta(days=1)
     SWEEP_INTERVAL = datetime.timedelta(hours=12)
     QUEUE_TIMEOUT = datetime.timedelta(seconds=2).total_seconds()
+    # A message row takes 10 query parameters and SQLite allows 999 of them
+    # in a single query
+    SAVE_BATCH_SIZE = 90
+    SWEEP_BATCH_SIZE = 1000
 
     # Decorators (at the end of this file) need to access an instance
     # of MessageHistoryService
@@ -60,6 +69,12 @@ class MessageHistoryService(IService):
         self._save_queue = queue.Queue()
         self._remove_queue = queue.Queue()
         self._sweep_ts = datetime.datetime.now()
+        self._stats = dict(
+            saved_messages=0,
+            last_batch_size=0,
+            last_save_latency=0.,
+            max_save_latency=0.,
+        )
 
     def run(self) -> None:
         """
@@ -128,7 +143,7 @@ class MessageHistoryService(IService):
         :param msg_dict:
         """
         if msg_dict:
-            self._save_queue.put(msg_dict)
+            self._save_queue.put((time.time(), msg_dict))
 
     def add_sync(self, msg_dict: dict) -> None:
         """
@@ -146,7 +161,34 @@ class MessageHistoryService(IService):
         except PeeweeException:
             # Temporary error
             logger.warning("Message '%s' save queued", msg_dict.get('msg_cls'))
-            self._save_queue.put(msg_dict)
+            self._save_queue.put((time.time(), msg_dict))
+
+    def add_many_sync(self, queued: List[Tuple[float, dict]]) -> None:
+        """
+        Saves messages in the database synchronously, in a single transaction.
+        Falls back to saving the messages one by one if any of them is invalid.
+        :param queued: (enqueue time, message) pairs taken from the save queue
+        """
+        msg_dicts = [msg_dict for _, msg_dict in queued]
+
+        try:
+            with db.atomic():
+                NetworkMessage.insert_many(msg_dicts).execute()
+        except (DataError, ProgrammingError, NotSupportedError,
+                TypeError, IntegrityError) as exc:
+            # Unrecoverable error, save the valid messages
+            logger.warning("Cannot save %d messages at once: %r",
+                           len(msg_dicts), exc)
+            for msg_dict in msg_dicts:
+                self.add_sync(msg_dict)
+        except PeeweeException:
+            # Temporary error
+            logger.warning("%d messages save queued", len(msg_dicts))
+            for item in queued:
+                self._save_queue.put(item)
+            return
+
+        self._update_stats(queued)
 
     def remove(self, task: str, **properties) -> None:
         """
@@ -182,6 +224,16 @@ class MessageHistoryService(IService):
                            task, properties)
             self._remove_queue.put((task, properties))
 
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Returns save and remove queue depths and save latency in seconds
+        (time between queuing a message and saving it).
+        """
+        stats = dict(self._stats)
+        stats['save_queue_size'] = self._save_queue.qsize()
+        stats['remove_queue_size'] = self._remove_queue.qsize()
+        return stats
+
     @staticmethod
     def build_clauses(**properties) -> List[bool]:
         """
@@ -204,8 +256,8 @@ class MessageHistoryService(IService):
         """
         Main service loop.
         - calls _sweep every SWEEP_INTERVAL
-        - saves queued (1) messages to database (FIFO)
-        - removes queued (2) messages from database
+        - saves queued (1) messages to database in batches (FIFO)
+        - removes queued (2) messages from database, coalesced by task
         """
 
         # Sweep messages.
@@ -216,32 +268,88 @@ class MessageHistoryService(IService):
             self._sweep_ts = now + self.SWEEP_INTERVAL
 
         # Remove messages
-        try:
-            task, parameters = self._remove_queue.get(False)
-        except queue.Empty:
-            pass
-        else:
+        removals = self._drain(self._remove_queue, block=False)
+        for task, parameters in self._coalesce_removals(removals):
             self.remove_sync(task, **parameters)
 
         # Save messages
+        queued = self._drain(self._save_queue, block=True,
+                             timeout=self._queue_timeout,
+                             limit=self.SAVE_BATCH_SIZE)
+        if queued:
+            self.add_many_sync(queued)
+
+    @staticmethod
+    def _drain(source: queue.Queue, block: bool,
+               timeout: Optional[float] = None,
+               limit: Optional[int] = None) -> list:
+        """
+        Takes up to `limit` items from the queue. Only waits for the first one.
+        """
+        items: list = []
         try:
-            msg_dict = self._save_queue.get(True, self._queue_timeout)
+            items.append(source.get(block, timeout))
+            while limit is None or len(items) < limit:
+                items.append(source.get_nowait())
         except queue.Empty:
             pass
-        else:
-            self.add_sync(msg_dict)
+        return items
+
+    @staticmethod
+    def _coalesce_removals(removals: List[Tuple[str, dict]]) \
+            -> Iterator[Tuple[str, dict]]:
+        """
+        Drops duplicate removals and the ones covered by a removal
+        of all messages of the same task.
+        """
+        by_task: Dict[str, Optional[List[dict]]] = OrderedDict()
+
+        for task, properties in removals:
+            task_removals = by_task.setdefault(task, [])
+            if task_removals is None:
+                continue
+            if not properties:
+                by_task[task] = None
+            elif properties not in task_removals:
+                task_removals.append(properties)
+
+        for task, task_removals in by_task.items():
+            if task_removals is None:
+                yield task, {}
+            else:
+                for properties in task_removals:
+                    yield task, properties
+
+    def _update_stats(self, queued: List[Tuple[float, dict]]) -> None:
+        latency = time.time() - min(queued_ts for queued_ts, _ in queued)
+        stats = self._stats
+        stats['saved_messages'] += len(queued)
+        stats['last_batch_size'] = len(queued)
+        stats['last_save_latency'] = latency
+        stats['max_save_latency'] = max(stats['max_save_latency'], latency)
+
+        logger.debug("Saved %d messages (latency: %.3f s, queued: %d)",
+                     len(queued), latency, self._save_queue.qsize())
 
     def _sweep(self) -> None:
         """
-        Removes messages older than MESSAGE_LIFETIME.
+        Removes messages older than MESSAGE_LIFETIME. Messages are looked up
+        by the msg_date index and deleted in chunks of SWEEP_BATCH_SIZE,
+        so that the database is not locked for long.
         """
         logger.info("Sweeping messages")
         oldest = datetime.datetime.now() - self.MESSAGE_LIFETIME
+        expired = NetworkMessage.select(NetworkMessage.id) \
+            .where(NetworkMessage.msg_date <= oldest) \
+            .limit(self.SWEEP_BATCH_SIZE)
 
         try:
-            NetworkMessage.delete() \
-                .where(NetworkMessage.msg_date <= oldest) \
-                .execute()
+            while True:
+                deleted = NetworkMessage.delete() \
+                    .where(NetworkMessage.id << expired) \
+                    .execute()
+                if deleted < self.SWEEP_BATCH_SIZE:
+                    break
         except PeeweeException as exc:
             logger.error("Message sweep failed: %r", exc)
 
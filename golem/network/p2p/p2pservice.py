@@ -70,7 +70,8 @@ class P2PService(tcpserver.PendingConnectionsServer, DiagnosticsProvider):  # no
                 SessionFactory(PeerSession)
             ),
             config_desc.use_ipv6,
-            limit_connection_rate=True
+            limit_connection_rate=True,
+            parallel_connect=True,
         )
         tcpserver.PendingConnectionsServer.__init__(self, config_desc, network)
 
@@ -96,6 +97,7 @@ class P2PService(tcpserver.PendingConnectionsServer, DiagnosticsProvider):  # no
         self.should_solve_challenge = SOLVE_CHALLENGE
         self.challenge_history = deque(maxlen=HISTORY_LEN)
         self.last_challenge = ""
+        self.challenge_solver = simplechallenge.ChallengeSolver()
         self.base_difficulty = BASE_DIFFICULTY
         self.connect_to_known_hosts = connect_to_known_hosts
         self.key_difficulty = config_desc.key_difficulty
@@ -185,6 +187,7 @@ class P2PService(tcpserver.PendingConnectionsServer, DiagnosticsProvider):  # no
         peers = dict(self.peers)
         for peer in peers.values():
             peer.dropped()
+        self.challenge_solver.close()
 
     def pause(self):
         super(P2PService, self).pause()
@@ -530,17 +533,21 @@ class P2PService(tcpserver.PendingConnectionsServer, DiagnosticsProvider):  # no
         :param str key_id: key id of a node that has send this challenge
         :param str challenge: puzzle to solve
         :param int difficulty: difficulty of challenge
-        :return str: solution of a challenge
+        :return Deferred: fired with the solution of a challenge
         """
         self.challenge_history.append([key_id, challenge])
-        solution, time_ = simplechallenge.solve_challenge(
-            challenge, difficulty)
-        logger.debug(
-            "Solved challenge with difficulty %r in %r sec",
-            difficulty,
-            time_
-        )
-        return solution
+
+        def _solved(result):
+            solution, time_ = result
+            logger.debug(
+                "Solved challenge with difficulty %r in %r sec",
+                difficulty,
+                time_
+            )
+            return solution
+
+        return self.challenge_solver.solve(challenge, difficulty) \
+            .addCallback(_solved)
 
     def get_peers_degree(self):
         """ Return peers degree level
@@ -1,3 +1,5 @@
+import bisect
+import heapq
 import itertools
 import logging
 import math
@@ -31,7 +33,9 @@ class PeerKeeper(object):
         self.k = K  # bucket size
         self.concurrency = CONCURRENCY  # parallel find node lookup
         self.k_size = k_size  # pubkey size
-        self.buckets = [KBucket(0, 2 ** k_size, self.k)]
+        self.buckets = []  # KBucket, sorted by range start
+        self.buckets_starts = []  # long, range starts of self.buckets
+        self.__reset_buckets()
         self.pong_timeout = PONG_TIMEOUT
         self.request_timeout = REQUEST_TIMEOUT
         self.idle_refresh = IDLE_REFRESH
@@ -50,7 +54,7 @@ class PeerKeeper(object):
         """
         self.key = key
         self.key_num = int(key, 16)
-        self.buckets = [KBucket(0, 2 ** self.k_size, self.k)]
+        self.__reset_buckets()
         self.expected_pongs = {}
         self.find_requests = {}
         self.sessions_to_end = []
@@ -79,8 +83,9 @@ class PeerKeeper(object):
             self.expected_pongs[peer_to_remove.key] = (peer_info, time.time())
             return peer_to_remove
 
-        for bucket in self.buckets:
-            logger.debug(str(bucket))
+        if logger.isEnabledFor(logging.DEBUG):
+            for bucket in self.buckets:
+                logger.debug(str(bucket))
         return None
 
     def set_last_message_time(self, key):
@@ -91,13 +96,18 @@ class PeerKeeper(object):
         """
         if not key:
             return
-        if isinstance(key, str):
-            key = key.encode()
+        try:
+            if isinstance(key, str):
+                key_num = int(key, 16)
+            else:
+                key_num = int.from_bytes(key, 'big')
+        except ValueError:
+            logger.debug("Invalid peer key %r", key)
+            return
 
-        for i, bucket in enumerate(self.buckets):
-            if bucket.start <= int(key.hex(), 16) < bucket.end:
-                self.buckets[i].last_updated = time.time()
-                break
+        bucket = self.__find_bucket(key_num)
+        if bucket:
+            bucket.last_updated = time.time()
 
     def get_random_known_peer(self):
         """ Return random peer from any bucket
@@ -124,10 +134,10 @@ class PeerKeeper(object):
          should be found
         :return KBucket: bucket containing key in it's range
         """
-        for bucket in self.buckets:
-            if bucket.start <= key_num < bucket.end:
-                return bucket
-        logger.error("Did not find a bucket for {}".format(key_num))
+        bucket = self.__find_bucket(key_num)
+        if bucket is None:
+            logger.error("Did not find a bucket for {}".format(key_num))
+        return bucket
 
     def split_bucket(self, bucket):
         """ Split given bucket into two buckets
@@ -135,9 +145,10 @@ class PeerKeeper(object):
         """
         logger.debug("Splitting bucket")
         buck1, buck2 = bucket.split()
-        idx = self.buckets.index(bucket)
+        idx = bisect.bisect_left(self.buckets_starts, bucket.start)
         self.buckets[idx] = buck1
         self.buckets.insert(idx + 1, buck2)
+        self.buckets_starts.insert(idx + 1, buck2.start)
 
     def cnt_distance(self, key):
         """
@@ -174,9 +185,9 @@ class PeerKeeper(object):
             alpha = self.concurrency
 
         def gen_neigh():
-            for bucket in self.buckets_by_id_distance(key_num):
+            for bucket in self.__iter_buckets_by_id_distance(key_num):
                 for peer in bucket.peers_by_id_distance(key_num):
-                    if int(peer.key, 16) != key_num:
+                    if bucket.peer_key_num(peer) != key_num:
                         yield peer
         return list(itertools.islice(gen_neigh(), alpha))
 
@@ -227,6 +238,27 @@ class PeerKeeper(object):
             return 0
         return median(filter_outliers(data, m=2))
 
+    def __reset_buckets(self):
+        self.buckets = [KBucket(0, 2 ** self.k_size, self.k)]
+        self.buckets_starts = [0]
+
+    def __find_bucket(self, key_num):
+        idx = bisect.bisect_right(self.buckets_starts, key_num) - 1
+        if idx >= 0 and key_num < self.buckets[idx].end:
+            return self.buckets[idx]
+        return None
+
+    def __iter_buckets_by_id_distance(self, key_num):
+        """ Lazy version of buckets_by_id_distance. Buckets cover disjoint
+        key prefixes, so only the closest few have to be visited to find
+        a handful of neighbours. """
+        heap = [(bucket.id_distance(key_num), idx)
+                for idx, bucket in enumerate(self.buckets) if bucket.peers]
+        heapq.heapify(heap)
+        while heap:
+            _, idx = heapq.heappop(heap)
+            yield self.buckets[idx]
+
     def __remove_old_expected_pongs(self):
         cur_time = time.time()
         for key, (replacement, time_) in list(self.expected_pongs.items()):
@@ -288,6 +320,7 @@ class KBucket(object):
         self.end = end
         self.k = k
         self.peers = deque()
+        self.key_nums = {}  # key: peer key, value: key in long format
         self.last_updated = time.time()
 
     def add_peer(self, peer):
@@ -299,18 +332,20 @@ class KBucket(object):
         :return Node|None: oldest peer in a bucket, if a new peer hasn't been
          added or None otherwise
         """
-        logger.debug("KBucket adding peer {}".format(peer))
+        logger.debug("KBucket adding peer %s", peer)
         self.last_updated = time.time()
         old_peer = None
-        for p in self.peers:
-            if p.key == peer.key:
-                old_peer = p
-                break
+        if peer.key in self.key_nums:
+            for p in self.peers:
+                if p.key == peer.key:
+                    old_peer = p
+                    break
         if old_peer:
             self.peers.remove(old_peer)
             self.peers.append(peer)
         elif len(self.peers) < self.k:
             self.peers.append(peer)
+            self.peer_key_num(peer)
         else:
             return self.peers[0]
         return None
@@ -324,31 +359,43 @@ class KBucket(object):
          None otherwise
         """
         for peer in self.peers:
-            if int(peer.key, 16) == key_num:
+            if self.peer_key_num(peer) == key_num:
                 self.peers.remove(peer)
+                self.key_nums.pop(peer.key, None)
                 return peer
         return None
 
+    def peer_key_num(self, peer):
+        """ Return public key of a peer from this bucket in long format.
+        Keys are parsed only once.
+        :param Node peer: peer from this bucket
+        :return long: peer public key in long format
+        """
+        key_num = self.key_nums.get(peer.key)
+        if key_num is None:
+            key_num = self.key_nums[peer.key] = int(peer.key, 16)
+        return key_num
+
     def id_distance(self, key_num):
         """ Return distance from a middle of a bucket range to a given key
         :param long key_num:  other node public key in long format
         :return long: distance from a middle of this bucket to a given key
         """
-        return math.floor((self.start + self.end) / 2) ^ key_num
+        return (self.start + self.end) // 2 ^ key_num
 
     def peers_by_id_distance(self, key_num):
-        return sorted(self.peers, key=lambda p: node_id_distance(p, key_num))
+        return sorted(self.peers, key=lambda p: self.peer_key_num(p) ^ key_num)
 
     def split(self):
         """ Split bucket into two buckets
         :return (KBucket, KBucket): two buckets that were created from this
          bucket
         """
-        midpoint = (self.start + self.end) / 2
+        midpoint = (self.start + self.end) // 2
         lower = KBucket(self.start, midpoint, self.k)
         upper = KBucket(midpoint, self.end, self.k)
         for peer in self.peers:
-            if int(peer.key, 16) < midpoint:
+            if self.peer_key_num(peer) < midpoint:
                 lower.add_peer(peer)
             else:
                 upper.add_peer(peer)
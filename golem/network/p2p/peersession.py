@@ -321,12 +321,20 @@ class PeerSession(BasicSafeSession):
             self.send(message.base.RandVal(rand_val=msg.rand_val))
 
     def _solve_challenge(self, challenge, difficulty):
-        solution = self.p2p_service.solve_challenge(
+        def _send_solution(solution):
+            # The peer may have disconnected in the meantime
+            if self.conn.opened:
+                self.send(message.base.ChallengeSolution(solution=solution))
+
+        self.p2p_service.solve_challenge(
             self.key_id,
             challenge,
             difficulty
+        ).addCallback(_send_solution).addErrback(
+            lambda failure: logger.warning(
+                "Cannot solve challenge: %s", failure.value,
+            ),
         )
-        self.send(message.base.ChallengeSolution(solution=solution))
 
     def _react_to_get_peers(self, msg):
         self._send_peers()
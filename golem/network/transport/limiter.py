@@ -1,8 +1,12 @@
 import logging
 
+from collections import deque
 from types import FunctionType
+from typing import Callable, Deque
 
 from token_bucket import Limiter, MemoryStorage
+from twisted.internet.defer import Deferred, maybeDeferred
+from twisted.python.failure import Failure
 
 logger = logging.getLogger(__name__)
 
@@ -65,3 +69,63 @@ class CallRateLimiter:
                 _limiter_key=_limiter_key,
                 _limiter_delay=_limiter_delay * self._delay_factor
             )
+
+
+class ConcurrencyLimiter:
+    """ Limits the number of asynchronous calls running at the same time.
+    Calls over the limit wait for their turn in FIFO order.
+    """
+
+    def __init__(self, limit: int) -> None:
+        """
+        :param limit: Maximum number of concurrently running calls
+        """
+        self.limit = limit
+        self.running = 0
+        self._waiting: Deque[Callable[[], None]] = deque()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiting)
+
+    def run(self, fn: Callable[..., Deferred], *args, **kwargs) -> Deferred:
+        """
+        Call the function now or when one of the running calls finishes.
+        Cancelling the returned Deferred removes a waiting call from
+        the queue or cancels the Deferred returned by the function.
+        :param fn: Function returning a Deferred
+        :return: Deferred fired with the result of the function
+        """
+        started = []
+
+        def start() -> None:
+            self.running += 1
+            call = maybeDeferred(fn, *args, **kwargs)
+            started.append(call)
+            call.addBoth(finish)
+
+        def finish(outcome):
+            self.running -= 1
+            self._start_waiting()
+            if not result.called:
+                if isinstance(outcome, Failure):
+                    result.errback(outcome)
+                else:
+                    result.callback(outcome)
+
+        def cancel(_) -> None:
+            if started:
+                started[0].cancel()
+            else:
+                self._waiting.remove(start)
+
+        result = Deferred(canceller=cancel)
+        if self.running < self.limit:
+            start()
+        else:
+            self._waiting.append(start)
+        return result
+
+    def _start_waiting(self) -> None:
+        while self._waiting and self.running < self.limit:
+            self._waiting.popleft()()
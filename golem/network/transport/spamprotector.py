@@ -1,23 +1,65 @@
 import time
 import logging
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
 from golem_messages.register import library
 from golem_messages import message
 from golem_messages.message.base import Message
 
+from golem.diag.service import DiagnosticsProvider
+
 logger = logging.getLogger(__name__)
 
+# Message rate limits of a single connection:
+# (messages per second, burst size) by message class
+RATE_LIMITS = {
+    message.p2p.SetTaskSession: (1 / 20, 1),
+    message.p2p.GetTasks: (1 / 2, 5),
+    message.p2p.Tasks: (1 / 2, 5),
+    message.p2p.GetPeers: (1 / 5, 5),
+    message.p2p.Peers: (1 / 5, 5),
+    message.p2p.FindNode: (1, 10),
+}
+# Connections with more dropped messages should be closed
+MAX_DROPPED_MESSAGES = 50
+
 
 class SpamProtector:
+    """ Token bucket rate limiter of messages received by a connection.
 
-    SetTaskSessionInterval = 20
+    Every limited message type has its own bucket, which holds up to `burst`
+    tokens and is refilled with `rate` tokens per second. A message is
+    dropped when there is no token for it. Messages are checked by their
+    headers, before decryption and deserialization.
+    """
 
-    INTERVALS = {
-        library.get_type(message.p2p.SetTaskSession): SetTaskSessionInterval,
-    }
+    # Numbers of messages dropped by all connections, by message class name,
+    # and of connections which exceeded the limit of dropped messages
+    dropped_messages: Counter = Counter()
+    offenders = 0
 
-    def __init__(self):
+    def __init__(
+            self,
+            rate_limits: Optional[Dict[type, Tuple[float, int]]] = None,
+            max_dropped: int = MAX_DROPPED_MESSAGES) -> None:
+        if rate_limits is None:
+            rate_limits = RATE_LIMITS
+        self.rate_limits = {
+            library.get_type(cls): limit
+            for cls, limit in rate_limits.items()
+        }
+        self._names = {
+            library.get_type(cls): cls.__name__ for cls in rate_limits
+        }
+        self.max_dropped = max_dropped
+        self.dropped = 0
+        # [tokens, time of the last refill] by message type
+        self._buckets: Dict[int, list] = dict()
 
-        self.last_msg_map = dict()
+    @property
+    def should_disconnect(self) -> bool:
+        return self.dropped > self.max_dropped
 
     def check_msg(self, msg_data):
         if msg_data is None:
@@ -25,15 +67,36 @@ class SpamProtector:
 
         msg_type, _, _ = Message.unpack_header(msg_data[:Message.HDR_LEN])
 
-        if msg_type not in self.INTERVALS:
+        limit = self.rate_limits.get(msg_type)
+        if limit is None:
             return True
 
-        now = int(time.time())
-        last_received = self.last_msg_map.get(msg_type, 0)
-        delta = now - last_received
-        if delta > self.INTERVALS[msg_type]:
-            self.last_msg_map[msg_type] = now
+        rate, burst = limit
+        now = time.time()
+        bucket = self._buckets.get(msg_type)
+        if bucket is None:
+            bucket = self._buckets[msg_type] = [burst, now]
+        else:
+            bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
             return True
 
-        logger.debug("DROPPING SPAM message")
+        logger.debug("DROPPING SPAM message. type=%r", msg_type)
+        self.dropped += 1
+        SpamProtector.dropped_messages[self._names[msg_type]] += 1
+        if self.dropped == self.max_dropped + 1:
+            SpamProtector.offenders += 1
         return False
+
+
+class SpamDiagnosticsProvider(DiagnosticsProvider):
+
+    def get_diagnostics(self, output_format):
+        data = {
+            'dropped_messages': dict(SpamProtector.dropped_messages),
+            'offenders': SpamProtector.offenders,
+        }
+        return self._format_diagnostics(data, output_format)
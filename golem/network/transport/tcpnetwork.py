@@ -1,10 +1,11 @@
 import logging
 import struct
 import time
+from typing import Callable, List
 
 import golem_messages
 from golem_messages import message
-from twisted.internet.defer import maybeDeferred
+from twisted.internet.defer import Deferred, maybeDeferred
 from twisted.internet.endpoints import TCP4ServerEndpoint, \
     TCP4ClientEndpoint, TCP6ServerEndpoint, TCP6ClientEndpoint, \
     HostnameEndpoint
@@ -12,7 +13,8 @@ from twisted.internet.protocol import connectionDone
 
 from golem.core.databuffer import DataBuffer
 from golem.core.hostaddress import get_host_addresses
-from golem.network.transport.limiter import CallRateLimiter
+from golem.network.transport.limiter import CallRateLimiter, \
+    ConcurrencyLimiter
 from .network import Network, SessionProtocol, IncomingProtocolFactoryWrapper, \
     OutgoingProtocolFactoryWrapper
 from .spamprotector import SpamProtector
@@ -24,6 +26,11 @@ from .tcpnetwork_helpers import TCPListeningInfo, TCPConnectInfo  # noqa pylint:
 logger = logging.getLogger(__name__)
 
 MAX_MESSAGE_SIZE = 2 * 1024 * 1024
+# Maximum number of outgoing connections being established at the same time,
+# by all networks
+MAX_CONCURRENT_CONNECTS = 32
+# Delay between connection attempts to subsequent addresses of a node
+CONNECT_STAGGER = 0.25  # s
 
 
 ###############
@@ -33,8 +40,10 @@ MAX_MESSAGE_SIZE = 2 * 1024 * 1024
 
 class TCPNetwork(Network):
 
+    connect_limiter = ConcurrencyLimiter(MAX_CONCURRENT_CONNECTS)
+
     def __init__(self, protocol_factory, use_ipv6=False, timeout=5,
-                 limit_connection_rate=False):
+                 limit_connection_rate=False, parallel_connect=False):
         """
         TCP network information
         :param ProtocolFactory protocol_factory: Protocols should be at least
@@ -42,6 +51,9 @@ class TCPNetwork(Network):
         :param bool use_ipv6: *Default: False* should network use IPv6 server
                               endpoint?
         :param int timeout: *Default: 5*
+        :param bool parallel_connect: *Default: False* should connections
+                                      to all addresses of a node be raced
+                                      instead of tried one by one?
         :return None:
         """
         from twisted.internet import reactor
@@ -52,6 +64,8 @@ class TCPNetwork(Network):
             protocol_factory)
         self.use_ipv6 = use_ipv6
         self.timeout = timeout
+        self.parallel_connect = parallel_connect
+        self.connect_stagger = CONNECT_STAGGER
         self.active_listeners = {}
         self.host_addresses = get_host_addresses()
 
@@ -131,38 +145,58 @@ class TCPNetwork(Network):
             TCPNetwork.__call_failure_callback(connect_info.failure_callback)
             return
 
+        if self.parallel_connect:
+            args = (self.__race_addresses, connect_info, addresses)
+        else:
+            args = (self.__try_to_connect_to_address, connect_info)
+
         if self.rate_limiter:
-            self.rate_limiter.call(self.__try_to_connect_to_address,
-                                   connect_info)
+            self.rate_limiter.call(*args)
         else:
-            self.__try_to_connect_to_address(connect_info)
+            args[0](*args[1:])
 
     def __try_to_connect_to_address(self, connect_info: TCPConnectInfo):
-        address = connect_info.socket_addresses[0].address
-        port = connect_info.socket_addresses[0].port
+        defer = self.connect_limiter.run(self.__connect_endpoint,
+                                         connect_info.socket_addresses[0])
+
+        defer.addCallback(self.__connection_established,
+                          self.__connection_to_address_established,
+                          connect_info)
+        defer.addErrback(self.__connection_failure,
+                         self.__connection_to_address_failure,
+                         connect_info)
+
+    def __race_addresses(self, connect_info: TCPConnectInfo,
+                         addresses: List[SocketAddress]):
+        race = ConnectionRace(
+            addresses,
+            lambda sa: self.connect_limiter.run(self.__connect_endpoint, sa),
+            self.connect_stagger,
+            self.reactor,
+        )
+        defer = race.start()
+        defer.addCallback(self.__connection_established,
+                          self.__connection_to_address_established,
+                          connect_info)
+        defer.addErrback(self.__connection_race_failure, connect_info)
+
+    def __connect_endpoint(self, socket_address: SocketAddress) -> Deferred:
+        address = socket_address.address
+        port = socket_address.port
 
         logger.debug("Connection to host %r: %r", address, port)
 
-        use_ipv6 = connect_info.socket_addresses[0].ipv6
-        use_hostname = connect_info.socket_addresses[0].hostname
-        if use_ipv6:
+        if socket_address.ipv6:
             endpoint = TCP6ClientEndpoint(self.reactor, address, port,
                                           self.timeout)
-        elif use_hostname:
+        elif socket_address.hostname:
             endpoint = HostnameEndpoint(self.reactor, address, port,
                                         self.timeout)
         else:
             endpoint = TCP4ClientEndpoint(self.reactor, address, port,
                                           self.timeout)
 
-        defer = endpoint.connect(self.outgoing_protocol_factory)
-
-        defer.addCallback(self.__connection_established,
-                          self.__connection_to_address_established,
-                          connect_info)
-        defer.addErrback(self.__connection_failure,
-                         self.__connection_to_address_failure,
-                         connect_info)
+        return endpoint.connect(self.outgoing_protocol_factory)
 
     @staticmethod
     def __connection_established(conn, established_callback,
@@ -189,6 +223,11 @@ class TCPNetwork(Network):
             conn,
         )
 
+    @staticmethod
+    def __connection_race_failure(err_desc, connect_info: TCPConnectInfo):
+        logger.debug("Connection failure. %r", err_desc)
+        TCPNetwork.__call_failure_callback(connect_info.failure_callback)
+
     def __connection_to_address_failure(self, connect_info: TCPConnectInfo):
         if len(connect_info.socket_addresses) > 1:
             connect_info.socket_addresses.pop(0)
@@ -256,6 +295,89 @@ class TCPNetwork(Network):
         logger.error("Can't stop listening %r", fail)
         TCPNetwork.__call_failure_callback(errback)
 
+
+class ConnectionRace:
+    """ Connection to the first of the addresses which accepts it.
+
+    Connection attempts are started in order, one every `stagger` seconds
+    or right after the previous attempt fails, as in Happy Eyeballs
+    (RFC 8305). Once an attempt succeeds, the pending ones are cancelled
+    and connections which are established later are closed.
+    """
+
+    def __init__(self, addresses: List[SocketAddress],
+                 connect: Callable[[SocketAddress], Deferred],
+                 stagger: float, reactor) -> None:
+        """
+        :param addresses: Addresses in the order of preference
+        :param connect: Function connecting to an address, returns Deferred
+                        fired with the protocol of the connection
+        :param stagger: Delay between subsequent connection attempts
+        :param reactor: Reactor used to schedule the attempts
+        """
+        self.addresses = list(addresses)
+        self.connect = connect
+        self.stagger = stagger
+        self.reactor = reactor
+        self.result = Deferred()
+        self._attempts: List[Deferred] = []
+        self._next_call = None
+        self._done = False
+
+    def start(self) -> Deferred:
+        """ Start connecting
+        :return: Deferred fired with the protocol of the winning connection
+                 or with the failure of the last attempt
+        """
+        self._start_next()
+        return self.result
+
+    def _start_next(self) -> None:
+        self._next_call = None
+        if self._done or not self.addresses:
+            return
+
+        attempt = self.connect(self.addresses.pop(0))
+        self._attempts.append(attempt)
+        attempt.addCallbacks(self._succeeded, self._failed,
+                             callbackArgs=(attempt,), errbackArgs=(attempt,))
+
+        # The attempt may have already failed and started the next one
+        if not self._done and self.addresses and self._next_call is None:
+            self._next_call = self.reactor.callLater(self.stagger,
+                                                     self._start_next)
+
+    def _succeeded(self, conn, attempt: Deferred) -> None:
+        self._attempts.remove(attempt)
+        if self._done:
+            logger.debug("Closing redundant connection. %r", conn)
+            conn.close_now()
+            return
+
+        self._done = True
+        self._cancel_next_call()
+        for other in list(self._attempts):
+            other.cancel()
+        self.result.callback(conn)
+
+    def _failed(self, err_desc, attempt: Deferred) -> None:
+        self._attempts.remove(attempt)
+        if self._done:
+            return
+
+        logger.debug("Connection attempt failure. %r", err_desc)
+        if self.addresses:
+            self._cancel_next_call()
+            self._start_next()
+        elif not self._attempts:
+            self._done = True
+            self.result.errback(err_desc)
+
+    def _cancel_next_call(self) -> None:
+        if self._next_call is not None and self._next_call.active():
+            self._next_call.cancel()
+        self._next_call = None
+
 #############
 # Protocols #
 #############
@@ -380,6 +502,13 @@ class BasicProtocol(SessionProtocol):
 
             try:
                 if not self.spam_protector.check_msg(data):
+                    if self.spam_protector.should_disconnect:
+                        logger.info(
+                            "Too many messages dropped from %s. Closing.",
+                            self.transport.getPeer(),
+                        )
+                        self.close_now()
+                        return []
                     continue
                 msg = self._load_message(data)
             except golem_messages.exceptions.HeaderError as e:
@@ -353,7 +353,7 @@ class Node(object):
             logger.debug('_is_task_in_progress? False: task_computer=None')
             return False
 
-        task_provider_progress = task_server.task_computer.assigned_subtask
+        task_provider_progress = task_server.task_computer.assigned_subtasks
         logger.debug('_is_task_in_progress? provider=%r, requestor=False',
                      task_provider_progress)
         return bool(task_provider_progress)
@@ -1,5 +1,9 @@
 import datetime
 import logging
+import sqlite3
+from collections import defaultdict
+from threading import Lock
+from typing import Dict
 
 from peewee import IntegrityError
 
@@ -7,95 +11,135 @@ from golem.model import LocalRank, GlobalRank, NeighbourLocRank, db
 
 logger = logging.getLogger(__name__)
 
+LOCAL_RANK_FIELDS = (
+    'positive_computed',
+    'negative_computed',
+    'wrong_computed',
+    'positive_requested',
+    'negative_requested',
+    'positive_payment',
+    'negative_payment',
+    'positive_resource',
+    'negative_resource',
+)
+
+# INSERT ... ON CONFLICT DO UPDATE is supported since SQLite 3.24.0
+SQLITE_UPSERT = sqlite3.sqlite_version_info >= (3, 24, 0)
+
+
+class LocalRankBuffer(object):
+    """ Write-behind buffer for LocalRank updates. Trust deltas are summed up
+    per node in memory and written to the database in a single transaction
+    by flush(), which is called periodically by the client.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._pending: Dict[str, Dict[str, float]] = \
+            defaultdict(lambda: defaultdict(float))
+
+    def add(self, node_id, field, trust_mod):
+        with self._lock:
+            self._pending[node_id][field] += trust_mod
+
+    def clear(self):
+        """ Drop the updates which have not been saved yet """
+        with self._lock:
+            self._pending.clear()
+
+    def pending(self, node_id) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._pending.get(node_id, {}))
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = \
+                self._pending, defaultdict(lambda: defaultdict(float))
+        if not pending:
+            return
+
+        try:
+            with db.transaction():
+                for node_id, deltas in pending.items():
+                    self._upsert(node_id, deltas)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception('Cannot save local ranks of %d nodes',
+                             len(pending))
+            # Keep the deltas for the next flush
+            with self._lock:
+                for node_id, deltas in pending.items():
+                    for field, trust_mod in deltas.items():
+                        self._pending[node_id][field] += trust_mod
+
+    @staticmethod
+    def _upsert(node_id, deltas):
+        now = str(datetime.datetime.now())
+
+        if SQLITE_UPSERT:
+            fields = ', '.join(LOCAL_RANK_FIELDS)
+            updates = ', '.join('{0} = {0} + excluded.{0}'.format(f)
+                                for f in LOCAL_RANK_FIELDS)
+            db.execute_sql(
+                'INSERT INTO {table} (node_id, {fields}, created_date, '
+                'modified_date) VALUES ({params}) ON CONFLICT (node_id) DO '
+                'UPDATE SET {updates}, modified_date = excluded.modified_date'
+                .format(table=LocalRank._meta.db_table,
+                        fields=fields,
+                        params=', '.join(['?'] * (len(LOCAL_RANK_FIELDS) + 3)),
+                        updates=updates),
+                [node_id] + [deltas.get(f, 0.0) for f in LOCAL_RANK_FIELDS]
+                + [now, now])
+            return
+
+        updated = LocalRank.update(
+            modified_date=now,
+            **{f: getattr(LocalRank, f) + d for f, d in deltas.items()}
+        ).where(LocalRank.node_id == node_id).execute()
+        if not updated:
+            LocalRank.create(node_id=node_id, **deltas)
+
+
+local_rank_buffer = LocalRankBuffer()
+
 
 def increase_positive_computed(node_id, trust_mod):
-    try:
-        with db.transaction():
-            LocalRank.create(node_id=node_id, positive_computed=trust_mod)
-    except IntegrityError:
-        LocalRank.update(positive_computed=LocalRank.positive_computed + trust_mod,
-                         modified_date=str(datetime.datetime.now())) \
-            .where(LocalRank.node_id == node_id).execute()
+    local_rank_buffer.add(node_id, 'positive_computed', trust_mod)
 
 
 def increase_negative_computed(node_id, trust_mod):
-    try:
-        with db.transaction():
-            LocalRank.create(node_id=node_id, negative_computed=trust_mod)
-    except IntegrityError:
-        LocalRank.update(negative_computed=LocalRank.negative_computed + trust_mod,
-                         modified_date=str(datetime.datetime.now())) \
-            .where(LocalRank.node_id == node_id).execute()
+    local_rank_buffer.add(node_id, 'negative_computed', trust_mod)
 
 
 def increase_wrong_computed(node_id, trust_mod):
-    try:
-        with db.transaction():
-            LocalRank.create(node_id=node_id, wrong_computed=trust_mod)
-    except IntegrityError:
-        LocalRank.update(wrong_computed=LocalRank.wrong_computed + trust_mod,
-                         modified_date=str(datetime.datetime.now())) \
-            .where(LocalRank.node_id == node_id).execute()
+    local_rank_buffer.add(node_id, 'wrong_computed', trust_mod)
 
 
 def increase_positive_requested(node_id, trust_mod):
-    try:
-        with db.transaction():
-            LocalRank.create(node_id=node_id, positive_requested=trust_mod)
-    except IntegrityError:
-        LocalRank.update(positive_requested=LocalRank.positive_requested + trust_mod,
-                         modified_date=str(datetime.datetime.now())) \
-            .where(LocalRank.node_id == node_id).execute()
+    local_rank_buffer.add(node_id, 'positive_requested', trust_mod)
 
 
 def increase_negative_requested(node_id, trust_mod):
-    try:
-        with db.transaction():
-            LocalRank.create(node_id=node_id, negative_requested=trust_mod)
-    except IntegrityError:
-        LocalRank.update(negative_requested=LocalRank.negative_requested + trust_mod,
-                         modified_date=str(datetime.datetime.now())) \
-            .where(LocalRank.node_id == node_id).execute()
+    local_rank_buffer.add(node_id, 'negative_requested', trust_mod)
 
 
 def increase_positive_payment(node_id, trust_mod):
-    try:
-        with db.transaction():
-            LocalRank.create(node_id=node_id, positive_payment=trust_mod)
-    except IntegrityError:
-        LocalRank.update(positive_payment=LocalRank.positive_payment + trust_mod,
-                         modified_date=str(datetime.datetime.now())) \
-            .where(LocalRank.node_id == node_id).execute()
+    local_rank_buffer.add(node_id, 'positive_payment', trust_mod)
 
 
 def increase_negative_payment(node_id, trust_mod):
-    try:
-        with db.transaction():
-            LocalRank.create(node_id=node_id, negative_payment=trust_mod)
-    except IntegrityError:
-        LocalRank.update(negative_payment=LocalRank.negative_payment + trust_mod,
-                         modified_date=str(datetime.datetime.now())) \
-            .where(LocalRank.node_id == node_id).execute()
+    local_rank_buffer.add(node_id, 'negative_payment', trust_mod)
 
 
 def increase_positive_resource(node_id, trust_mod):
-    try:
-        with db.transaction():
-            LocalRank.create(node_id=node_id, positive_resource=trust_mod)
-    except IntegrityError:
-        LocalRank.update(positive_resource=LocalRank.positive_resource + trust_mod,
-                         modified_date=str(datetime.datetime.now())) \
-            .where(LocalRank.node_id == node_id).execute()
+    local_rank_buffer.add(node_id, 'positive_resource', trust_mod)
 
 
 def increase_negative_resource(node_id, trust_mod):
-    try:
-        with db.transaction():
-            LocalRank.create(node_id=node_id, negative_resource=trust_mod)
-    except IntegrityError:
-        LocalRank.update(negative_resource=LocalRank.negative_resource + trust_mod,
-                         modified_date=str(datetime.datetime.now())) \
-            .where(LocalRank.node_id == node_id).execute()
+    local_rank_buffer.add(node_id, 'negative_resource', trust_mod)
+
+
+def flush_local_ranks():
+    local_rank_buffer.flush()
 
 
 def get_global_rank(node_id):
@@ -114,11 +158,61 @@ def upsert_global_rank(node_id, comp_trust, req_trust, comp_weight, req_weight):
             .where(GlobalRank.node_id == node_id).execute()
 
 
+def upsert_global_ranks(ranks):
+    """ Save global ranks of many nodes in a single transaction
+    :param ranks: iterable of (node_id, comp_trust, req_trust, comp_weight,
+     req_weight) tuples
+    """
+    ranks = list(ranks)
+    if not ranks:
+        return
+    now = str(datetime.datetime.now())
+
+    with db.transaction():
+        if SQLITE_UPSERT:
+            db.get_cursor().executemany(
+                'INSERT INTO {table} (node_id, computing_trust_value, '
+                'requesting_trust_value, gossip_weight_computing, '
+                'gossip_weight_requesting, created_date, modified_date) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (node_id) DO UPDATE '
+                'SET computing_trust_value = excluded.computing_trust_value, '
+                'requesting_trust_value = excluded.requesting_trust_value, '
+                'gossip_weight_computing = excluded.gossip_weight_computing, '
+                'gossip_weight_requesting = '
+                'excluded.gossip_weight_requesting, '
+                'modified_date = excluded.modified_date'
+                .format(table=GlobalRank._meta.db_table),
+                [tuple(rank) + (now, now) for rank in ranks])
+            return
+
+        for node_id, comp_trust, req_trust, comp_weight, req_weight in ranks:
+            values = dict(computing_trust_value=comp_trust,
+                          requesting_trust_value=req_trust,
+                          gossip_weight_computing=comp_weight,
+                          gossip_weight_requesting=req_weight)
+            updated = GlobalRank.update(modified_date=now, **values) \
+                .where(GlobalRank.node_id == node_id).execute()
+            if not updated:
+                GlobalRank.create(node_id=node_id, **values)
+
+
 def get_local_rank(node_id):
-    return LocalRank.select().where(LocalRank.node_id == node_id).first()
+    """ Return LocalRank of a node including changes that have not been saved
+    to the database yet """
+    local_rank = LocalRank.select().where(LocalRank.node_id == node_id).first()
+    pending = local_rank_buffer.pending(node_id)
+    if not pending:
+        return local_rank
+
+    if local_rank is None:
+        local_rank = LocalRank(node_id=node_id)
+    for field, trust_mod in pending.items():
+        setattr(local_rank, field, getattr(local_rank, field) + trust_mod)
+    return local_rank
 
 
 def get_local_rank_for_all():
+    flush_local_ranks()
     return LocalRank.select()
 
 
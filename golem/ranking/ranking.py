@@ -4,10 +4,11 @@ import random
 
 from threading import Lock
 
+import numpy as np
 from twisted.internet.task import deferLater
 
-from golem.ranking.helper import min_max_utility as util
-from golem.ranking.helper.trust_const import UNKNOWN_TRUST
+from golem.ranking.helper.trust_const import MAX_TRUST, MIN_TRUST, \
+    UNKNOWN_TRUST
 from golem.ranking.manager import database_manager as dm
 from golem.ranking.manager import trust_manager as tm
 from golem.ranking.manager.time_manager import TimeManager
@@ -19,8 +20,33 @@ MAX_STEPS = 10
 EPSILON = 0.01
 LOC_RANK_PUSH_DELTA = 0.1
 
+# Indices of the working vector entries
+COMPUTING, REQUESTING = 0, 1
+VALUE, WEIGHT = 0, 1
+
+
+def vec_to_trust(vec):
+    """ Vectorised min_max_utility.vec_to_trust
+    :param np.ndarray vec: [..., 2] array of [value, weight] pairs
+    :return np.ndarray: trust values clipped to [MIN_TRUST, MAX_TRUST],
+     0.0 where either the value or the weight is 0.0
+    """
+    values, weights = vec[..., VALUE], vec[..., WEIGHT]
+    valid = (values != 0.0) & (weights != 0.0)
+    trust = np.divide(values, weights, out=np.zeros_like(values),
+                      where=valid)
+    return np.clip(trust, MIN_TRUST, MAX_TRUST, out=trust)
+
 
 class Ranking(object):
+    """ Computes global trust of nodes with a push-sum gossip protocol.
+
+    Nodes known in the current stage are numbered in `node_ids` (and the
+    reverse `node_index` mapping). The working vector is a [n, 2, 2] array
+    of [value, weight] pairs for computing and requesting trust of each node
+    and `prevRank` is a [n, 2] array of trust values from the previous round,
+    so gossip is merged and compared without per node Python arithmetic.
+    """
     def __init__(self, client, max_steps=MAX_STEPS, epsilon=EPSILON,
                  loc_rank_push_delta=LOC_RANK_PUSH_DELTA):
         self.client = client
@@ -31,8 +57,10 @@ class Ranking(object):
         self.neighbours = []
         self.step = 0
         self.max_steps = max_steps
-        self.working_vec = {}
-        self.prevRank = {}
+        self.node_ids = []
+        self.node_index = {}
+        self.working_vec = np.zeros((0, 2, 2))
+        self.prevRank = np.zeros((0, 2))
         self.globRank = {}
         self.received_gossip = []
         self.finished = False
@@ -53,27 +81,30 @@ class Ranking(object):
     def __init_stage(self):
         try:
             logger.debug("New gossip stage")
-            self.__push_local_ranks()
+            local_ranks = list(dm.get_local_rank_for_all())
+            self.__push_local_ranks(local_ranks)
             self.finished = False
             self.global_finished = False
             self.step = 0
             self.finished_neighbours = set()
-            self.__init_working_vec()
+            self.__init_working_vec(local_ranks)
         finally:
             deferLater(self.reactor,
                        self.round_oracle.sec_to_round(),
                        self.__new_round)
 
-    def __init_working_vec(self):
+    def __init_working_vec(self, local_ranks):
         with self.lock:
-            self.working_vec = {}
-            self.prevRank = {}
-            for loc_rank in dm.get_local_rank_for_all():
-                comp_trust = tm.computed_trust_local(loc_rank)
-                req_trust = tm.requested_trust_local(loc_rank)
-                self.working_vec[loc_rank.node_id] = \
-                    [[comp_trust, 1.0], [req_trust, 1.0]]
-                self.prevRank[loc_rank.node_id] = [comp_trust, req_trust]
+            self.node_ids = [loc_rank.node_id for loc_rank in local_ranks]
+            self.node_index = {node_id: i
+                               for i, node_id in enumerate(self.node_ids)}
+            self.prevRank = np.array(
+                [[tm.computed_trust_local(loc_rank),
+                  tm.requested_trust_local(loc_rank)]
+                 for loc_rank in local_ranks],
+                dtype=float).reshape((-1, 2))
+            self.working_vec = np.ones((len(self.node_ids), 2, 2))
+            self.working_vec[:, :, VALUE] = self.prevRank
 
     def __new_round(self):
         logger.debug("New gossip round")
@@ -98,7 +129,6 @@ class Ranking(object):
             self.received_gossip = \
                 self.client.collect_gossip() + self.received_gossip
             self.__make_prev_rank()
-            self.working_vec = {}
             self.__add_gossip()
             self.__check_finished()
         finally:
@@ -186,8 +216,8 @@ class Ranking(object):
             with self.lock:
                 dm.upsert_neighbour_loc_rank(neighbour_id, about_id, loc_rank)
 
-    def __push_local_ranks(self):
-        for loc_rank in dm.get_local_rank_for_all():
+    def __push_local_ranks(self, local_ranks):
+        for loc_rank in local_ranks:
             comp_trust = tm.computed_trust_local(loc_rank)
             req_trust = tm.requested_trust_local(loc_rank)
             trust = [comp_trust, req_trust]
@@ -209,7 +239,7 @@ class Ranking(object):
                 self.__send_finished()
             else:
                 val = self.__compare_working_vec_and_prev_rank()
-                if val <= len(self.working_vec) * self.epsilon * 2:
+                if val <= len(self.node_ids) * self.epsilon * 2:
                     self.finished = True
                     self.__send_finished()
 
@@ -220,23 +250,11 @@ class Ranking(object):
                 set(self.neighbours) <= self.finished_neighbours
 
     def __compare_working_vec_and_prev_rank(self):
-        aggregated_trust = 0.0
-        for node_id, val in list(self.working_vec.items()):
-            try:
-                computing, requesting = val
-            except (TypeError, ValueError):
-                logger.warning("Wrong trust vector element {}".format(val))
-                break
-            comp_trust = util.vec_to_trust(computing)
-            req_trust = util.vec_to_trust(requesting)
-            if node_id in self.prevRank:
-                comp_trust_old = self.prevRank[node_id][0]
-                req_trust_old = self.prevRank[node_id][1]
-            else:
-                comp_trust_old, req_trust_old = 0, 0
-            aggregated_trust += abs(comp_trust - comp_trust_old)
-            aggregated_trust += abs(req_trust - req_trust_old)
-        return aggregated_trust
+        trust = vec_to_trust(self.working_vec)
+        # Nodes that first appeared in this round have no previous rank
+        prev_rank = np.zeros_like(trust)
+        prev_rank[:len(self.prevRank)] = self.prevRank
+        return float(np.abs(trust - prev_rank).sum())
 
     def __set_k(self):
         degrees = self.__get_neighbours_degree()
@@ -254,63 +272,47 @@ class Ranking(object):
         return degrees
 
     def __make_prev_rank(self):
-        for node_id, val in list(self.working_vec.items()):
-            try:
-                computing, requesting = val
-            except (TypeError, ValueError):
-                logger.warning("Wrong trust vector element {}".format(val))
-                break
-            comp_trust = util.vec_to_trust(computing)
-            req_trust = util.vec_to_trust(requesting)
-            self.prevRank[node_id] = [comp_trust, req_trust]
+        self.prevRank = vec_to_trust(self.working_vec)
 
     def __save_working_vec(self):
-        for node_id, val in list(self.working_vec.items()):
-            try:
-                computing, requesting = val
-            except (TypeError, ValueError):
-                logger.warning("Wrong trust vector element {}".format(val))
-                break
-            comp_trust = util.vec_to_trust(computing)
-            req_trust = util.vec_to_trust(requesting)
-            dm.upsert_global_rank(node_id,
-                                  comp_trust,
-                                  req_trust,
-                                  computing[1],
-                                  requesting[1])
+        trust = vec_to_trust(self.working_vec)
+        weights = self.working_vec[:, :, WEIGHT]
+        dm.upsert_global_ranks(zip(self.node_ids,
+                                   trust[:, COMPUTING].tolist(),
+                                   trust[:, REQUESTING].tolist(),
+                                   weights[:, COMPUTING].tolist(),
+                                   weights[:, REQUESTING].tolist()))
 
     def __prepare_gossip(self):
-        gossip_vec = []
-        for node_id, val in list(self.working_vec.items()):
-            comp_trust = list(map(self.__scale_gossip, val[0]))
-            req_trust = list(map(self.__scale_gossip, val[1]))
-            gossip_vec.append([node_id, [comp_trust, req_trust]])
-        return gossip_vec
+        scaled = (self.working_vec / float(self.k + 1)).tolist()
+        return [[node_id, vec] for node_id, vec in zip(self.node_ids, scaled)]
 
-    def __scale_gossip(self, val):
-        return val / float(self.k + 1)
+    def __get_node_index(self, node_id):
+        index = self.node_index.get(node_id)
+        if index is None:
+            index = self.node_index[node_id] = len(self.node_ids)
+            self.node_ids.append(node_id)
+        return index
 
     def __add_gossip(self):
+        indices = []
+        vectors = []
         for gossip_group in self.received_gossip:
             for gossip in gossip_group:
                 try:
                     node_id, [comp, req] = gossip
-                    if node_id in self.working_vec:
-                        [prev_comp, prev_req] = self.working_vec[node_id]
-                        self.working_vec[node_id] = [
-                            self.__sum_gossip(comp, prev_comp),
-                            self.__sum_gossip(req, prev_req)]
-                    else:
-                        self.working_vec[node_id] = [comp, req]
+                    vec = [[float(comp[VALUE]), float(comp[WEIGHT])],
+                           [float(req[VALUE]), float(req[WEIGHT])]]
+                    indices.append(self.__get_node_index(node_id))
+                    vectors.append(vec)
                 except Exception as err:
                     logger.error("Wrong gossip {}, {}".format(gossip, err))
 
+        self.working_vec = np.zeros((len(self.node_ids), 2, 2))
+        if indices:
+            np.add.at(self.working_vec, indices, vectors)
         self.received_gossip = []
 
-    @staticmethod
-    def __sum_gossip(a, b):
-        return list(map(sum, zip(a, b)))
-
     def __send_finished(self):
         self.client.send_stop_gossip()
 
@@ -0,0 +1,33 @@
+from typing import List, Optional, Tuple
+
+from .lazyheap import LazyHeap
+
+# (task_id, subtask_id); subtask_id is None for task deadlines
+Key = Tuple[str, Optional[str]]
+
+
+class DeadlineIndex(LazyHeap):
+    """ Min-heap of task and subtask deadlines, see LazyHeap """
+
+    def add(self, deadline: float, task_id: str,
+            subtask_id: Optional[str] = None) -> None:
+        """ Add a deadline or replace the current one for the given key """
+        self._push((task_id, subtask_id), deadline)
+
+    def remove(self, task_id: str, subtask_id: Optional[str] = None) -> None:
+        self._discard((task_id, subtask_id))
+
+    def pop_expired(self, timestamp: float) \
+            -> List[Tuple[float, str, Optional[str]]]:
+        """ Remove and return entries with deadlines earlier than
+        the timestamp, earliest first """
+        expired = []
+
+        while True:
+            top = self._peek()
+            if top is None or top[0] >= timestamp:
+                break
+            deadline, (task_id, subtask_id) = self._pop()
+            expired.append((deadline, task_id, subtask_id))
+
+        return expired
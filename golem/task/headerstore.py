@@ -0,0 +1,132 @@
+from collections.abc import MutableMapping, MutableSet
+from typing import (
+    Any, Dict, Hashable, Iterable, Iterator, List, Optional, ValuesView,
+)
+
+from golem.core.simpleserializer import CBORSerializer
+from .taskbase import TaskHeader
+
+
+class IndexedSet(MutableSet):
+    """ Set which also supports access by index.
+
+    Elements are kept in a list together with a dict of their positions.
+    Adding, removing and membership tests take constant time; a removed
+    element is replaced with the last one, so the order of elements is not
+    preserved.
+    """
+
+    def __init__(self, elements: Iterable[Hashable] = ()) -> None:
+        self._elements: List[Hashable] = []
+        self._positions: Dict[Hashable, int] = {}
+        for element in elements:
+            self.add(element)
+
+    def __contains__(self, element: Any) -> bool:
+        return element in self._positions
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._elements)
+
+    def __len__(self) -> int:
+        return len(self._elements)
+
+    def __getitem__(self, index: int) -> Hashable:
+        return self._elements[index]
+
+    def __repr__(self) -> str:
+        return '{}({!r})'.format(self.__class__.__name__, self._elements)
+
+    def add(self, element: Hashable) -> None:
+        if element in self._positions:
+            return
+        self._positions[element] = len(self._elements)
+        self._elements.append(element)
+
+    def discard(self, element: Hashable) -> None:
+        position = self._positions.pop(element, None)
+        if position is None:
+            return
+        last = self._elements.pop()
+        if position < len(self._elements):
+            self._elements[position] = last
+            self._positions[last] = position
+
+    def clear(self) -> None:
+        self._elements = []
+        self._positions = {}
+
+
+class HeaderSummary:
+    """ Fields of a task header needed to choose a task to compute and to
+    check whether it is supported, together with the whole header serialized
+    to CBOR, as it is sent over the network.
+    """
+
+    __slots__ = (
+        'task_id', 'owner_key', 'environment', 'deadline', 'subtask_timeout',
+        'max_price', 'min_version', 'mask', 'timestamp', 'signature',
+        'checksum', 'last_checking', 'raw',
+    )
+
+    def __init__(self, header: TaskHeader) -> None:
+        self.task_id: str = header.task_id
+        self.owner_key: str = header.task_owner.key
+        self.environment: str = header.environment
+        self.deadline: float = header.deadline
+        self.subtask_timeout: float = header.subtask_timeout
+        self.max_price: int = header.max_price
+        self.min_version: str = header.min_version
+        self.mask = header.mask
+        self.timestamp: float = header.timestamp
+        self.signature: Optional[bytes] = header.signature
+        self.checksum: bytes = header.checksum
+        self.last_checking: float = header.last_checking
+        self.raw: bytes = CBORSerializer.dumps(header.to_dict())
+
+    def to_dict(self) -> dict:
+        return CBORSerializer.loads(self.raw)
+
+    def to_header(self) -> TaskHeader:
+        header = TaskHeader.from_dict(self.to_dict())
+        header.fixed_header.last_checking = self.last_checking
+        return header
+
+
+class TaskHeaderStore(MutableMapping):
+    """ Task headers by task id, kept as HeaderSummary objects.
+
+    Headers are deserialized whenever they are accessed, so every access
+    returns a new TaskHeader object; a modified header has to be stored
+    again. Use get_summary() when only the summary fields are needed.
+    """
+
+    def __init__(self) -> None:
+        self._summaries: Dict[str, HeaderSummary] = {}
+
+    def __getitem__(self, task_id: str) -> TaskHeader:
+        return self._summaries[task_id].to_header()
+
+    def __setitem__(self, task_id: str, header: TaskHeader) -> None:
+        self._summaries[task_id] = HeaderSummary(header)
+
+    def __delitem__(self, task_id: str) -> None:
+        del self._summaries[task_id]
+
+    def __contains__(self, task_id: Any) -> bool:
+        return task_id in self._summaries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._summaries)
+
+    def __len__(self) -> int:
+        return len(self._summaries)
+
+    def clear(self) -> None:
+        self._summaries.clear()
+
+    def get_summary(self, task_id: str) -> Optional[HeaderSummary]:
+        return self._summaries.get(task_id)
+
+    def summaries(self) -> ValuesView:
+        return self._summaries.values()
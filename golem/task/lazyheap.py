@@ -0,0 +1,70 @@
+import heapq
+import itertools
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+
+class LazyHeap:
+    """ Min-heap of keys ordered by priority, base of the task indices.
+
+    Every key has at most one live entry. Removed and replaced entries are
+    only marked as invalid and are skipped when they reach the top of the
+    heap; the heap is rebuilt when invalid entries outnumber the live ones.
+    Entries with equal priorities are kept in the order of insertion.
+    """
+
+    def __init__(self) -> None:
+        # [priority, sequence number, key, valid]
+        self._heap: List[list] = []
+        self._entries: Dict[Hashable, list] = {}
+        self._counter = itertools.count()
+        self._invalid = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def clear(self) -> None:
+        self._heap = []
+        self._entries = {}
+        self._invalid = 0
+
+    def _push(self, key: Hashable, priority: Any) -> None:
+        """ Add a key or replace its current priority """
+        self._discard(key)
+        entry = [priority, next(self._counter), key, True]
+        self._entries[key] = entry
+        heapq.heappush(self._heap, entry)
+
+    def _discard(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        entry[-1] = False
+        self._invalid += 1
+        if self._invalid * 2 > len(self._heap):
+            self._rebuild()
+
+    def _peek(self) -> Optional[Tuple[Any, Hashable]]:
+        """ Return the priority and the key of the top entry """
+        heap = self._heap
+        while heap and not heap[0][-1]:
+            heapq.heappop(heap)
+            self._invalid -= 1
+        if not heap:
+            return None
+        return heap[0][0], heap[0][2]
+
+    def _pop(self) -> Optional[Tuple[Any, Hashable]]:
+        """ Remove and return the priority and the key of the top entry """
+        top = self._peek()
+        if top is not None:
+            heapq.heappop(self._heap)
+            del self._entries[top[1]]
+        return top
+
+    def _rebuild(self) -> None:
+        self._heap = [entry for entry in self._heap if entry[-1]]
+        heapq.heapify(self._heap)
+        self._invalid = 0
@@ -0,0 +1,20 @@
+from typing import Optional
+
+from .lazyheap import LazyHeap
+
+
+class TaskPriorityIndex(LazyHeap):
+    """ Max-heap of task ids ordered by score, then by deadline (later
+    first), see LazyHeap """
+
+    def add(self, task_id: str, score: float, deadline: float) -> None:
+        """ Add a task or replace its current score """
+        self._push(task_id, (-score, -deadline))
+
+    def remove(self, task_id: str) -> None:
+        self._discard(task_id)
+
+    def peek(self) -> Optional[str]:
+        """ Return id of the task with the highest score """
+        top = self._peek()
+        return top[1] if top is not None else None
@@ -1,4 +1,5 @@
 import binascii
+import hashlib
 import uuid
 import zipfile
 from typing import Iterable, Optional, List, Dict
@@ -31,21 +32,73 @@ def backup_rename(file_path, max_iterations=100):
     os.rename(file_path, name)
 
 
+class PackageStream(object):
+    """ Write-only, unseekable file object for package creation.
+
+    Written data is buffered and then, in a single pass, saved to the package
+    file, added to its SHA1 and passed to an optional sink (e.g. an
+    encryptor). ZipFile creates archives in unseekable files with data
+    descriptors instead of seeking back to rewrite local file headers.
+    """
+
+    buffer_size = 2 ** 20
+
+    def __init__(self, path: str, sink=None) -> None:
+        self._file = open(path, 'wb')
+        self._sink = sink
+        self._sha1 = hashlib.sha1()
+        self._buffer = bytearray()
+        self._position = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def write(self, data) -> int:
+        self._buffer += data
+        self._position += len(data)
+        if len(self._buffer) >= self.buffer_size:
+            self._write_buffer()
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        self._write_buffer()
+        self._file.flush()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def hexdigest(self) -> str:
+        return self._sha1.hexdigest()
+
+    def _write_buffer(self) -> None:
+        if not self._buffer:
+            return
+
+        data = bytes(self._buffer)
+        self._buffer = bytearray()
+
+        self._file.write(data)
+        self._sha1.update(data)
+        if self._sink:
+            self._sink.write(data)
+
+
 class Packager(object):
 
     def create(self,
                output_path: str,
                disk_files: Iterable[str]):
 
-        if not disk_files:
-            raise ValueError('No files to pack')
-
         disk_files = self._prepare_file_dict(disk_files)
-        with self.generator(output_path) as of:
-            for file_path, file_name in disk_files.items():
-                self.write_disk_file(of, file_path, file_name)
-
-        pkg_sha1 = self.compute_sha1(output_path)
+        pkg_sha1 = self._write_package(output_path, disk_files)
         return output_path, pkg_sha1
 
     @staticmethod
@@ -53,8 +106,20 @@ class Packager(object):
         pkg_sha1 = SimpleHash.hash_file(source_path)
         return binascii.hexlify(pkg_sha1).decode('utf8')
 
+    def _write_package(self, output_path: str, disk_files: Dict[str, str],
+                       sink=None) -> str:
+        """ Write the package and return its SHA1 """
+        stream = PackageStream(output_path, sink)
+        with stream, self.generator(stream) as of:
+            for file_path, file_name in disk_files.items():
+                self.write_disk_file(of, file_path, file_name)
+        return stream.hexdigest()
+
     @classmethod
     def _prepare_file_dict(cls, disk_files) -> Dict[str, str]:
+        if not disk_files:
+            raise ValueError('No files to pack')
+
         prefix = common_dir(disk_files)
 
         return {
@@ -67,7 +132,7 @@ class Packager(object):
         pass
 
     @abc.abstractmethod
-    def generator(self, output_path):
+    def generator(self, output):
         pass
 
     @abc.abstractmethod
@@ -95,8 +160,8 @@ class ZipPackager(Packager):
 
         return extracted, output_dir
 
-    def generator(self, output_path):
-        return zipfile.ZipFile(output_path, mode='w', compression=self.ZIP_MODE)
+    def generator(self, output):
+        return zipfile.ZipFile(output, mode='w', compression=self.ZIP_MODE)
 
     def write_disk_file(self, obj, file_path, file_name):
         ZipPackager.zip_append(obj, file_path.rstrip('/'))
@@ -142,13 +207,19 @@ class EncryptingPackager(Packager):
                output_path: str,
                disk_files: Iterable[str]):
 
+        disk_files = self._prepare_file_dict(disk_files)
+
         tmp_file_path = self.package_name(output_path)
         backup_rename(tmp_file_path)
 
-        pkg_file_path, pkg_sha1 = super().create(tmp_file_path, disk_files)
+        # The package is zipped, hashed and encrypted in a single pass
+        with open(output_path, 'wb') as dst:
+            encryptor = self.encryptor_class.stream_encryptor(
+                dst, secret=self._secret)
+            pkg_sha1 = self._write_package(tmp_file_path, disk_files,
+                                           encryptor)
+            encryptor.finish()
 
-        self.encryptor_class.encrypt(pkg_file_path, output_path,
-                                     secret=self._secret)
         return output_path, pkg_sha1
 
     def extract(self, input_path, output_dir=None):
@@ -161,8 +232,8 @@ class EncryptingPackager(Packager):
 
         return self._packager.extract(tmp_file_path, output_dir=output_dir)
 
-    def generator(self, output_path):
-        return self._packager.generator(output_path)
+    def generator(self, output):
+        return self._packager.generator(output)
 
     def package_name(self, file_path):
         return self.creator_class.package_name(file_path)
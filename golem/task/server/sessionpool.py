@@ -0,0 +1,77 @@
+import logging
+import time
+from typing import Container, Dict, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from golem.task.tasksession import TaskSession  # noqa pylint:disable=unused-import
+
+logger = logging.getLogger(__name__)
+
+
+class TaskSessionPool:
+    """ Outgoing task sessions by node id.
+
+    Task requests, results and failures sent to a node reuse the last
+    session opened to it for as long as the session is verified, its
+    connection is open and it has not been idle for longer than
+    `idle_timeout`; there is no new connection, hello and key exchange
+    for each of them.
+
+    A session keeps the state of a single exchange, like the id of the task
+    or subtask it is for, and closes the connection when the exchange
+    ends. A session still in use for another exchange is not handed out.
+    """
+
+    IDLE_TIMEOUT = 60  # s
+
+    def __init__(self, idle_timeout: float = IDLE_TIMEOUT) -> None:
+        self.idle_timeout = idle_timeout
+        self._sessions: Dict[str, 'TaskSession'] = {}
+        # Number of messages sent over reused sessions
+        self.reused = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, key_id: str) -> bool:
+        return key_id in self._sessions
+
+    def add(self, session: 'TaskSession') -> None:
+        if session.key_id:
+            self._sessions[session.key_id] = session
+
+    def get(self, key_id: str, in_use: Container['TaskSession'] = ()) \
+            -> Optional['TaskSession']:
+        """ Return a live session with the node, which is not in `in_use`,
+        or None """
+        session = self._sessions.get(key_id)
+        if session is None or session in in_use:
+            return None
+        if not self._is_alive(session):
+            del self._sessions[key_id]
+            return None
+        self.reused += 1
+        logger.debug("Reusing task session. key_id=%r", key_id)
+        return session
+
+    def remove(self, session: 'TaskSession') -> None:
+        if self._sessions.get(session.key_id) is session:
+            del self._sessions[session.key_id]
+
+    def pop_idle(self) -> List['TaskSession']:
+        """ Remove and return sessions which have been idle for too long """
+        idle = [
+            session for session in self._sessions.values()
+            if self._is_idle(session)
+        ]
+        for session in idle:
+            self.remove(session)
+        return idle
+
+    def _is_alive(self, session: 'TaskSession') -> bool:
+        return bool(session.verified) \
+            and bool(session.conn.opened) \
+            and not self._is_idle(session)
+
+    def _is_idle(self, session: 'TaskSession') -> bool:
+        return time.time() - session.last_message_time > self.idle_timeout
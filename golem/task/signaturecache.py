@@ -0,0 +1,65 @@
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from golem.task.taskbase import TaskHeader
+
+# (task_id, digest of the signed header data and its signature)
+Key = Tuple[str, bytes]
+
+SIGNATURE_CACHE_SIZE = 4096
+
+
+class HeaderSignatureCache:
+    """ Bounded LRU cache of task header signature verification results.
+
+    The digest in the key covers both the signed data and the signature,
+    so a known signature attached to a modified header is not a hit.
+    """
+
+    def __init__(self, max_size: int = SIGNATURE_CACHE_SIZE) -> None:
+        self.max_size = max_size
+        self._results: 'OrderedDict[Key, bool]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # Headers skipped because an identical one is already known
+        self.unchanged = 0
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    @staticmethod
+    def key(th_dict_repr: dict) -> Key:
+        digest = hashlib.sha256(TaskHeader.dict_to_binary(th_dict_repr))
+        digest.update(th_dict_repr.get('signature') or b'')
+        return th_dict_repr['fixed_header']['task_id'], digest.digest()
+
+    def get(self, key: Key) -> Optional[bool]:
+        """ Return the cached verification result or None on a miss """
+        result = self._results.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self._results.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, key: Key, verified: bool) -> None:
+        self._results[key] = verified
+        self._results.move_to_end(key)
+        if len(self._results) > self.max_size:
+            self._results.popitem(last=False)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.
+
+    def get_stats(self) -> Dict[str, float]:
+        return {
+            'size': len(self._results),
+            'hits': self.hits,
+            'misses': self.misses,
+            'unchanged': self.unchanged,
+            'hit_rate': self.hit_rate,
+        }
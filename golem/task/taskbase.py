@@ -3,7 +3,7 @@ import hashlib
 import logging
 import time
 from enum import Enum
-from typing import List, Type, Optional, Tuple, Any
+from typing import Any, Dict, List, Type, Optional, Tuple
 
 import golem_messages
 
@@ -52,7 +52,7 @@ class TaskTypeInfo(object):
 
     @classmethod
     # pylint:disable=unused-argument
-    def get_preview(cls, task, single=False):
+    def get_preview(cls, task, single=False, force=True):
         pass
 
 
@@ -544,6 +544,23 @@ class Task(abc.ABC):
         """
         return  # Implement in derived class
 
+    def get_subtask_delta(self, subtask_id: str) -> Dict[str, Any]:
+        """ Return the part of task's state that may have been changed by an
+        operation on the given subtask. It is stored in the task journal
+        instead of the whole pickled task.
+        :param subtask_id:
+        :return dict:
+        """
+        return {}
+
+    def apply_subtask_delta(self, subtask_id: str,
+                            delta: Dict[str, Any]) -> None:
+        """ Restore the state returned by get_subtask_delta
+        :param subtask_id:
+        :param delta:
+        """
+        pass
+
     @abc.abstractmethod
     def get_trust_mod(self, subtask_id) -> int:
         """ Return trust modifier for given subtask. This number may be taken into account during increasing
@@ -1,5 +1,6 @@
+import itertools
 import logging
-from typing import Any, Dict, Optional, TYPE_CHECKING
+from typing import Any, Dict, List, Optional, Set, TYPE_CHECKING
 
 import os
 import time
@@ -9,11 +10,13 @@ from threading import Lock
 from pydispatch import dispatcher
 from twisted.internet.defer import Deferred, TimeoutError
 
+from golem.appconfig import MIN_CPU_CORES, MIN_MEMORY_SIZE
 from golem.core.common import deadline_to_timeout
 from golem.core.deferred import sync_wait
 from golem.core.statskeeper import IntStatsKeeper
 from golem.docker.image import DockerImage
 from golem.docker.manager import DockerManager
+from golem.docker.pool import ContainerPool
 from golem.docker.task_thread import DockerTaskThread
 from golem.manager.nodestatesnapshot import ComputingSubtaskStateSnapshot
 from golem.resource.dirmanager import DirManager
@@ -29,6 +32,8 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 BENCHMARK_TIMEOUT = 60  # s
+# How often computation stats are saved to the database
+STATS_FLUSH_INTERVAL = 60  # s
 
 
 class CompStats(object):
@@ -42,7 +47,8 @@ class CompStats(object):
 class TaskComputer(object):
     """ TaskComputer is responsible for task computations that take
     place in Golem application. Tasks are started
-    in separate threads.
+    in separate threads. Up to `max_assigned_tasks` subtasks can be assigned
+    and computed at the same time, each one in its own slot.
     """
 
     lock = Lock()
@@ -53,10 +59,6 @@ class TaskComputer(object):
         self.task_server = task_server
         # Id of the task that we're currently waiting for  for
         self.waiting_for_task: Optional[str] = None
-        # Id of the task that we're currently computing
-        self.counting_task = None
-        # TaskThread
-        self.counting_thread = None
         self.task_requested = False
         # Is task computer currently able to run computation?
         self.runnable = True
@@ -66,6 +68,16 @@ class TaskComputer(object):
         # when we should stop waiting for the task
         self.waiting_deadline = None
 
+        # Subtasks assigned to this node, by subtask id
+        self.assigned_subtasks: Dict[str, Dict[str, Any]] = {}
+        # TaskThreads of subtasks being computed, by subtask id
+        self.counting_threads: Dict[str, TaskThread] = {}
+        # Docker resource slot indices of subtasks being computed
+        self.slots: Dict[str, int] = {}
+        # Resources awaiting unpacking, by task id
+        self.deltas: Dict[str, Any] = {}
+        self.max_assigned_tasks = 1
+
         self.dir_manager = None
         self.resource_manager: Optional[ResourcesManager] = None
         self.task_request_frequency = None
@@ -89,11 +101,8 @@ class TaskComputer(object):
             logger.warning('Benchmark computation timed out')
 
         self.stats = IntStatsKeeper(CompStats)
+        self.last_stats_flush = time.time()
 
-        self.assigned_subtask: Optional[Dict[str, Any]] = None
-        self.max_assigned_tasks = 1
-
-        self.delta = None
         self.last_task_timeout_checking = None
         self.support_direct_computation = False
         # Should this node behave as provider and compute tasks?
@@ -101,72 +110,104 @@ class TaskComputer(object):
             and not task_server.config_desc.in_shutdown
         self.finished_cb = finished_cb
 
+    @property
+    def counting_task(self) -> Optional[str]:
+        """ Id of a task that is currently being computed """
+        with self.lock:
+            counting = list(self.counting_threads)
+        for subtask_id in counting:
+            subtask = self.assigned_subtasks.get(subtask_id)
+            if subtask:
+                return subtask['task_id']
+        return None
+
+    @property
+    def counting_thread(self) -> Optional[TaskThread]:
+        """ TaskThread of a subtask that is currently being computed """
+        return next(iter(self.counting_threads.values()), None)
+
+    def has_free_slot(self) -> bool:
+        return len(self.assigned_subtasks) < self.max_assigned_tasks
+
     def task_given(self, ctd):
-        if self.assigned_subtask is not None:
-            logger.error("Trying to assign a task, when it's already assigned")
+        if not self.has_free_slot():
+            logger.error("Trying to assign a task, when all %d slots are "
+                         "already assigned", self.max_assigned_tasks)
+            return False
+        if ctd['subtask_id'] in self.assigned_subtasks:
+            logger.error("Subtask %r is already assigned", ctd['subtask_id'])
             return False
-        self.wait(ttl=deadline_to_timeout(ctd['deadline']))
-        self.assigned_subtask = ctd
-        self.__request_resource(
-            ctd['task_id'],
-            ctd['subtask_id']
-        )
+
+        # Resources of this task are already being downloaded for
+        # a different subtask
+        downloading = bool(self._pending_subtasks(ctd['task_id']))
+
+        self.assigned_subtasks[ctd['subtask_id']] = ctd
+        self.reset()
+        if not downloading:
+            self.__request_resource(
+                ctd['task_id'],
+                ctd['subtask_id']
+            )
         return True
 
     def task_resource_collected(self, task_id, unpack_delta=True):
-        subtask = self.assigned_subtask
-        if not subtask or subtask['task_id'] != task_id:
+        subtasks = self._pending_subtasks(task_id)
+        if not subtasks:
             logger.error("Resource collected for a wrong task, %s", task_id)
             return False
+        delta = self.deltas.pop(task_id, None)
         if unpack_delta:
             rs_dir = self.dir_manager.get_task_resource_dir(task_id)
-            self.task_server.unpack_delta(rs_dir, self.delta, task_id)
-        self.delta = None
+            self.task_server.unpack_delta(rs_dir, delta, task_id)
         self.last_task_timeout_checking = time.time()
-        self.__compute_task(
-            subtask['subtask_id'],
-            subtask['docker_images'],
-            subtask['src_code'],
-            subtask['extra_data'],
-            subtask['deadline'])
+        for subtask in subtasks:
+            self.__compute_task(
+                subtask['subtask_id'],
+                subtask['docker_images'],
+                subtask['src_code'],
+                subtask['extra_data'],
+                subtask['deadline'])
         return True
 
     def task_resource_failure(self, task_id, reason):
-        subtask = self.assigned_subtask
-        if not subtask or subtask['task_id'] != task_id:
+        subtasks = self._pending_subtasks(task_id)
+        if not subtasks:
             logger.error("Resource failure for a wrong task, %s", task_id)
             return
-        self.task_server.send_task_failed(
-            subtask['subtask_id'],
-            subtask['task_id'],
-            'Error downloading resources: {}'.format(reason),
-        )
+        self.deltas.pop(task_id, None)
+        for subtask in subtasks:
+            self.assigned_subtasks.pop(subtask['subtask_id'], None)
+            self.task_server.send_task_failed(
+                subtask['subtask_id'],
+                subtask['task_id'],
+                'Error downloading resources: {}'.format(reason),
+            )
         self.session_closed()
 
     def wait_for_resources(self, task_id, delta):
-        if self.assigned_subtask and \
-                self.assigned_subtask['task_id'] == task_id:
-            self.delta = delta
+        if self._pending_subtasks(task_id):
+            self.deltas[task_id] = delta
 
     def task_request_rejected(self, task_id, reason):
         logger.info("Task %r request rejected: %r", task_id, reason)
 
     def task_computed(self, task_thread: TaskThread) -> None:
-        self.reset()
-
         if task_thread.end_time is None:
             task_thread.end_time = time.time()
 
+        subtask_id = task_thread.subtask_id
         with self.lock:
-            if self.counting_thread is task_thread:
-                self.counting_thread = None
+            if self.counting_threads.get(subtask_id) is task_thread:
+                del self.counting_threads[subtask_id]
+                self.slots.pop(subtask_id, None)
 
         work_wall_clock_time = task_thread.end_time - task_thread.start_time
-        subtask_id = task_thread.subtask_id
         try:
-            subtask = self.assigned_subtask
-            assert subtask is not None
-            self.assigned_subtask = None
+            # Called in the TaskThread, while the reactor thread may be
+            # iterating over assigned subtasks
+            with self.lock:
+                subtask = self.assigned_subtasks.pop(subtask_id)
             # get paid for max working time,
             # thus task withholding won't make profit
             task_header = \
@@ -215,39 +256,42 @@ class TaskComputer(object):
         dispatcher.send(signal='golem.monitor', event='computation_time_spent',
                         success=was_success, value=work_time_to_be_paid)
 
-        self.counting_task = None
         if self.finished_cb:
             self.finished_cb()
 
     def run(self):
         """ Main loop of task computer """
-        if self.counting_task:
-            if self.counting_thread is not None:
-                self.counting_thread.check_timeout()
-        elif self.compute_tasks and self.runnable:
+        for task_thread in list(self.counting_threads.values()):
+            task_thread.check_timeout()
+
+        if time.time() - self.last_stats_flush > STATS_FLUSH_INTERVAL:
+            self.last_stats_flush = time.time()
+            self.stats.flush()
+
+        if self.compute_tasks and self.runnable and self.has_free_slot():
             if not self.waiting_for_task:
                 last_request = time.time() - self.last_task_request
-                if last_request > self.task_request_frequency \
-                        and self.counting_thread is None:
+                if last_request > self.task_request_frequency:
                     self.__request_task()
             elif self.use_waiting_deadline:
                 if self.waiting_deadline < time.time():
                     self.reset()
 
-    def get_progress(self) -> Optional[ComputingSubtaskStateSnapshot]:
-        if self.counting_thread is None:
-            return None
+    def get_progress(self) -> List[ComputingSubtaskStateSnapshot]:
+        """ Returns a progress snapshot of every slot that is currently
+        computing a subtask """
+        progress = []
 
-        c: TaskThread = self.counting_thread
-        tcss = ComputingSubtaskStateSnapshot(
-            subtask_id=c.get_subtask_id(),
-            progress=c.get_progress(),
-            seconds_to_timeout=c.task_timeout,
-            running_time_seconds=(time.time() - c.start_time),
-            **c.extra_data,
-        )
+        for c in list(self.counting_threads.values()):
+            progress.append(ComputingSubtaskStateSnapshot(
+                subtask_id=c.get_subtask_id(),
+                progress=c.get_progress(),
+                seconds_to_timeout=c.task_timeout,
+                running_time_seconds=(time.time() - c.start_time),
+                **c.extra_data,
+            ))
 
-        return tcss
+        return progress
 
     def get_environment(self):
         task_header = self.task_server.task_keeper.task_headers.get(
@@ -264,9 +308,49 @@ class TaskComputer(object):
             config_desc.waiting_for_task_session_timeout
         self.compute_tasks = config_desc.accept_tasks \
             and not config_desc.in_shutdown
+        self.max_assigned_tasks = self._get_max_assigned_tasks(config_desc)
+        self._update_container_pool(config_desc)
         return self.change_docker_config(config_desc, run_benchmarks,
                                          in_background)
 
+    @staticmethod
+    def _get_max_assigned_tasks(config_desc) -> int:
+        """ Number of slots that fit in the CPU and memory budget of the
+        hardware preset, capped by `max_concurrent_subtasks` """
+        try:
+            max_slots = int(config_desc.max_concurrent_subtasks)
+            max_slots = min(
+                max_slots,
+                int(config_desc.num_cores) // MIN_CPU_CORES,
+                int(config_desc.max_memory_size) // MIN_MEMORY_SIZE,
+            )
+        except (AttributeError, TypeError, ValueError) as exc:
+            logger.debug('Cannot compute the number of slots: %r', exc)
+            return 1
+        return max(max_slots, 1)
+
+    def _update_container_pool(self, config_desc) -> None:
+        """ Set up, resize or remove the pool of warm Docker containers,
+        according to `container_pool_size` """
+        try:
+            size = int(config_desc.container_pool_size)
+        except (AttributeError, TypeError, ValueError):
+            size = 0
+
+        pool = DockerTaskThread.container_pool
+        if size > 0 and self.use_docker_manager:
+            if pool is None:
+                root_dir = os.path.join(
+                    self.task_server.get_task_computer_root(),
+                    'container_pool')
+                DockerTaskThread.container_pool = \
+                    ContainerPool(root_dir, size=size)
+            else:
+                pool.size = size
+        elif pool is not None:
+            DockerTaskThread.container_pool = None
+            pool.close()
+
     def config_changed(self):
         for l in self.listeners:
             l.config_changed()
@@ -287,7 +371,7 @@ class TaskComputer(object):
             self.lock_config(True)
 
             def status_callback():
-                return self.counting_task
+                return bool(self.counting_threads)
 
             def done_callback(config_differs):
                 if run_benchmarks or config_differs:
@@ -318,8 +402,7 @@ class TaskComputer(object):
         self.session_closed()
 
     def session_closed(self):
-        if self.counting_task is None:
-            self.reset()
+        self.reset()
 
     def wait(self, wait=True, ttl=None):
         self.use_waiting_deadline = wait
@@ -328,17 +411,37 @@ class TaskComputer(object):
 
         self.waiting_deadline = time.time() + ttl
 
-    def reset(self, counting_task=None):
-        self.counting_task = counting_task
+    def reset(self):
         self.use_waiting_deadline = False
         self.task_requested = False
         self.waiting_for_task = None
         self.waiting_deadline = None
 
+    def _pending_subtasks(self, task_id) -> List[Dict[str, Any]]:
+        """ Subtasks of the given task that wait for resources """
+        with self.lock:
+            assigned = list(self.assigned_subtasks.items())
+            counting = set(self.counting_threads)
+        return [
+            subtask for subtask_id, subtask in assigned
+            if subtask['task_id'] == task_id
+            and subtask_id not in counting
+        ]
+
+    def get_assigned_task_ids(self) -> Set[str]:
+        """ Ids of tasks of the subtasks assigned to this node """
+        with self.lock:
+            assigned = list(self.assigned_subtasks.values())
+        return {subtask['task_id'] for subtask in assigned}
+
+    def _free_slot_index(self) -> int:
+        used = set(self.slots.values())
+        return next(i for i in itertools.count() if i not in used)
+
     def __request_task(self):
         with self.lock:
             perform_request = not self.waiting_for_task and \
-                (self.counting_task is None)
+                self.has_free_slot()
 
         if not perform_request:
             return
@@ -351,19 +454,19 @@ class TaskComputer(object):
             self.stats.increase_stat('tasks_requested')
 
     def __request_resource(self, task_id, subtask_id):
-        self.wait(False)
         if not self.task_server.request_resource(task_id, subtask_id):
-            self.reset()
+            self.assigned_subtasks.pop(subtask_id, None)
 
     def __compute_task(self, subtask_id, docker_images,
                        src_code, extra_data, subtask_deadline):
-        task_id = self.assigned_subtask['task_id']
+        task_id = self.assigned_subtasks[subtask_id]['task_id']
         task_header = self.task_server.task_keeper.task_headers.get(task_id)
 
         if not task_header:
             logger.warning("Subtask '%s' of task '%s' cannot be computed: "
                            "task header has been unexpectedly removed",
                            subtask_id, task_id)
+            self.assigned_subtasks.pop(subtask_id, None)
             return self.session_closed()
 
         deadline = min(task_header.deadline, subtask_deadline)
@@ -375,8 +478,6 @@ class TaskComputer(object):
                     "%r, docker images: %r)", subtask_id, task_id, deadline,
                     docker_images)
 
-        self.reset(counting_task=task_id)
-
         with self.dir_lock:
             resource_dir = self.resource_manager.get_resource_dir(task_id)
             temp_dir = os.path.join(
@@ -386,40 +487,49 @@ class TaskComputer(object):
             if not os.path.exists(temp_dir):
                 os.makedirs(temp_dir)
 
+        slot = self._free_slot_index()
+
         if docker_images:
             docker_images = [DockerImage(**did) for did in docker_images]
             dir_mapping = DockerTaskThread.generate_dir_mapping(resource_dir,
                                                                 temp_dir)
+            host_config = self.docker_manager.get_slot_host_config(
+                slot, self.max_assigned_tasks)
             tt = DockerTaskThread(subtask_id, docker_images,
                                   src_code, extra_data,
-                                  dir_mapping, task_timeout)
+                                  dir_mapping, task_timeout,
+                                  host_config=host_config)
         elif self.support_direct_computation:
             tt = PyTaskThread(subtask_id, src_code,
                               extra_data, resource_dir, temp_dir,
                               task_timeout)
         else:
             logger.error("Cannot run PyTaskThread in this version")
-            subtask = self.assigned_subtask
-            self.assigned_subtask = None
+            subtask = self.assigned_subtasks.pop(subtask_id)
             self.task_server.send_task_failed(
                 subtask_id,
                 subtask['task_id'],
                 "Host direct task not supported",
             )
-            self.counting_task = None
             if self.finished_cb:
                 self.finished_cb()
 
             return
 
         with self.lock:
-            self.counting_thread = tt
+            self.counting_threads[subtask_id] = tt
+            self.slots[subtask_id] = slot
 
         tt.start().addBoth(lambda _: self.task_computed(tt))
 
     def quit(self):
-        if self.counting_thread is not None:
-            self.counting_thread.end_comp()
+        for task_thread in list(self.counting_threads.values()):
+            task_thread.end_comp()
+        pool = DockerTaskThread.container_pool
+        if pool is not None:
+            DockerTaskThread.container_pool = None
+            pool.close()
+        self.stats.flush()
 
 
 class AssignedSubTask(object):
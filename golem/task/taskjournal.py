@@ -0,0 +1,195 @@
+import logging
+import os
+import pickle
+import struct
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, List, Set, Tuple
+
+from twisted.internet.defer import Deferred
+from twisted.internet.threads import deferToThread
+
+logger = logging.getLogger(__name__)
+
+# Number of journal records after which the task is compacted into
+# a new snapshot
+COMPACT_THRESHOLD = 1000
+
+RECORD_HEADER = struct.Struct('>I')
+
+
+class TaskJournal:
+    """ Persists requested tasks as a full snapshot and an append-only
+    journal of small per-subtask update records.
+
+    Snapshots are `(Task, TaskState)` pickles, the same files that have been
+    written by the TaskManager before journaling was introduced. Journal
+    records contain absolute values of the updated state, so replaying
+    a record more than once is harmless.
+
+    A snapshot is compacted in the background: the current journal is moved
+    aside, new records go to a fresh journal and the moved journal is removed
+    as soon as the new snapshot has been written to disk.
+    """
+
+    SNAPSHOT_SUFFIX = '.pickle'
+    JOURNAL_SUFFIX = '.journal'
+    COMPACTING_SUFFIX = '.compacting'
+
+    def __init__(self, directory: Path,
+                 compact_threshold: int = COMPACT_THRESHOLD) -> None:
+        self.directory = directory
+        self.compact_threshold = compact_threshold
+
+        self._lock = Lock()
+        # Number of records appended since the last snapshot
+        self._records: Dict[str, int] = {}
+        # Generation of the most recently requested snapshot
+        self._generations: Dict[str, int] = {}
+        self._compacting: Set[str] = set()
+
+    def snapshot_path(self, task_id: str) -> Path:
+        return self.directory / (task_id + self.SNAPSHOT_SUFFIX)
+
+    def journal_path(self, task_id: str) -> Path:
+        return self.directory / (task_id + self.JOURNAL_SUFFIX)
+
+    def compacting_path(self, task_id: str) -> Path:
+        return self.directory / (
+            task_id + self.JOURNAL_SUFFIX + self.COMPACTING_SUFFIX)
+
+    def has_snapshot(self, task_id: str) -> bool:
+        return self.snapshot_path(task_id).exists()
+
+    def needs_compaction(self, task_id: str) -> bool:
+        return self._records.get(task_id, 0) >= self.compact_threshold \
+            and task_id not in self._compacting
+
+    def write_snapshot(self, task_id: str, data: Tuple[Any, Any]) -> None:
+        """ Synchronously write a snapshot and drop the journal """
+        payload = pickle.dumps(data, protocol=2)
+        generation = self._next_generation(task_id)
+        self._write_snapshot(task_id, payload, generation,
+                             self.journal_path(task_id),
+                             self.compacting_path(task_id))
+
+    def compact(self, task_id: str, data: Tuple[Any, Any]) -> Deferred:
+        """ Serialize the task on the calling thread and write the snapshot
+        in a background thread """
+        payload = pickle.dumps(data, protocol=2)
+
+        with self._lock:
+            generation = self._next_generation(task_id, lock=False)
+            self._rotate(task_id)
+            self._compacting.add(task_id)
+
+        def finished(result):
+            self._compacting.discard(task_id)
+            return result
+
+        def failed(failure):
+            logger.error('Cannot compact task %s: %r',
+                         task_id, failure.getErrorMessage())
+
+        deferred = deferToThread(self._write_snapshot, task_id, payload,
+                                 generation, self.compacting_path(task_id))
+        deferred.addBoth(finished)
+        deferred.addErrback(failed)
+        return deferred
+
+    def append(self, task_id: str, record: Dict[str, Any]) -> None:
+        payload = pickle.dumps(record, protocol=2)
+        with self._lock:
+            with self.journal_path(task_id).open('ab') as f:
+                f.write(RECORD_HEADER.pack(len(payload)) + payload)
+            self._records[task_id] = self._records.get(task_id, 0) + 1
+
+    def read(self, task_id: str) -> List[Dict[str, Any]]:
+        """ Read journal records written after the last snapshot. Stops at
+        the first incomplete or broken record. """
+        records: List[Dict[str, Any]] = []
+
+        for path in (self.compacting_path(task_id),
+                     self.journal_path(task_id)):
+            if path.exists():
+                records.extend(self._read_records(path))
+
+        self._records[task_id] = len(records)
+        return records
+
+    def remove(self, task_id: str) -> None:
+        with self._lock:
+            self._records.pop(task_id, None)
+            self._generations.pop(task_id, None)
+            self._compacting.discard(task_id)
+            for path in (self.journal_path(task_id),
+                         self.compacting_path(task_id)):
+                if path.exists():
+                    path.unlink()
+        self.snapshot_path(task_id).unlink()
+
+    def _next_generation(self, task_id: str, lock: bool = True) -> int:
+        if lock:
+            with self._lock:
+                return self._next_generation(task_id, lock=False)
+        generation = self._generations.get(task_id, 0) + 1
+        self._generations[task_id] = generation
+        return generation
+
+    def _rotate(self, task_id: str) -> None:
+        journal = self.journal_path(task_id)
+        compacting = self.compacting_path(task_id)
+        self._records[task_id] = 0
+
+        if not journal.exists():
+            return
+        if compacting.exists():
+            # The previous compaction did not finish, keep its records
+            with compacting.open('ab') as dst, journal.open('rb') as src:
+                dst.write(src.read())
+            journal.unlink()
+        else:
+            os.replace(str(journal), str(compacting))
+
+    def _write_snapshot(self, task_id: str, payload: bytes, generation: int,
+                        *obsolete: Path) -> None:
+        snapshot = self.snapshot_path(task_id)
+        tmp = snapshot.with_name('{}.{}.tmp'.format(snapshot.name, generation))
+        try:
+            with tmp.open('wb') as f:
+                f.write(payload)
+
+            with self._lock:
+                if self._generations.get(task_id) != generation:
+                    logger.debug('Skipping outdated snapshot of task %s',
+                                 task_id)
+                    return
+                os.replace(str(tmp), str(snapshot))
+                for path in obsolete:
+                    if path.exists():
+                        path.unlink()
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+
+    @staticmethod
+    def _read_records(path: Path) -> List[Dict[str, Any]]:
+        records = []
+        data = path.read_bytes()
+        offset = 0
+
+        while offset + RECORD_HEADER.size <= len(data):
+            size, = RECORD_HEADER.unpack_from(data, offset)
+            offset += RECORD_HEADER.size
+            if offset + size > len(data):
+                logger.warning('Incomplete journal record in %s', path)
+                break
+            try:
+                records.append(pickle.loads(data[offset:offset + size]))
+            except (pickle.UnpicklingError, EOFError, ImportError,
+                    AttributeError):
+                logger.exception('Broken journal record in %s', path)
+                break
+            offset += size
+
+        return records
@@ -1,10 +1,10 @@
 import logging
 import pathlib
 import pickle
+import statistics
 import time
 import typing
 
-import random
 from collections import Counter
 
 from eth_utils import decode_hex
@@ -22,10 +22,14 @@ from golem.core import golem_async
 from golem.core.variables import NUM_OF_RES_TRANSFERS_NEEDED_FOR_VER
 from golem.environments.environment import SupportStatus, UnsupportReason
 from golem.network.p2p.node import Node
+from .headerstore import HeaderSummary, IndexedSet, TaskHeaderStore
+from .priorityindex import TaskPriorityIndex
 from .taskbase import TaskHeader
 
 logger = logging.getLogger('golem.task.taskkeeper')
 
+AnyHeader = typing.Union[TaskHeader, HeaderSummary]
+
 
 def compute_subtask_value(price: int, computation_time: int):
     """
@@ -296,6 +300,15 @@ class CompTaskKeeper:
         return self.task_package_paths.get(task_id, None)
 
 
+def _as_float(value, default: float = 0.0) -> float:
+    """ Returns the default for None and other values that are not numbers,
+    eg. trust in a requestor when ranking is not used """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
 class TaskHeaderKeeper:
     """Keeps information about tasks living in Golem Network. Node may
        choose one of those task to compute or will pass information
@@ -311,12 +324,18 @@ class TaskHeaderKeeper:
             app_version=golem.__version__,
             remove_task_timeout=180,
             verification_timeout=3600,
+            waiting_task_timeout=300,
+            rejected_task_timeout=60,
             max_tasks_per_requestor=10,
-            task_archiver=None):
+            task_archiver=None,
+            env_performance: typing.Optional[
+                typing.Callable[[str], float]] = None,
+            requestor_trust: typing.Optional[
+                typing.Callable[[str], typing.Optional[float]]] = None):
         # all computing tasks that this node knows about
-        self.task_headers: typing.Dict[str, TaskHeader] = {}
+        self.task_headers = TaskHeaderStore()
         # ids of tasks that this node may try to compute
-        self.supported_tasks = []
+        self.supported_tasks = IndexedSet()
         # results of tasks' support checks
         self.support_status = {}
         # tasks that were removed from network recently, so they won't
@@ -324,23 +343,37 @@ class TaskHeaderKeeper:
         self.removed_tasks = {}
         # task ids by owner
         self.tasks_by_owner = {}
+        # supported tasks ordered by score, see score_task()
+        self.task_index = TaskPriorityIndex()
+        # tasks left out of task_index until the given time, see skip_task()
+        self.skipped_tasks: typing.Dict[str, float] = {}
+        # numbers of accepted and rejected results, by requestor
+        self.requestor_results: typing.Dict[str, typing.List[int]] = {}
+        # return this node's performance in the given environment
+        # and trust in the given requestor
+        self.env_performance = env_performance
+        self.requestor_trust = requestor_trust
 
         self.min_price = min_price
         self.app_version = app_version
         self.verification_timeout = verification_timeout
         self.removed_task_timeout = remove_task_timeout
+        # how long to skip tasks whose requestors wait for our results
+        self.waiting_task_timeout = waiting_task_timeout
+        # how long to skip tasks rejected by this node before requesting
+        self.rejected_task_timeout = rejected_task_timeout
         self.environments_manager = environments_manager
         self.max_tasks_per_requestor = max_tasks_per_requestor
         self.task_archiver = task_archiver
         self.node = node
 
-    def check_support(self, header: TaskHeader) -> SupportStatus:
+    def check_support(self, header: AnyHeader) -> SupportStatus:
         """Checks if task described with given task header dict
            may be computed by this node. This node must
            support proper environment, be allowed to make computation
            cheaper than with max price declared in task and have proper
            application version.
-        :param TaskHeader header: task header
+        :param TaskHeader|HeaderSummary header: task header
         :return SupportStatus: ok() if this node may compute a task
         """
         supported = self.check_environment(header.environment)
@@ -365,13 +398,13 @@ class TaskHeaderKeeper:
                 {UnsupportReason.ENVIRONMENT_NOT_ACCEPTING_TASKS: env})
         return self.environments_manager.get_support_status(env).join(status)
 
-    def check_mask(self, header: TaskHeader) -> SupportStatus:
+    def check_mask(self, header: AnyHeader) -> SupportStatus:
         """ Check if ID of this node matches the mask in task header """
         if header.mask.matches(decode_hex(self.node.key)):
             return SupportStatus.ok()
         return SupportStatus.err({UnsupportReason.MASK_MISMATCH: self.node.key})
 
-    def check_price(self, header: TaskHeader) -> SupportStatus:
+    def check_price(self, header: AnyHeader) -> SupportStatus:
         """Check if this node offers prices that isn't greater than maximum
            price described in task header.
         :param TaskHeader header: task header
@@ -385,7 +418,7 @@ class TaskHeaderKeeper:
         return SupportStatus.err(
             {UnsupportReason.MAX_PRICE: max_price})
 
-    def check_version(self, header: TaskHeader) -> SupportStatus:
+    def check_version(self, header: AnyHeader) -> SupportStatus:
         """Check if this node has a version that isn't less than minimum
            version described in task header.
         :param TaskHeader header: task header
@@ -431,6 +464,12 @@ class TaskHeaderKeeper:
         """
         return list(self.task_headers.values())
 
+    def get_all_task_dicts(self) -> typing.List[dict]:
+        """ Return dict representations of all known tasks, without
+        creating TaskHeader objects
+        """
+        return [summary.to_dict() for summary in self.task_headers.summaries()]
+
     def change_config(self, config_desc):
         """Change config options, ie. minimal price that this node may offer
            for computation. If a minimal price didn't change it won't do
@@ -441,12 +480,15 @@ class TaskHeaderKeeper:
         if config_desc.min_price == self.min_price:
             return
         self.min_price = config_desc.min_price
-        self.supported_tasks = []
-        for id_, th in self.task_headers.items():
-            supported = self.check_support(th)
+        self.supported_tasks.clear()
+        self.task_index.clear()
+        for summary in self.task_headers.summaries():
+            id_ = summary.task_id
+            supported = self.check_support(summary)
             self.support_status[id_] = supported
             if supported:
-                self.supported_tasks.append(id_)
+                self.supported_tasks.add(id_)
+                self._index_task(summary)
             if self.task_archiver:
                 self.task_archiver.add_support_status(id_, supported)
 
@@ -463,7 +505,7 @@ class TaskHeaderKeeper:
             task_id = header.task_id
             self.check_owner(task_id, header.task_owner.key)
 
-            old_header = self.task_headers.get(task_id)
+            old_header = self.task_headers.get_summary(task_id)
             if old_header:
                 if header.checksum != old_header.checksum:
                     # Fixed header cannot change so checksums should be equal
@@ -488,7 +530,7 @@ class TaskHeaderKeeper:
 
             self._get_tasks_by_owner_set(header.task_owner.key).add(task_id)
 
-            self.update_supported_set(header)
+            self.update_supported_set(self.task_headers.get_summary(task_id))
 
             self.check_max_tasks_per_owner(header.task_owner.key)
 
@@ -502,21 +544,85 @@ class TaskHeaderKeeper:
             logger.warning("Wrong task header received: {}".format(err))
             return False
 
-    def update_supported_set(self, header: TaskHeader) -> None:
+    def update_supported_set(self, header: AnyHeader) -> None:
 
         task_id = header.task_id
         support = self.check_support(header)
         self.support_status[task_id] = support
 
-        if not support and task_id in self.supported_tasks:
-            self.supported_tasks.remove(task_id)
+        if not support:
+            self.supported_tasks.discard(task_id)
         if support and task_id not in self.supported_tasks:
             logger.info(
                 "Adding task %r support=%r",
                 task_id,
                 support
             )
-            self.supported_tasks.append(task_id)
+            self.supported_tasks.add(task_id)
+
+        if support:
+            self._index_task(header)
+        else:
+            self.task_index.remove(task_id)
+
+    def score_task(self, header: HeaderSummary) -> float:
+        """ Estimates how profitable computing the task would be. The score is
+        the price weighted by this node's benchmarked performance in task's
+        environment, by trust in the requestor and by the share of results
+        accepted by the requestor so far. Deadline slack is not a part of the
+        score, so that the order of tasks does not change over time; tasks
+        with equal scores are ordered by deadline and get_task skips
+        tasks that cannot be computed before their deadlines.
+        """
+        performance = 0.0
+        if self.env_performance:
+            performance = _as_float(self.env_performance(header.environment))
+        # Not benchmarked yet, neither prefer nor bury the task
+        if not performance:
+            performance = self._typical_performance()
+
+        trust = 0.0
+        if self.requestor_trust:
+            trust = _as_float(self.requestor_trust(header.owner_key))
+        # Trust is in range [-1, 1], unknown requestors are neutral
+        trust_factor = (1. + trust) / 2.
+
+        # Laplace rule of succession, 1/2 for new requestors
+        accepted, rejected = self.requestor_results.get(
+            header.owner_key, (0, 0))
+        success_factor = (accepted + 1.) / (accepted + rejected + 2.)
+
+        return header.max_price * performance * trust_factor \
+            * success_factor
+
+    def _typical_performance(self) -> float:
+        """ Median performance of the benchmarked environments, 1.0 if there
+        are none """
+        performances = []
+        if self.env_performance:
+            for env_id in self.environments_manager.get_environments():
+                performance = _as_float(self.env_performance(env_id))
+                if performance > 0:
+                    performances.append(performance)
+        if not performances:
+            return 1.0
+        return statistics.median(performances)
+
+    def _index_task(self, header: HeaderSummary) -> None:
+        if header.task_id in self.skipped_tasks:
+            return
+        self.task_index.add(
+            header.task_id, self.score_task(header), header.deadline)
+
+    def add_requestor_result(self, owner_key_id: str, accepted: bool) -> None:
+        """ Remember whether the requestor has accepted this node's results
+        and update scores of its tasks
+        """
+        results = self.requestor_results.setdefault(owner_key_id, [0, 0])
+        results[0 if accepted else 1] += 1
+        for task_id in self.tasks_by_owner.get(owner_key_id, ()):
+            if task_id in self.task_index:
+                self._index_task(self.task_headers.get_summary(task_id))
 
     @staticmethod
     def check_owner(task_id: str, owner_id: str) -> None:
@@ -536,8 +642,9 @@ class TaskHeaderKeeper:
         if len(owner_task_set) <= self.max_tasks_per_requestor:
             return
 
-        by_age = sorted(owner_task_set,
-                        key=lambda tid: self.task_headers[tid].last_checking)
+        by_age = sorted(
+            owner_task_set,
+            key=lambda tid: self.task_headers.get_summary(tid).last_checking)
 
         # leave alone the first (oldest) max_tasks_per_requestor
         # headers, remove the rest
@@ -557,12 +664,13 @@ class TaskHeaderKeeper:
             return False
 
         if task_id in self.task_headers:
-            owner_key_id = self.task_headers[task_id].task_owner.key
+            owner_key_id = self.task_headers.get_summary(task_id).owner_key
             del self.task_headers[task_id]
             if owner_key_id in self.tasks_by_owner:
                 self.tasks_by_owner[owner_key_id].discard(task_id)
-        if task_id in self.supported_tasks:
-            self.supported_tasks.remove(task_id)
+        self.supported_tasks.discard(task_id)
+        self.task_index.remove(task_id)
+        self.skipped_tasks.pop(task_id, None)
         if task_id in self.support_status:
             del self.support_status[task_id]
         self.removed_tasks[task_id] = time.time()
@@ -572,27 +680,64 @@ class TaskHeaderKeeper:
         """ Returns key_id of task owner or None if there is no information
         about this task.
         """
-        task = self.task_headers.get(task_id)
-        if task is None:
+        summary = self.task_headers.get_summary(task_id)
+        if summary is None:
             return None
-        return task.task_owner.key
-
-    def get_task(self) -> typing.Optional[TaskHeader]:
-        """ Returns random task from supported tasks that may be computed
+        return summary.owner_key
+
+    def get_task(self, exclude: typing.Container[str] = ()) \
+            -> typing.Optional[TaskHeader]:
+        """ Returns the supported task with the highest score that may still
+        be computed before its deadline
+        :param exclude: ids of tasks that should not be returned this time,
+            e.g. the ones this node is already computing
         :return: None if there are no tasks that this node may want to compute
         """
-        if self.supported_tasks:
-            tn = random.randrange(0, len(self.supported_tasks))
-            task_id = self.supported_tasks[tn]
-            return self.task_headers[task_id]
-        return None
+        self._restore_skipped_tasks()
+        now = common.get_timestamp_utc()
+        excluded = []
+        try:
+            while True:
+                task_id = self.task_index.peek()
+                if task_id is None:
+                    return None
+                summary = self.task_headers.get_summary(task_id)
+                if task_id in exclude:
+                    excluded.append(summary)
+                elif summary.deadline - now >= summary.subtask_timeout:
+                    return self.task_headers[task_id]
+                # Excluded, or there is not enough time left to compute
+                # a subtask
+                self.task_index.remove(task_id)
+        finally:
+            for summary in excluded:
+                self._index_task(summary)
+
+    def skip_task(self, task_id: str,
+                  timeout: typing.Optional[float] = None) -> None:
+        """ Don't return the task from get_task until its header or support
+        status is updated or, if timeout is given, for timeout seconds
+        regardless of updates
+        """
+        self.task_index.remove(task_id)
+        if timeout is not None:
+            self.skipped_tasks[task_id] = time.time() + timeout
+
+    def _restore_skipped_tasks(self) -> None:
+        now = time.time()
+        for task_id, skipped_until in list(self.skipped_tasks.items()):
+            if skipped_until > now:
+                continue
+            del self.skipped_tasks[task_id]
+            if task_id in self.supported_tasks:
+                self._index_task(self.task_headers.get_summary(task_id))
 
     def remove_old_tasks(self):
-        for t in list(self.task_headers.values()):
+        for t in list(self.task_headers.summaries()):
             cur_time = common.get_timestamp_utc()
             if cur_time > t.deadline:
                 logger.warning("Task owned by %s dies, task_id: %s",
-                               t.task_owner.key, t.task_id)
+                               t.owner_key, t.task_id)
                 self.remove_task_header(t.task_id)
 
         for task_id, remove_time in list(self.removed_tasks.items()):
@@ -620,7 +765,7 @@ class TaskHeaderKeeper:
             c_reasons.update(st.desc.keys())
         c_versions = Counter()
         c_price = 0
-        for th in self.task_headers.values():
+        for th in self.task_headers.summaries():
             c_versions[th.min_version] += 1
             c_price += th.max_price
         ret = []
@@ -26,8 +26,10 @@ from golem.resource.hyperdrive.resourcesmanager import \
     HyperdriveResourceManager
 from golem.rpc import utils as rpc_utils
 from golem.task.result.resultmanager import EncryptedResultPackageManager
+from golem.task.deadlineindex import DeadlineIndex
 from golem.task.taskbase import TaskEventListener, Task, TaskHeader,\
     TaskPurpose, AcceptClientVerdict
+from golem.task.taskjournal import TaskJournal
 from golem.task.taskkeeper import CompTaskKeeper
 from golem.task.taskrequestorstats import RequestorTaskStatsManager
 from golem.task.taskstate import TaskState, TaskStatus, SubtaskStatus, \
@@ -99,6 +101,8 @@ class TaskManager(TaskEventListener):
         self.tasks: Dict[str, Task] = {}
         self.tasks_states: Dict[str, TaskState] = {}
         self.subtask2task_mapping: Dict[str, str] = {}
+        # Deadlines of active tasks and of their computed subtasks
+        self.deadline_index = DeadlineIndex()
 
         self.listen_address = listen_address
         self.listen_port = listen_port
@@ -109,6 +113,7 @@ class TaskManager(TaskEventListener):
         self.tasks_dir = tasks_dir / "tmanager"
         if not self.tasks_dir.is_dir():
             self.tasks_dir.mkdir(parents=True)
+        self.task_journal = TaskJournal(self.tasks_dir)
         self.root_path = root_path
         self.dir_manager = DirManager(self.get_task_manager_root())
 
@@ -230,12 +235,12 @@ class TaskManager(TaskEventListener):
             raise RuntimeError("Task {} has already been started"
                                .format(task_id))
 
-        task_state.status = TaskStatus.waiting
+        self._activate_task(task_id, TaskStatus.waiting)
         self.notice_task_updated(task_id, op=TaskOp.STARTED)
         logger.info("Task %s started", task_id)
 
     def _dump_filepath(self, task_id):
-        return self.tasks_dir / ('%s.pickle' % (task_id,))
+        return self.task_journal.snapshot_path(task_id)
 
     def dump_task(self, task_id: str) -> None:
         logger.debug('DUMP TASK %r', task_id)
@@ -243,8 +248,7 @@ class TaskManager(TaskEventListener):
         try:
             data = self.tasks[task_id], self.tasks_states[task_id]
             logger.debug('DUMPING TASK %r', filepath)
-            with filepath.open('wb') as f:
-                pickle.dump(data, f, protocol=2)
+            self.task_journal.write_snapshot(task_id, data)
             logger.debug('TASK %s DUMPED in %r', task_id, filepath)
         except Exception as e:
             logger.exception(
@@ -256,10 +260,37 @@ class TaskManager(TaskEventListener):
                 filepath.unlink()
             raise
 
+    def journal_subtask(self, task_id: str, subtask_id: str) -> None:
+        """ Append the state of the subtask to the journal of the task.
+        The task is compacted into a new snapshot in the background after
+        a number of records. """
+        task = self.tasks[task_id]
+        task_state = self.tasks_states[task_id]
+        self.task_journal.append(task_id, {
+            'subtask_id': subtask_id,
+            'subtask_state': task_state.subtask_states.get(subtask_id),
+            'task_status': task_state.status,
+            'task_delta': task.get_subtask_delta(subtask_id),
+        })
+        if self.task_journal.needs_compaction(task_id):
+            logger.debug('COMPACTING TASK %r', task_id)
+            self.task_journal.compact(task_id, (task, task_state))
+
+    @staticmethod
+    def _replay_journal(task: Task, state: TaskState,
+                        records: List[Dict]) -> None:
+        for record in records:
+            subtask_id = record['subtask_id']
+            subtask_state = record['subtask_state']
+            if subtask_state is not None:
+                state.subtask_states[subtask_id] = subtask_state
+            state.status = record['task_status']
+            task.apply_subtask_delta(subtask_id, record['task_delta'])
+
     def remove_dump(self, task_id: str):
         filepath = self._dump_filepath(task_id)
         try:
-            filepath.unlink()
+            self.task_journal.remove(task_id)
             logger.debug('TASK DUMP with id %s REMOVED from %r',
                          task_id, filepath)
         except (FileNotFoundError, OSError) as e:
@@ -297,6 +328,9 @@ class TaskManager(TaskEventListener):
 
                     TaskManager._migrate_status_to_enum(state)
 
+                    records = self.task_journal.read(task.header.task_id)
+                    TaskManager._replay_journal(task, state, records)
+
                     task.register_listener(self)
 
                     task_id = task.header.task_id
@@ -306,7 +340,11 @@ class TaskManager(TaskEventListener):
                     for sub in state.subtask_states.values():
                         self.subtask2task_mapping[sub.subtask_id] = task_id
 
-                    logger.debug('TASK %s RESTORED from %r', task_id, path)
+                    if state.status in self.activeStatus:
+                        self._schedule_deadlines(task_id)
+
+                    logger.debug('TASK %s RESTORED from %r (journal records: '
+                                 '%d)', task_id, path, len(records))
                 except (pickle.UnpicklingError, EOFError, ImportError,
                         KeyError, AttributeError):
                     logger.exception('Problem restoring task from: %s', path)
@@ -324,7 +362,7 @@ class TaskManager(TaskEventListener):
 
     @handle_task_key_error
     def resources_send(self, task_id):
-        self.tasks_states[task_id].status = TaskStatus.waiting
+        self._activate_task(task_id, TaskStatus.waiting)
         self.notice_task_updated(task_id)
         logger.info("Resources for task {} sent".format(task_id))
 
@@ -715,6 +753,7 @@ class TaskManager(TaskEventListener):
             verification_finished()
             return
         subtask_state.subtask_status = SubtaskStatus.verifying
+        self.deadline_index.remove(task_id, subtask_id)
 
         @TaskManager.handle_generic_key_error
         def verification_finished_():
@@ -787,6 +826,7 @@ class TaskManager(TaskEventListener):
         ss.subtask_rem_time = 0.0
         ss.subtask_status = SubtaskStatus.failure
         ss.stderr = str(err)
+        self.deadline_index.remove(task_id, subtask_id)
 
         self.notice_task_updated(task_id,
                                  subtask_id=subtask_id,
@@ -818,32 +858,38 @@ class TaskManager(TaskEventListener):
     # CHANGE TO RETURN KEY_ID (check IF SUBTASK COMPUTER HAS KEY_ID
     def check_timeouts(self):
         nodes_with_timeouts = []
-        for t in list(self.tasks.values()):
-            th = t.header
-            if self.tasks_states[th.task_id].status not in self.activeStatus:
+        cur_time = get_timestamp_utc()
+        expired = self.deadline_index.pop_expired(cur_time)
+        # Subtasks time out before the tasks they belong to
+        expired.sort(key=lambda entry: entry[2] is None)
+
+        for _, task_id, subtask_id in expired:
+            ts = self.tasks_states.get(task_id)
+            # Deadlines are scheduled again when the task is reactivated
+            if ts is None or ts.status not in self.activeStatus:
                 continue
-            cur_time = get_timestamp_utc()
+            t = self.tasks[task_id]
             # Check subtask timeout
-            ts = self.tasks_states[th.task_id]
-            for s in list(ts.subtask_states.values()):
-                if s.subtask_status.is_computed():
-                    if cur_time > s.deadline:
-                        logger.info("Subtask %r dies with status %r",
-                                    s.subtask_id,
-                                    s.subtask_status.value)
-                        s.subtask_status = SubtaskStatus.failure
-                        nodes_with_timeouts.append(s.node_id)
-                        t.computation_failed(s.subtask_id)
-                        s.stderr = "[GOLEM] Timeout"
-                        self.notice_task_updated(th.task_id,
-                                                 subtask_id=s.subtask_id,
-                                                 op=SubtaskOp.TIMEOUT)
+            if subtask_id is not None:
+                s = ts.subtask_states.get(subtask_id)
+                if s is None or not s.subtask_status.is_computed():
+                    continue
+                logger.info("Subtask %r dies with status %r",
+                            s.subtask_id,
+                            s.subtask_status.value)
+                s.subtask_status = SubtaskStatus.failure
+                nodes_with_timeouts.append(s.node_id)
+                t.computation_failed(s.subtask_id)
+                s.stderr = "[GOLEM] Timeout"
+                self.notice_task_updated(task_id,
+                                         subtask_id=s.subtask_id,
+                                         op=SubtaskOp.TIMEOUT)
             # Check task timeout
-            if cur_time > th.deadline:
-                logger.info("Task %r dies", th.task_id)
-                self.tasks_states[th.task_id].status = TaskStatus.timeout
+            else:
+                logger.info("Task %r dies", task_id)
+                ts.status = TaskStatus.timeout
                 # TODO: t.tell_it_has_timeout()?
-                self.notice_task_updated(th.task_id, op=TaskOp.TIMEOUT)
+                self.notice_task_updated(task_id, op=TaskOp.TIMEOUT)
         return nodes_with_timeouts
 
     def get_progresses(self):
@@ -887,6 +933,7 @@ class TaskManager(TaskEventListener):
 
         task_state = self.tasks_states[task_id]
         task_state.status = TaskStatus.restarted
+        self._unschedule_deadlines(task_id)
 
         for ss in self.tasks_states[task_id].subtask_states.values():
             if ss.subtask_status != SubtaskStatus.failure:
@@ -900,10 +947,11 @@ class TaskManager(TaskEventListener):
         task_id = self.subtask2task_mapping[subtask_id]
         self.tasks[task_id].restart_subtask(subtask_id)
         task_state = self.tasks_states[task_id]
-        task_state.status = TaskStatus.computing
         subtask_state = task_state.subtask_states[subtask_id]
         subtask_state.subtask_status = SubtaskStatus.restarted
         subtask_state.stderr = "[GOLEM] Restarted"
+        self.deadline_index.remove(task_id, subtask_id)
+        self._activate_task(task_id, TaskStatus.computing)
 
         self.notice_task_updated(task_id,
                                  subtask_id=subtask_id,
@@ -923,18 +971,20 @@ class TaskManager(TaskEventListener):
             subtask_state = task_state.subtask_states[subtask_id]
             subtask_state.subtask_status = SubtaskStatus.restarted
             subtask_state.stderr = "[GOLEM] Restarted"
+            self.deadline_index.remove(task_id, subtask_id)
             self.notice_task_updated(task_id,
                                      subtask_id=subtask_id,
                                      op=SubtaskOp.RESTARTED,
                                      persist=False)
 
-        task_state.status = TaskStatus.computing
+        self._activate_task(task_id, TaskStatus.computing)
         self.notice_task_updated(task_id, op=OtherOp.FRAME_RESTARTED)
 
     @handle_task_key_error
     def abort_task(self, task_id):
         self.tasks[task_id].abort()
         self.tasks_states[task_id].status = TaskStatus.aborted
+        self._unschedule_deadlines(task_id)
         for sub in list(self.tasks_states[task_id].subtask_states.values()):
             del self.subtask2task_mapping[sub.subtask_id]
         self.tasks_states[task_id].subtask_states.clear()
@@ -948,6 +998,7 @@ class TaskManager(TaskEventListener):
 
     @handle_task_key_error
     def delete_task(self, task_id):
+        self._unschedule_deadlines(task_id)
         for sub in list(self.tasks_states[task_id].subtask_states.values()):
             del self.subtask2task_mapping[sub.subtask_id]
         self.tasks_states[task_id].subtask_states.clear()
@@ -1022,7 +1073,9 @@ class TaskManager(TaskEventListener):
             'duration': state.elapsed_time,
             # single=True retrieves one preview file. If rendering frames,
             # it's the preview of the most recently computed frame.
-            'preview': task_type.get_preview(task, single=True)
+            # The task list is polled, so previews are not written more
+            # often than their update interval allows.
+            'preview': task_type.get_preview(task, single=True, force=False)
         }
 
         return update_dict(dictionary,
@@ -1106,6 +1159,27 @@ class TaskManager(TaskEventListener):
 
         (self.tasks_states[ctd['task_id']].
             subtask_states[ctd['subtask_id']]) = ss
+        self.deadline_index.add(ss.deadline, ctd['task_id'], ss.subtask_id)
+
+    def _activate_task(self, task_id: str, status: TaskStatus) -> None:
+        task_state = self.tasks_states[task_id]
+        was_active = task_state.status in self.activeStatus
+        task_state.status = status
+        if not was_active:
+            self._schedule_deadlines(task_id)
+
+    def _schedule_deadlines(self, task_id: str) -> None:
+        """ Put deadlines of the task and of its computed subtasks into
+        the deadline index """
+        self.deadline_index.add(self.tasks[task_id].header.deadline, task_id)
+        for ss in self.tasks_states[task_id].subtask_states.values():
+            if ss.subtask_status.is_computed():
+                self.deadline_index.add(ss.deadline, task_id, ss.subtask_id)
+
+    def _unschedule_deadlines(self, task_id: str) -> None:
+        self.deadline_index.remove(task_id)
+        for subtask_id in self.tasks_states[task_id].subtask_states:
+            self.deadline_index.remove(task_id, subtask_id)
 
     def notify_update_task(self, task_id):
         self.notice_task_updated(task_id)
@@ -1145,7 +1219,10 @@ class TaskManager(TaskEventListener):
         )
 
         if persist and self.task_persistence:
-            self.dump_task(task_id)
+            if subtask_id and self.task_journal.has_snapshot(task_id):
+                self.journal_subtask(task_id, subtask_id)
+            else:
+                self.dump_task(task_id)
 
         task_state = self.tasks_states.get(task_id)
         dispatcher.send(
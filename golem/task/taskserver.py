@@ -7,7 +7,7 @@ import time
 import weakref
 from collections import deque
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Set
 
 from golem_messages import message
 from pydispatch import dispatcher
@@ -28,6 +28,7 @@ from golem.network.transport.tcpserver import (
 from golem.ranking.helper.trust import Trust
 from golem.task.acl import get_acl
 from golem.task.benchmarkmanager import BenchmarkManager
+from golem.task.signaturecache import HeaderSignatureCache
 from golem.task.taskbase import TaskHeader, Task, AcceptClientVerdict
 from golem.task.taskconnectionshelper import TaskConnectionsHelper
 from golem.task.taskstate import TaskOp
@@ -37,6 +38,7 @@ from . import exceptions
 from .result.resultmanager import ExtractedPackage
 from .server import resources
 from .server import concent
+from .server.sessionpool import TaskSessionPool
 from .taskcomputer import TaskComputer
 from .taskkeeper import TaskHeaderKeeper
 from .taskmanager import TaskManager
@@ -70,7 +72,11 @@ class TaskServer(
             environments_manager=client.environments_manager,
             node=self.node,
             min_price=config_desc.min_price,
-            task_archiver=task_archiver)
+            task_archiver=task_archiver,
+            env_performance=self.get_environment_performance,
+            requestor_trust=client.get_requesting_trust)
+        # Verification results of gossiped task header signatures
+        self.header_signatures = HeaderSignatureCache()
         self.task_manager = TaskManager(
             config_desc.node_name,
             self.node,
@@ -93,6 +99,8 @@ class TaskServer(
         self.task_connections_helper.task_server = self
         self.task_sessions = {}
         self.task_sessions_incoming = weakref.WeakSet()
+        # live outgoing sessions by node id, see TaskSessionPool
+        self.session_pool = TaskSessionPool()
 
         self.max_trust = 1.0
         self.min_trust = 0.0
@@ -114,7 +122,8 @@ class TaskServer(
 
         network = TCPNetwork(
             ProtocolFactory(SafeProtocol, self, SessionFactory(TaskSession)),
-            use_ipv6)
+            use_ipv6,
+            parallel_connect=True)
         PendingConnectionsServer.__init__(self, config_desc, network)
         # instantiate ReceivedMessageHandler connected to self
         # to register in golem.network.concent.handlers_library
@@ -179,17 +188,21 @@ class TaskServer(
         return self.task_keeper.environments_manager.get_environment_by_id(
             env_id)
 
-    # This method chooses random task from the network to compute on our machine
+    def get_environment_performance(self, env_id) -> float:
+        env = self.get_environment_by_id(env_id)
+        if env is not None:
+            return env.get_performance()
+        return 0.0
+
+    # This method chooses the best task from the network to compute on our
+    # machine, see TaskHeaderKeeper.score_task
     def request_task(self) -> Optional[str]:
-        theader = self.task_keeper.get_task()
+        theader = self.task_keeper.get_task(exclude=self._get_busy_tasks())
         if theader is None:
             return None
         try:
-            env = self.get_environment_by_id(theader.environment)
-            if env is not None:
-                performance = env.get_performance()
-            else:
-                performance = 0.0
+            performance = self.get_environment_performance(
+                theader.environment)
 
             supported = self.should_accept_requestor(theader.task_owner.key)
             if self.config_desc.min_price > theader.max_price:
@@ -208,6 +221,8 @@ class TaskServer(
                 price = int(theader.max_price)
                 self.task_manager.add_comp_task_request(
                     theader=theader, price=price)
+                # Each computation slot gets an equal share of the hardware
+                num_slots = self.task_computer.max_assigned_tasks
                 args = {
                     'node_name': self.config_desc.node_name,
                     'key_id': theader.task_owner.key,
@@ -215,11 +230,18 @@ class TaskServer(
                     'estimated_performance': performance,
                     'price': self.config_desc.min_price,
                     'max_resource_size': self.config_desc.max_resource_size,
-                    'max_memory_size': self.config_desc.max_memory_size,
-                    'num_cores': self.config_desc.num_cores
+                    'max_memory_size':
+                        int(self.config_desc.max_memory_size) // num_slots,
+                    'num_cores': int(self.config_desc.num_cores) // num_slots
                 }
 
                 node = theader.task_owner
+                session = self._get_pooled_session(node.key)
+                if session:
+                    self.__connection_for_task_request_established(
+                        session, session.conn_id, **args)
+                    return theader.task_id
+
                 added = self._add_pending_request(
                     TASK_CONN_TYPES['task_request'],
                     node,
@@ -239,6 +261,11 @@ class TaskServer(
                 theader.task_id,
                 supported,
             )
+            # Let the next requests go to other tasks, the reasons for
+            # rejecting this one may be gone after a while
+            self.task_keeper.skip_task(
+                theader.task_id,
+                timeout=self.task_keeper.rejected_task_timeout)
             if self.task_archiver:
                 self.task_archiver.add_support_status(theader.task_id,
                                                       supported)
@@ -248,6 +275,14 @@ class TaskServer(
 
         return None
 
+    def _get_busy_tasks(self) -> Set[str]:
+        """ Ids of tasks that this node is computing or holds unsent results
+        of; their requestors would not assign another subtask yet
+        """
+        task_ids = self.task_computer.get_assigned_task_ids()
+        task_ids.update(wtr.task_id for wtr in self.results_to_send.values())
+        return task_ids
+
     def send_results(self, subtask_id, task_id, result):
 
         if 'data' not in result:
@@ -328,14 +363,23 @@ class TaskServer(
         return [th.to_dict() for th in ths_tm]
 
     def get_others_tasks_headers(self):
-        ths_tk = self.task_keeper.get_all_tasks()
-        return [th.to_dict() for th in ths_tk]
+        return self.task_keeper.get_all_task_dicts()
 
     def add_task_header(self, th_dict_repr: dict) -> bool:
         try:
             TaskHeader.validate(th_dict_repr)
+            key = self.header_signatures.key(th_dict_repr)
+            verified = self.header_signatures.get(key)
+            if verified and self._is_header_known(th_dict_repr):
+                # Headers are re-gossiped constantly, nothing has changed
+                self.header_signatures.unchanged += 1
+                return True
+
             header = TaskHeader.from_dict(th_dict_repr)
-            if not self.verify_header_sig(header):
+            if verified is None:
+                verified = self.verify_header_sig(header)
+                self.header_signatures.put(key, verified)
+            if not verified:
                 raise ValueError("Invalid signature")
 
             if self.task_manager.is_this_my_task(header):
@@ -350,6 +394,15 @@ class TaskServer(
             logger.exception("Task header validation failed")
             return False
 
+    def _is_header_known(self, th_dict_repr: dict) -> bool:
+        task_id = th_dict_repr['fixed_header']['task_id']
+        known = self.task_keeper.task_headers.get_summary(task_id)
+        return known is not None \
+            and known.signature == th_dict_repr.get('signature')
+
+    def get_header_signature_stats(self) -> dict:
+        return self.header_signatures.get_stats()
+
     def verify_header_sig(self, header: TaskHeader):
         _bin = header.to_binary()
         _sig = header.signature
@@ -369,6 +422,14 @@ class TaskServer(
         for tsk in list(self.task_sessions.keys()):
             if self.task_sessions[tsk] == task_session:
                 del self.task_sessions[tsk]
+        self.session_pool.remove(task_session)
+
+    def release_task_session(self, task_session: TaskSession):
+        """ The exchange over the session has ended. The session stays in
+        the pool and may be reused for the next exchange with the node. """
+        for tsk in list(self.task_sessions.keys()):
+            if self.task_sessions[tsk] == task_session:
+                del self.task_sessions[tsk]
 
     def set_last_message(self, type_, t, msg, address, port):
         if len(self.last_messages) >= 5:
@@ -426,6 +487,7 @@ class TaskServer(
         """My (providers) results were rejected"""
         logger.debug("Subtask %r result rejected", subtask_id)
         self.task_result_sent(subtask_id)
+        self.task_keeper.add_requestor_result(sender_node_id, accepted=False)
 
         self.decrease_trust_payment(sender_node_id)
         # self.remove_task_header(task_id)
@@ -443,6 +505,7 @@ class TaskServer(
         """My (providers) results were accepted"""
         logger.debug("Subtask %r result accepted", subtask_id)
         self.task_result_sent(subtask_id)
+        self.task_keeper.add_requestor_result(sender_node_id, accepted=True)
         self.client.transaction_system.expect_income(
             sender_node_id,
             subtask_id,
@@ -714,7 +777,7 @@ class TaskServer(
             key_id=key_id,
             conn_id=conn_id,
         )
-        session.send_hello()
+        self._send_hello(session)
         session.request_task(node_name, task_id, estimated_performance, price,
                              max_resource_size, max_memory_size, num_cores)
 
@@ -748,7 +811,7 @@ class TaskServer(
             conn_id=conn_id,
         )
 
-        session.send_hello()
+        self._send_hello(session)
         session.send_report_computed_task(waiting_task_result,
                                           self.node.prv_addr, self.cur_port,
                                           self.node)
@@ -780,7 +843,7 @@ class TaskServer(
             key_id=key_id,
             conn_id=conn_id,
         )
-        session.send_hello()
+        self._send_hello(session)
         session.send_task_failure(subtask_id, err_msg)
 
     def __connection_for_task_failure_failure(self, conn_id, key_id,
@@ -873,6 +936,19 @@ class TaskServer(
         session.conn_id = conn_id
         self._mark_connected(conn_id, session.address, session.port)
         self.task_sessions[subtask_id] = session
+        self.session_pool.add(session)
+
+    def _get_pooled_session(self, key_id: str) -> Optional[TaskSession]:
+        """ Live session with the node which is not used for the exchange
+        of another task or subtask """
+        return self.session_pool.get(
+            key_id, in_use=set(self.task_sessions.values()))
+
+    @staticmethod
+    def _send_hello(session: TaskSession):
+        # Sessions taken from the pool have already been verified
+        if not session.verified:
+            session.send_hello()
 
     def noop(self, *args, **kwargs):
         args_, kwargs_ = args, kwargs  # avoid params name collision in logger
@@ -894,7 +970,7 @@ class TaskServer(
             conn_id=conn_id,
         )
 
-        session.send_hello()
+        self._send_hello(session)
         session.result_received(subtask_id, full_path_files)
 
     def __connection_for_task_verification_result_failure(  # noqa pylint:disable=no-self-use
@@ -926,6 +1002,12 @@ class TaskServer(
                 sessions[subtask_id].task_computer.session_timeout()
             sessions[subtask_id].dropped()
 
+        # Idle sessions still used for a subtask are left for the code above
+        in_use = set(self.task_sessions.values())
+        for session in self.session_pool.pop_idle():
+            if session not in in_use:
+                session.dropped()
+
     def _find_sessions(self, subtask):
         if subtask in self.task_sessions:
             return [self.task_sessions[subtask]]
@@ -951,7 +1033,8 @@ class TaskServer(
                 if now - wtr.last_sending_trial > wtr.delay_time:
                     wtr.already_sending = True
                     wtr.last_sending_trial = now
-                    session = self.task_sessions.get(subtask_id, None)
+                    session = self.task_sessions.get(subtask_id, None) \
+                        or self._get_pooled_session(wtr.owner.key)
                     if session:
                         self.__connection_for_task_result_established(
                             session, session.conn_id, wtr)
@@ -969,7 +1052,8 @@ class TaskServer(
         for subtask_id in list(self.failures_to_send.keys()):
             wtf = self.failures_to_send[subtask_id]
 
-            session = self.task_sessions.get(subtask_id, None)
+            session = self.task_sessions.get(subtask_id, None) \
+                or self._get_pooled_session(wtf.owner.key)
             if session:
                 self.__connection_for_task_failure_established(
                     session, session.conn_id, wtf.owner.key, subtask_id,
@@ -1002,6 +1086,12 @@ class TaskServer(
             'subtask_id': report_computed_task.subtask_id,
         }
 
+        session = self._get_pooled_session(report_computed_task.key_id)
+        if session:
+            self.__connection_for_task_verification_result_established(
+                session, session.conn_id, **kwargs)
+            return
+
         node = p2p_node.Node.from_dict(report_computed_task.node_info)
 
         self._add_pending_request(
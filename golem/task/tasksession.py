@@ -679,6 +679,12 @@ class TaskSession(BasicSafeSession, ResourceHandshakeSessionMixin):
         _cannot_compute(self.err_msg)
 
     def _react_to_waiting_for_results(self, _):
+        # The requestor won't assign another subtask until it gets our
+        # results, don't request the task again in the meantime
+        if self.task_id:
+            task_keeper = self.task_server.task_keeper
+            task_keeper.skip_task(
+                self.task_id, timeout=task_keeper.waiting_task_timeout)
         self.task_computer.session_closed()
         if not self.msgs_to_send:
             self.disconnect(message.base.Disconnect.REASON.NoMoreMessages)
@@ -891,6 +897,8 @@ class TaskSession(BasicSafeSession, ResourceHandshakeSessionMixin):
         self.task_computer.wait_for_resources(self.task_id, resources)
         self.task_server.pull_resources(self.task_id, resources,
                                         client_options=client_options)
+        # The task request has been handled
+        self.task_server.release_task_session(self)
 
     def _react_to_hello(self, msg):
         if not self.conn.opened:
@@ -979,6 +987,8 @@ class TaskSession(BasicSafeSession, ResourceHandshakeSessionMixin):
             msg=delayed_forcing_msg,
             delay=delay,
         )
+        # The results have been delivered
+        self.task_server.release_task_session(self)
 
     @history.provider_history
     def _react_to_reject_report_computed_task(self, msg):
@@ -989,6 +999,7 @@ class TaskSession(BasicSafeSession, ResourceHandshakeSessionMixin):
 
             self.concent_service.cancel_task_message(
                 msg.subtask_id, 'ForceReportComputedTask')
+            self.task_server.release_task_session(self)
         else:
             logger.warning("Requestor '%r' rejected a computed task report of"
                            "an unknown task (subtask_id='%s')",
@@ -18,6 +18,8 @@ datas = [
      'apps/blender/resources/images/'),
     ('apps/blender/resources/scripts/blendercrop.py.template',
      'apps/blender/resources/scripts/'),
+    ('apps/blender/resources/scripts/blendercropbatch.py.template',
+     'apps/blender/resources/scripts/'),
     ('apps/blender/resources/scripts/docker_blendertask.py',
      'apps/blender/resources/scripts/'),
     ('apps/dummy/resources/scripts/docker_dummytask.py',
@@ -84,6 +84,7 @@ setup(
         ]),
         (path.normpath('../../golem/apps/blender/resources/scripts'), [
             path.normpath('apps/blender/resources/scripts/blendercrop.py.template'),
+            path.normpath('apps/blender/resources/scripts/blendercropbatch.py.template'),
             path.normpath('apps/blender/resources/scripts/docker_blendertask.py')
         ]),
         (path.normpath('../../golem/apps/dummy/resources/scripts'), [
@@ -1,3 +1,5 @@
+import json
+import os
 from importlib import reload
 
 import unittest.mock as mock
@@ -101,6 +103,49 @@ True
         bpy_m.ops.render.render.assert_not_called()
         bpy_m.ops.file.report_missing_files.assert_called_once_with()
 
+    def test_crops_file_generation_full(self):
+        timings_path = os.path.join(self.tempdir, 'timings.json')
+        result = scenefileeditor.generate_blender_crops_file(
+            resolution=(800, 600),
+            crops=[('0', (0.1, 0.2), (0.3, 0.4)),
+                   ('1', (0.5, 0.6), (0.7, 0.8))],
+            use_compositing=False,
+            samples=5,
+            frames=[1, 3],
+            output_format='exr',
+            output_paths={'0': '/golem/output/crop0_out',
+                          '1': '/golem/output/crop1_out'},
+            timings_path=timings_path,
+        )
+
+        scene_m = mock.MagicMock()
+        bpy_m = mock.MagicMock()
+        bpy_m.context.scene = scene_m
+        rendered = []
+        bpy_m.ops.render.render.side_effect = lambda **_: rendered.append((
+            scene_m.render.filepath,
+            scene_m.frame_set.call_args[0][0],
+            scene_m.render.border_min_x,
+            scene_m.render.border_max_y,
+        ))
+
+        result = result.replace('import bpy', '')
+        globs = dict(globals())
+        globs['bpy'] = bpy_m
+
+        with self.assertRaises(SystemExit):
+            exec(result, globs)
+
+        self.assertEqual(scene_m.render.image_settings.file_format, 'OPEN_EXR')
+        self.assertEqual(rendered, [
+            ('/golem/output/crop0_out', 1, 0.1, 0.4),
+            ('/golem/output/crop0_out', 3, 0.1, 0.4),
+            ('/golem/output/crop1_out', 1, 0.5, 0.8),
+            ('/golem/output/crop1_out', 3, 0.5, 0.8),
+        ])
+        with open(timings_path) as f:
+            self.assertEqual(set(json.load(f)), {'0', '1'})
+
     @mock.patch("golem.resource.dirmanager")
     def test_crop_template_path_error(self, mock_manager):
         mock_manager.find_task_script.return_value = None
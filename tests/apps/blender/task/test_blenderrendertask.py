@@ -586,6 +586,73 @@ class TestBlenderTask(TempDirFixture, LogTestCase):
         preview = BlenderTaskTypeInfo.get_preview(None, single=True)
         assert preview is None
 
+    @mock.patch('apps.blender.task.blenderrendertask.time')
+    def test_flush_previews(self, time_mock):
+        bt = self.build_bt(300, 200, 10)
+        files = self.additional_dir_content([1])
+        img = Image.new("RGB", (300, 20), (0, 0, 255))
+        img.save(files[0], "PNG")
+        img.close()
+
+        time_mock.time.return_value = 1000
+        bt._update_preview(files[0], 1)
+        bt._update_task_preview()
+        assert os.path.exists(bt.preview_file_path)
+        assert os.path.exists(bt.preview_task_file_path)
+
+        # previews are not written again until the interval passes
+        os.remove(bt.preview_file_path)
+        bt._update_preview(files[0], 2)
+        bt._update_task_preview()
+        assert not os.path.exists(bt.preview_file_path)
+
+        time_mock.time.return_value = 1010
+        bt._update_task_preview()
+        with Image.open(bt.preview_file_path) as img:
+            assert img.getpixel((0, 0)) == (0, 0, 255)
+
+        # the preview RPC always writes pending changes
+        os.remove(bt.preview_file_path)
+        bt._update_preview(files[0], 3)
+        BlenderTaskTypeInfo.get_preview(bt, single=True)
+        assert os.path.exists(bt.preview_file_path)
+
+        # unless the task list asks for it
+        os.remove(bt.preview_file_path)
+        bt._update_preview(files[0], 4)
+        BlenderTaskTypeInfo.get_preview(bt, single=True, force=False)
+        assert not os.path.exists(bt.preview_file_path)
+
+    def test_restore_old_pickle(self):
+        bt = self.build_bt(300, 200, 10)
+        files = self.additional_dir_content([1])
+        img = Image.new("RGB", (300, 20), (0, 0, 255))
+        img.save(files[0], "PNG")
+        img.close()
+        bt._update_preview(files[0], 1)
+        bt.flush_previews()
+
+        # pickled before previews were kept in memory
+        state = bt.__getstate__()
+        del state['_task_preview_outdated']
+        del state['_previews_flushed']
+        updater_state = bt.preview_updater.__getstate__()
+        del updater_state['_canvas']
+        del updater_state['_dirty']
+        updater = PreviewUpdater.__new__(PreviewUpdater)
+        updater.__setstate__(updater_state)
+        state['preview_updater'] = updater
+
+        restored = BlenderRenderTask.__new__(BlenderRenderTask)
+        restored.__setstate__(state)
+
+        assert BlenderTaskTypeInfo.get_preview(restored, single=True) \
+            == restored.preview_task_file_path
+        restored._update_preview(files[0], 2)
+        restored.flush_previews()
+        with Image.open(restored.preview_file_path) as img:
+            assert img.getpixel((0, 0)) == (0, 0, 255)
+
 
 class TestPreviewUpdater(TempDirFixture, LogTestCase):
 
@@ -626,6 +693,35 @@ class TestPreviewUpdater(TempDirFixture, LogTestCase):
                                        res_y * scale_factor)
             self.assertTrue(pu.perfectly_placed_subtasks == chunks)
 
+    def test_flush(self):
+        preview_file = self.temp_file_name('preview.png')
+        chunk_file = self.temp_file_name('chunk.png')
+        img = Image.new("RGB", (20, 10), (255, 0, 0))
+        img.save(chunk_file)
+        img.close()
+
+        pu = PreviewUpdater(preview_file, 20, 30, [0, 0, 10, 20, 30])
+        pu.update_preview(chunk_file, 2)
+        assert not os.path.exists(preview_file)
+        assert pu.flush()
+        assert not pu.flush()
+        with Image.open(preview_file) as img:
+            assert img.getpixel((0, 5)) == (0, 0, 0)
+            assert img.getpixel((0, 15)) == (255, 0, 0)
+
+        # the preview is loaded back from the file
+        pu.release()
+        pu.update_preview(chunk_file, 3)
+        pu.clear(2)
+        pu.flush()
+        with Image.open(preview_file) as img:
+            assert img.getpixel((0, 15)) == (0, 0, 0)
+            assert img.getpixel((0, 25)) == (255, 0, 0)
+
+        pu.restart()
+        with Image.open(preview_file) as img:
+            assert img.getpixel((0, 25)) == (0, 0, 0)
+
     def test_error_in_preview_update(self):
         pu = PreviewUpdater(None, PREVIEW_X, PREVIEW_Y, {})
         with self.assertLogs(logger, level="WARNING"):
@@ -1,5 +1,8 @@
+import json
 import logging
 import math
+import os
+from unittest import mock
 
 import numpy
 from golem_verificator.common.rendering_task_utils import get_min_max_y
@@ -119,3 +122,55 @@ class TestBlenderReferenceGenerator(TempDirFixture):
                         j].pixel_region.right
                     assert crops_desc[j].pixel_region.top > crops_desc[
                         j].pixel_region.bottom
+
+    def test_render_crops_batch(self):
+        subtask_info = {
+            'tmp_dir': self.tempdir,
+            'subtask_id': 'subtask',
+            'res_x': 800,
+            'res_y': 600,
+            'crop_window': (0.0, 1.0, 0.0, 1.0),
+            'samples': 5,
+            'outfilebasename': 'out',
+            'subtask_timeout': 600,
+            'ctd': {'extra_data': {
+                'start_task': 2,
+                'frames': [1],
+                'output_format': 'PNG',
+            }},
+        }
+
+        def start_computation(root_path, success_callback, **_kwargs):
+            output_dir = os.path.join(root_path, 'output')
+            os.makedirs(output_dir)
+            files = []
+            for name in ['crop0_ref_out_20001.png', 'crop1_ref_out_20001.png',
+                         'crop2_ref_out_20001.png', 'stdout.log']:
+                files.append(os.path.join(output_dir, name))
+                with open(files[-1], 'w') as f:
+                    f.write(name)
+            files.append(os.path.join(output_dir, 'crop_timings.json'))
+            with open(files[-1], 'w') as f:
+                json.dump({'0': 1.0, '1': 2.0, '2': 3.0}, f)
+            success_callback({'data': files}, 10.0)
+
+        computer = mock.Mock()
+        computer.start_computation.side_effect = start_computation
+        generator = BlenderReferenceGenerator(computer, batch=True)
+
+        finished = generator.render_crops(['scene.blend'], subtask_info)
+
+        computer.start_computation.assert_called_once()
+        ctd = computer.start_computation.call_args[1]['compute_task_def']
+        assert 'sys.exit(0)' in ctd['extra_data']['script_src']
+        log_path = os.path.join(
+            self.tempdir, 'subtask', 'output', 'stdout.log')
+        for i, deferred in enumerate(finished):
+            results, time_spent, _, crop_number = deferred.result
+            crop_file = os.path.join(
+                self.tempdir, 'subtask', str(i), 'ref_out_20001.png')
+            assert crop_number == i
+            assert time_spent == i + 1.0
+            assert results == {'data': [crop_file, log_path]}
+            with open(crop_file) as f:
+                assert f.read() == 'crop{}_ref_out_20001.png'.format(i)
@@ -1,6 +1,7 @@
 import unittest
 from unittest import mock
 import functools
+from twisted.internet.defer import Deferred
 from golem_verificator.blender_verifier import BlenderVerifier
 from golem.core.common import timeout_to_deadline
 from golem.docker.task_thread import DockerTaskThread
@@ -50,3 +51,68 @@ class TestVerificationQueue(unittest.TestCase):
         reactor.run()
 
         _verification_timed_out.assert_called_once()
+
+
+@mock.patch('apps.blender.verification_queue.VerificationTask.start',
+            side_effect=lambda _: Deferred())
+class TestVerificationQueueScheduling(unittest.TestCase):
+
+    def submit(self, queue, subtask_id, deadline, task_id):
+        queue.submit(mock.Mock(), subtask_id, deadline, mock.Mock(),
+                     task_id=task_id)
+
+    def test_earliest_deadline_first(self, _start):
+        queue = VerificationQueue(concurrency=1)
+        queue.pause()
+        self.submit(queue, 'a', 30, 'task1')
+        self.submit(queue, 'b', 10, 'task2')
+        self.submit(queue, 'c', 20, 'task3')
+        self.submit(queue, 'd', 10, 'task2')
+
+        order = []
+        while True:
+            _, queued = queue._next()
+            if not queued:
+                break
+            order.append(queued[3].subtask_id)
+        assert order == ['b', 'd', 'c', 'a']
+
+    def test_fair_share(self, _start):
+        queue = VerificationQueue(concurrency=2)
+        queue.pause()
+        for subtask_id in ['a1', 'a2', 'a3']:
+            self.submit(queue, subtask_id, 10, 'task_a')
+        self.submit(queue, 'b1', 20, 'task_b')
+
+        queue.resume()
+        assert set(queue._jobs) == {'a1', 'b1'}
+        assert queue.get_stats()['queued'] == 2
+
+    def test_idle_task_gives_up_share(self, _start):
+        queue = VerificationQueue(concurrency=2)
+        self.submit(queue, 'a1', 10, 'task_a')
+        self.submit(queue, 'a2', 10, 'task_a')
+        assert set(queue._jobs) == {'a1', 'a2'}
+
+    def test_stats(self, _start):
+        queue = VerificationQueue(concurrency=1)
+        self.submit(queue, 'a', 10, 'task')
+        self.submit(queue, 'b', 10, 'task')
+        stats = queue.get_stats()
+        assert stats['started'] == 1
+        assert stats['running'] == 1
+        assert stats['queued'] == 1
+        assert stats['concurrency'] == 1
+        assert stats['verified'] == 0
+        assert stats['mean_queue_wait'] >= 0
+
+    @mock.patch('apps.blender.verification_queue.psutil.virtual_memory')
+    @mock.patch('apps.blender.verification_queue.multiprocessing.cpu_count')
+    def test_default_concurrency(self, cpu_count, virtual_memory, _start):
+        cpu_count.return_value = 8
+        virtual_memory.return_value.available = 3 * 1024 ** 3
+        assert VerificationQueue.default_concurrency() == 1
+        virtual_memory.return_value.available = 32 * 1024 ** 3
+        assert VerificationQueue.default_concurrency() == 4
+        cpu_count.return_value = 1
+        assert VerificationQueue.default_concurrency() == 1
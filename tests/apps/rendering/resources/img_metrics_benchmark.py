@@ -0,0 +1,108 @@
+import os
+import tempfile
+
+import cv2
+import numpy
+import pytest
+from PIL import Image
+
+from apps.rendering.resources.scripts import img_metrics_calculator
+from apps.rendering.resources.scripts.img_format_converter import \
+    ConvertTGAToPNG
+from apps.rendering.resources.scripts.imgmetrics import ImgMetrics
+
+SCENE_SIZE = (1920, 1080)
+CROPS_NUMBER = 3
+
+
+def skip_benchmarks():
+    if os.environ.get('benchmarks', False):
+        return False
+    return True
+
+
+@pytest.fixture(scope='module')
+def scene_with_crops(request):
+    width, height = request.param
+    tmp_dir = tempfile.mkdtemp()
+    random = numpy.random.RandomState(0)
+    scene = random.randint(0, 256, SCENE_SIZE[::-1] + (3,), dtype=numpy.uint8)
+    scene_path = os.path.join(tmp_dir, 'scene.tga')
+    Image.fromarray(scene, 'RGB').save(scene_path)
+
+    crops = []
+    for i in range(CROPS_NUMBER):
+        x = random.randint(0, SCENE_SIZE[0] - width)
+        y = random.randint(0, SCENE_SIZE[1] - height)
+        crop_path = os.path.join(tmp_dir, 'crop{}.png'.format(i))
+        cv2.imwrite(crop_path, scene[y:y + height, x:x + width, ::-1])
+        crops.append((crop_path, x, y))
+
+    output_paths = [
+        os.path.join(tmp_dir, 'metrics{}.txt'.format(i))
+        for i in range(CROPS_NUMBER)
+    ]
+    return crops, scene_path, output_paths
+
+
+# Crops are 10% of the subtask size, at least 8 pixels
+CROP_SIZES = [(8, 8), (96, 54), (192, 108)]
+
+
+def legacy_compare_crop_window(crop_path, scene_path, x, y, output_path):
+    """ Metrics calculated as before the pipeline was restructured: the scene
+    is converted to PNG on disk, every metric converts the crops on its own
+    and histograms of all channels are calculated """
+    png_path = os.path.join(os.path.dirname(scene_path), 'scene.png')
+    ConvertTGAToPNG(scene_path, png_path)
+    scene = cv2.imread(png_path)
+    image_a = cv2.imread(crop_path)
+    height, width = image_a.shape[:2]
+    image_b = scene[y:y + height, x:x + width]
+
+    for ch in range(3):
+        hist_a = cv2.calcHist([image_a], [ch], None, [256], [0, 255])
+        hist_b = cv2.calcHist([image_b], [ch], None, [256], [0, 255])
+        cv2.normalize(hist_a, hist_a, 0, 255, cv2.NORM_MINMAX)
+        cv2.normalize(hist_b, hist_b, 0, 255, cv2.NORM_MINMAX)
+    ssim_normal, mse_normal = img_metrics_calculator.compare_mse_ssim(
+        image_a, image_b)
+    ssim_canny, mse_canny = img_metrics_calculator.compare_images_transformed(
+        cv2.Canny(image_a, 0, 0), cv2.Canny(image_b, 0, 0))
+    ssim_wavelet, mse_wavelet = \
+        img_metrics_calculator.compare_images_transformed(
+            *img_metrics_calculator.images_to_wavelet_transform(
+                image_a, image_b))
+    return ImgMetrics({
+        "imgCorr": cv2.compareHist(hist_a, hist_b, cv2.HISTCMP_CORREL),
+        "SSIM_normal": ssim_normal,
+        "MSE_normal": mse_normal,
+        "SSIM_canny": ssim_canny,
+        "MSE_canny": mse_canny,
+        "MSE_wavelet": mse_wavelet,
+        "SSIM_wavelet": ssim_wavelet,
+        "crop_resolution": str(height) + "x" + str(width),
+    }).write_to_file(output_path)
+
+
+def legacy_compare(crops, scene_path, output_paths):
+    # A separate call for each crop, as it is done by the verifier
+    return [
+        legacy_compare_crop_window(crop_path, scene_path, x, y, output_path)
+        for (crop_path, x, y), output_path in zip(crops, output_paths)
+    ]
+
+
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.parametrize("scene_with_crops", CROP_SIZES, indirect=True)
+@pytest.mark.benchmark(min_rounds=5, warmup=False)
+def test_legacy_compare_speed(benchmark, scene_with_crops):
+    assert len(benchmark(legacy_compare, *scene_with_crops)) == CROPS_NUMBER
+
+
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.parametrize("scene_with_crops", CROP_SIZES, indirect=True)
+@pytest.mark.benchmark(min_rounds=5, warmup=False)
+def test_compare_crop_windows_speed(benchmark, scene_with_crops):
+    assert len(benchmark(img_metrics_calculator.compare_crop_windows,
+                         *scene_with_crops)) == CROPS_NUMBER
@@ -0,0 +1,75 @@
+import os
+
+import cv2
+import numpy
+from PIL import Image
+
+from apps.rendering.resources.scripts import img_metrics_calculator
+from apps.rendering.resources.scripts.img_format_converter import \
+    ConvertTGAToPNG
+from apps.rendering.resources.scripts.imgmetrics import ImgMetrics
+from golem.testutils import TempDirFixture
+
+
+class TestImgMetricsCalculator(TempDirFixture):
+
+    def setUp(self):
+        super().setUp()
+        random = numpy.random.RandomState(0)
+        self.scene = random.randint(0, 256, (90, 160, 4), dtype=numpy.uint8)
+        self.scene_path = os.path.join(self.tempdir, 'scene.tga')
+        Image.fromarray(self.scene, 'RGBA').save(self.scene_path)
+
+    def _save_crop(self, name, x, y, width, height):
+        path = os.path.join(self.tempdir, name)
+        bgr = self.scene[y:y + height, x:x + width, 2::-1]
+        cv2.imwrite(path, bgr)
+        return path
+
+    def test_load_tga(self):
+        png_path = os.path.join(self.tempdir, 'scene.png')
+        ConvertTGAToPNG(self.scene_path, png_path)
+
+        image = img_metrics_calculator.load_image(self.scene_path)
+        numpy.testing.assert_array_equal(image, cv2.imread(png_path))
+
+    def test_compare_images(self):
+        image_a = cv2.imread(self._save_crop('a.png', 0, 0, 40, 30))
+        image_b = cv2.imread(self._save_crop('b.png', 20, 10, 40, 30))
+
+        metrics = img_metrics_calculator.compare_images(image_a, image_b)
+
+        assert (metrics.SSIM_normal, metrics.MSE_normal) == \
+            img_metrics_calculator.compare_mse_ssim(image_a, image_b)
+        assert (metrics.SSIM_wavelet, metrics.MSE_wavelet) == \
+            img_metrics_calculator.compare_images_transformed(
+                *img_metrics_calculator.images_to_wavelet_transform(
+                    image_a, image_b))
+        assert metrics.crop_resolution == '30x40'
+
+        same = img_metrics_calculator.compare_images(image_a, image_a)
+        assert same.MSE_normal == 0
+        assert same.imgCorr == 1
+
+    def test_compare_crop_windows(self):
+        crops = [
+            (self._save_crop('crop0.png', 10, 20, 16, 9), 10, 20),
+            (self._save_crop('crop1.png', 100, 50, 32, 18), 100, 50),
+        ]
+        output_paths = [
+            os.path.join(self.tempdir, 'batch{}.txt'.format(i))
+            for i in range(len(crops))
+        ]
+
+        paths = img_metrics_calculator.compare_crop_windows(
+            crops, self.scene_path, output_paths)
+
+        assert paths == output_paths
+        for i, (crop_path, x, y) in enumerate(crops):
+            single_path = img_metrics_calculator.compare_crop_window(
+                crop_path, self.scene_path, x, y,
+                os.path.join(self.tempdir, 'single{}.txt'.format(i)))
+            batch = ImgMetrics.load_from_file(paths[i])
+            single = ImgMetrics.load_from_file(single_path)
+            assert batch.__dict__ == single.__dict__
+            assert batch.MSE_normal == 0
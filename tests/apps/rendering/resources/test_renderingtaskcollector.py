@@ -1,5 +1,7 @@
 import os
 import random
+from unittest import mock
+
 import numpy as np
 import cv2
 import pytest
@@ -80,6 +82,45 @@ class TestRenderingTaskCollector(TestDirFixture):
         assert isinstance(img, OpenCVImgRepr)
         assert img.img.shape[:2] == (20, 10)
 
+    def test_finalize_decodes_parts_once(self):
+        collector = RenderingTaskCollector()
+        for i in range(3):
+            img_path = self.temp_file_name("img{}.png".format(i))
+            make_test_img(img_path, size=(10, 5 + i))
+            collector.add_img_file(img_path)
+
+        with mock.patch.object(OpenCVImgRepr, 'load_from_file',
+                               autospec=True,
+                               side_effect=OpenCVImgRepr.load_from_file) \
+                as load:
+            final_img = collector.finalize()
+
+        assert load.call_count == 3
+        assert final_img.img.shape == (18, 10, 3)
+
+    def test_finalize_memmap(self):
+        collector = RenderingTaskCollector()
+        images = []
+        for i in range(3):
+            images.append(self.temp_file_name("img{}.png".format(i)))
+            make_test_img_16bits(images[-1], width=12, height=7,
+                                 color=(i, 100 * i, 1000 * i))
+            collector.add_img_file(images[-1])
+
+        expected = collector.finalize()
+        with mock.patch('apps.rendering.resources.renderingtaskcollector'
+                        '.MEMMAP_THRESHOLD', 0):
+            final_img = collector.finalize()
+
+        assert isinstance(final_img.img, np.memmap)
+        assert final_img.img.dtype == np.uint16
+        np.testing.assert_array_equal(final_img.img, expected.img)
+
+        final_path = self.temp_file_name("final.png")
+        final_img.save(final_path)
+        np.testing.assert_array_equal(
+            cv2.imread(final_path, cv2.IMREAD_UNCHANGED), expected.img)
+
     def test_opencv_nonexisting_img(self):
         collector = RenderingTaskCollector()
         collector.add_img_file("img.png")
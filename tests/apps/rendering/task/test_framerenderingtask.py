@@ -283,6 +283,43 @@ class TestFrameRenderingTask(TestDirFixture, LogTestCase):
         assert isinstance(img_repr, EXRImgRepr)
         img_repr.close()
 
+    def test_subtask_delta(self):
+        task = self._get_frame_task(use_frames=False)
+        fresh_task = self._get_frame_task(use_frames=False)
+        for t in (task, fresh_task):
+            t.last_task = 3
+            t.num_failed_subtasks = 1
+            for sid, start_task, status in [
+                    ("SUBTASK1", 3, SubtaskStatus.finished),
+                    ("SUBTASK2", 2, SubtaskStatus.failure)]:
+                t.subtasks_given[sid] = {
+                    "start_task": start_task, "end_task": start_task,
+                    "node_id": "NODE 1", "parts": 1, "frames": [1],
+                    "status": status}
+        task.collected_file_names[3] = "img3.png"
+        task.collected_file_names[4] = "img4.png"
+
+        # the failed subtask is resent as a new one
+        assert task._get_next_task() == (2, 2)
+        task.subtasks_given["SUBTASK3"] = dict(
+            task.subtasks_given["SUBTASK2"], status=SubtaskStatus.starting)
+
+        # only the changed subtasks and collected files are recorded
+        delta1 = task.get_subtask_delta("SUBTASK1")
+        assert delta1['statuses'] == {}
+        assert delta1['collected_file_names'] == {3: "img3.png"}
+        delta3 = task.get_subtask_delta("SUBTASK3")
+        assert delta3['statuses'] == {"SUBTASK2": SubtaskStatus.resent}
+        assert delta3['collected_file_names'] == {}
+
+        fresh_task.apply_subtask_delta("SUBTASK1", delta1)
+        fresh_task.apply_subtask_delta("SUBTASK3", delta3)
+        assert fresh_task.collected_file_names == {3: "img3.png"}
+        assert fresh_task.num_failed_subtasks == 0
+        for sid in ("SUBTASK1", "SUBTASK2", "SUBTASK3"):
+            assert fresh_task.subtasks_given[sid]['status'] == \
+                task.subtasks_given[sid]['status']
+
     def test_put_frame_together(self):
         task = self._get_frame_task(True)
         task.output_format = "exr"
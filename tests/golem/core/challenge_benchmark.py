@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+from golem.core.keysauth import sha2
+from golem.core.simplechallenge import ChallengeSolver, _solve_range
+
+CHALLENGE = 'challenge'
+HASHES = 200000
+
+
+def skip_benchmarks():
+    if os.environ.get('benchmarks', False):
+        return False
+    return True
+
+
+def legacy_loop(hashes: int):
+    # The loop solve_challenge used before, checks `hashes` solutions
+    min_hash = pow(2, 0)
+    solution = 0
+    while sha2(CHALLENGE + str(solution)) > min_hash and solution < hashes:
+        solution += 1
+
+
+def solve_range(hashes: int):
+    _solve_range(CHALLENGE, 256, 0, hashes)
+
+
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.parametrize("solve", [legacy_loop, solve_range])
+@pytest.mark.benchmark(min_rounds=5, warmup=False)
+def test_hashes_speed(benchmark, solve):
+    benchmark(solve, HASHES)
+    benchmark.extra_info['hashes_per_sec'] = \
+        HASHES / benchmark.stats.stats.mean
+
+
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.parametrize("processes", [1, 2, 4])
+@pytest.mark.benchmark(min_rounds=5, warmup=False)
+def test_solver_speed(benchmark, processes: int):
+    solver = ChallengeSolver(processes)
+    # Start the worker processes before measuring
+    solver.solve_sync(CHALLENGE, 16)
+    try:
+        benchmark(solver.solve_sync, CHALLENGE, 22)
+    finally:
+        solver.close()
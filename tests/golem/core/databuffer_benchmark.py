@@ -0,0 +1,32 @@
+import os
+import struct
+
+import pytest
+
+from golem.core.databuffer import DataBuffer
+
+CHUNK_SIZE = 4 * 1024
+
+
+def skip_benchmarks():
+    if os.environ.get('benchmarks', False):
+        return False
+    return True
+
+
+def receive(data: bytes):
+    db = DataBuffer()
+    messages = []
+    for i in range(0, len(data), CHUNK_SIZE):
+        db.append_bytes(data[i:i + CHUNK_SIZE])
+        messages.extend(db.get_len_prefixed_bytes())
+    return messages
+
+
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.parametrize("size", [1, 4, 16])
+@pytest.mark.benchmark(min_rounds=5, warmup=False)
+def test_receive_speed(benchmark, size: int):
+    msg = os.urandom(size * 1024 * 1024)
+    data = struct.pack("!L", len(msg)) + msg
+    assert benchmark(receive, data) == [msg]
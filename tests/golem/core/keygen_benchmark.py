@@ -10,8 +10,8 @@ def skip_benchmarks():
     return True
 
 
-def key_gen(d: int):
-    return KeysAuth._generate_keys(difficulty=d)
+def key_gen(d: int, processes=None):
+    return KeysAuth._generate_keys(difficulty=d, processes=processes)
 
 
 @pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
@@ -19,3 +19,10 @@ def key_gen(d: int):
 @pytest.mark.benchmark(min_rounds=20, warmup=False)
 def test_key_gen_speed(benchmark, d: int):
     benchmark(key_gen, d)
+
+
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.parametrize("processes", [1, 2, 4])
+@pytest.mark.benchmark(min_rounds=5, warmup=False)
+def test_key_gen_pool_speed(benchmark, processes: int):
+    benchmark(key_gen, 18, processes)
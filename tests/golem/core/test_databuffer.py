@@ -0,0 +1,67 @@
+import struct
+from unittest import TestCase
+from unittest.mock import patch
+
+from golem.core.databuffer import DataBuffer
+
+
+class TestDataBuffer(TestCase):
+
+    def setUp(self):
+        self.db = DataBuffer()
+
+    def test_ulong(self):
+        self.assertIsNone(self.db.peek_ulong())
+        with self.assertRaises(ValueError):
+            self.db.read_ulong()
+        with self.assertRaises(AttributeError):
+            self.db.append_ulong(-1)
+
+        self.assertEqual(self.db.append_ulong(1024), struct.pack("!L", 1024))
+        self.assertEqual(self.db.peek_ulong(), 1024)
+        self.assertEqual(self.db.data_size(), 4)
+        self.assertEqual(self.db.read_ulong(), 1024)
+        self.assertEqual(self.db.data_size(), 0)
+
+    def test_bytes(self):
+        self.db.append_bytes(b"abc")
+        self.db.append_bytes(bytearray(b"def"))
+        with self.assertRaises(AttributeError):
+            self.db.peek_bytes(7)
+
+        self.assertEqual(self.db.peek_bytes(2), b"ab")
+        self.assertEqual(self.db.read_bytes(2), b"ab")
+        self.assertEqual(self.db.buffered_data, b"cdef")
+        self.assertEqual(self.db.read_all(), b"cdef")
+        self.assertEqual(self.db.data_size(), 0)
+        self.assertEqual(self.db.read_all(), b"")
+
+    def test_len_prefixed_bytes(self):
+        self.assertIsNone(self.db.read_len_prefixed_bytes())
+        self.db.append_len_prefixed_bytes(b"first")
+        self.db.append_len_prefixed_bytes(b"second")
+        self.db.append_len_prefixed_bytes(b"")
+        self.db.append_bytes(struct.pack("!L", 5) + b"thi")
+
+        self.assertEqual(self.db.read_len_prefixed_bytes(), b"first")
+        self.assertEqual(list(self.db.get_len_prefixed_bytes()),
+                         [b"second", b""])
+        self.assertIsNone(self.db.read_len_prefixed_bytes())
+
+        self.db.append_bytes(b"rd")
+        self.assertEqual(list(self.db.get_len_prefixed_bytes()), [b"third"])
+        self.assertEqual(self.db.data_size(), 0)
+
+    @patch('golem.core.databuffer.COMPACT_THRESHOLD', 8)
+    def test_compact(self):
+        messages = [bytes([i]) * 10 for i in range(10)]
+        received = []
+
+        for msg in messages:
+            data = struct.pack("!L", len(msg)) + msg
+            for i in range(0, len(data), 3):
+                self.db.append_bytes(data[i:i + 3])
+                received.extend(self.db.get_len_prefixed_bytes())
+            self.assertLess(len(self.db._buffer), 2 * len(data))
+
+        self.assertEqual(received, messages)
@@ -1,5 +1,7 @@
+import io
 import os
 import random
+from unittest import mock
 
 from io import IOBase
 
@@ -42,6 +44,27 @@ class TestAESFileEncryptor(TestDirFixture):
                 "Incorrect ciphertext size: {}. Should be multiple of {}".format(len(encrypted),
                                                                                  AESFileEncryptor.block_size))
 
+    def test_stream_encryptor(self):
+        secret = FileEncryptor.gen_secret(10, 20)
+        salt = AESFileEncryptor.gen_salt(AESFileEncryptor.block_size)
+
+        with open(self.test_file_path, 'rb') as f:
+            data = f.read()
+
+        with mock.patch.object(AESFileEncryptor, 'gen_salt',
+                               return_value=salt):
+            AESFileEncryptor.encrypt(self.test_file_path,
+                                     self.enc_file_path,
+                                     secret)
+            dst = io.BytesIO()
+            encryptor = AESFileEncryptor.stream_encryptor(dst, secret)
+            for i in range(0, len(data), 7):
+                encryptor.write(data[i:i + 7])
+            encryptor.finish()
+
+        with open(self.enc_file_path, 'rb') as f:
+            self.assertEqual(dst.getvalue(), f.read())
+
     def test_decrypt(self):
         """ Test decryption procedure """
         secret = FileEncryptor.gen_secret(10, 20)
@@ -1,7 +1,10 @@
+import math
+import multiprocessing
 import os
 import shutil
 import time
 from random import random, randint
+from unittest import TestCase
 from unittest.mock import patch
 
 from golem_messages import message
@@ -212,23 +215,62 @@ class TestKeysAuth(testutils.PEP8MixIn, testutils.TempDirFixture):
 
 class TestKeysAuthWithReactor(TestWithReactor):
 
-    @patch('golem.core.keysauth.logger')
-    def test_generate_keys_stop_when_reactor_stopped(self, logger):
+    def _generate_keys_and_stop_reactor(self, logger, processes):
         # given
         from twisted.internet import threads
         reactor = self._get_reactor()
 
         # when
-        threads.deferToThread(KeysAuth._generate_keys, difficulty=200)
+        threads.deferToThread(
+            KeysAuth._generate_keys, difficulty=200, processes=processes)
 
         time.sleep(0.01)
         reactor.stop()
-        time.sleep(0.01)
+        # worker processes are terminated after the warning is logged
+        deadline = time.time() + 10
+        while (not logger.warning.called or multiprocessing.active_children()) \
+                and time.time() < deadline:
+            time.sleep(0.01)
 
         # then
         assert not reactor.running
+        assert not multiprocessing.active_children()
         assert logger.info.call_count == 1
         assert logger.info.call_args_list[0][0][0] == 'Generating new key pair'
         assert logger.warning.call_count == 1
         assert logger.warning.call_args_list[0][0][0] == \
             'reactor stopped, aborting key generation ..'
+
+    @patch('golem.core.keysauth.logger')
+    def test_generate_keys_stop_when_reactor_stopped(self, logger):
+        self._generate_keys_and_stop_reactor(logger, processes=1)
+
+    @patch('golem.core.keysauth.KEYGEN_POOL_MIN_DIFFICULTY', 0)
+    @patch('golem.core.keysauth.logger')
+    def test_generate_keys_in_pool_stop_when_reactor_stopped(self, logger):
+        self._generate_keys_and_stop_reactor(logger, processes=2)
+
+
+class TestGenerateKeys(TestCase):
+
+    def test_single_process(self):
+        priv_key, pub_key = KeysAuth._generate_keys(difficulty=6, processes=1)
+        assert privtopub(priv_key) == pub_key
+        assert KeysAuth.is_pubkey_difficult(pub_key, 6)
+
+    @patch('golem.core.keysauth.KEYGEN_POOL_MIN_DIFFICULTY', 0)
+    @patch('golem.core.keysauth.KEYGEN_BATCH_TIME', 0.1)
+    def test_pool(self):
+        priv_key, pub_key = KeysAuth._generate_keys(difficulty=6, processes=2)
+        assert privtopub(priv_key) == pub_key
+        assert KeysAuth.is_pubkey_difficult(pub_key, 6)
+        assert not multiprocessing.active_children()
+
+    @patch('golem.core.keysauth.logger')
+    def test_log_progress(self, logger):
+        KeysAuth._log_progress(difficulty=10, tried=1024, elapsed=2.)
+        args = logger.info.call_args[0]
+        assert args[1:] == (1024, 2., 512., 100. * (1. - math.exp(-1)), '2s')
+
+        KeysAuth._log_progress(difficulty=10, tried=0, elapsed=0.)
+        assert logger.info.call_args[0][-1] == 'unknown'
@@ -0,0 +1,75 @@
+import multiprocessing
+import threading
+from unittest import TestCase
+from unittest.mock import patch
+
+from golem.core import simplechallenge
+from golem.core.keysauth import sha2
+from golem.core.simplechallenge import (
+    accept_challenge, ChallengeSolver, ChallengeSolverClosed,
+    create_challenge, solve_challenge)
+
+
+def legacy_solve_challenge(challenge, difficulty):
+    min_hash = pow(2, 256 - difficulty)
+    solution = 0
+    while sha2(challenge + str(solution)) > min_hash:
+        solution += 1
+    return solution
+
+
+class TestSimpleChallenge(TestCase):
+
+    def setUp(self):
+        self.challenge = create_challenge([['key_id', 'challenge']], 'prev')
+
+    @patch('golem.core.simplechallenge.SOLVE_BATCH_SIZE', 10)
+    def test_solve_challenge(self):
+        for difficulty in range(8):
+            solution, _ = solve_challenge(self.challenge, difficulty)
+            assert solution == \
+                legacy_solve_challenge(self.challenge, difficulty)
+            assert accept_challenge(self.challenge, solution, difficulty)
+
+    def test_solve_range(self):
+        solution = legacy_solve_challenge(self.challenge, 6)
+        # pylint: disable=protected-access
+        solve_range = simplechallenge._solve_range
+        assert solve_range(self.challenge, 6, 0, solution) is None
+        assert solve_range(self.challenge, 6, 0, solution + 1) == solution
+        assert solve_range(self.challenge, 0, 5, 10) == 5
+
+
+class TestChallengeSolver(TestCase):
+
+    @patch('golem.core.simplechallenge.SOLVE_POOL_MIN_DIFFICULTY', 0)
+    @patch('golem.core.simplechallenge.SOLVE_BATCH_SIZE', 10)
+    def test_solve_in_pool(self):
+        challenge = 'challenge'
+        solver = ChallengeSolver(processes=2)
+        try:
+            for difficulty in (4, 8):
+                solution, _ = solver.solve_sync(challenge, difficulty)
+                assert solution == \
+                    legacy_solve_challenge(challenge, difficulty)
+        finally:
+            solver.close()
+        # pylint: disable=protected-access
+        assert solver._pool is None
+
+    @patch('golem.core.simplechallenge.SOLVE_POOL_MIN_DIFFICULTY', 0)
+    def test_close_while_solving(self):
+        solver = ChallengeSolver(processes=2)
+        timer = threading.Timer(1., solver.close)
+        timer.start()
+        with self.assertRaises(ChallengeSolverClosed):
+            solver.solve_sync('challenge', 200)
+        timer.join()
+        assert not multiprocessing.active_children()
+
+    @patch('golem.core.simplechallenge.threads')
+    def test_solve(self, threads):
+        solver = ChallengeSolver(processes=1)
+        solver.solve('challenge', 4)
+        threads.deferToThread.assert_called_once_with(
+            solver.solve_sync, 'challenge', 4)
@@ -1,4 +1,5 @@
 from threading import Thread
+from unittest.mock import patch
 
 from golem.core.statskeeper import IntStatsKeeper
 from golem.task.taskcomputer import CompStats
@@ -27,14 +28,35 @@ class TestStatsKeeper(TestWithDatabase):
         st.increase_stat("computed_tasks")
         self._compare_stats(st, [3, 0, 0] * 2)
 
+        # increments are saved by flush
+        self._compare_stats(IntStatsKeeper(CompStats), [0] * 6)
+        st.flush()
+
         st2 = IntStatsKeeper(CompStats)
         self._compare_stats(st2, [3] + [0] * 5)
         st2.increase_stat("computed_tasks")
         self._compare_stats(st2, [4, 0, 0, 1, 0, 0])
         st2.increase_stat("computed_tasks")
         self._compare_stats(st2, [5, 0, 0, 2, 0, 0])
+        st2.flush()
         st.increase_stat("computed_tasks")
-        self._compare_stats(st, [6, 0, 0, 4, 0, 0])
+        self._compare_stats(st, [4, 0, 0, 4, 0, 0])
+        st.flush()
+
+        st3 = IntStatsKeeper(CompStats)
+        self._compare_stats(st3, [6] + [0] * 5)
+        assert st3.get_stats("computed_tasks") == (0, 6)
+
+    def test_flush_failure(self):
+        st = IntStatsKeeper(CompStats)
+        st.increase_stat("computed_tasks")
+        with patch('golem.core.statskeeper.Stats.update',
+                   side_effect=Exception):
+            st.flush()
+        st.increase_stat("computed_tasks")
+        st.flush()
+
+        self._compare_stats(IntStatsKeeper(CompStats), [2] + [0] * 5)
 
     def test_for_race_conditions(self):
         n_threads = 10
@@ -58,3 +80,6 @@ class TestStatsKeeper(TestWithDatabase):
 
         self.assertEqual(sk.session_stats.computed_tasks, n_expected)
         self.assertEqual(sk.global_stats.computed_tasks, n_expected)
+        sk.flush()
+        self.assertEqual(IntStatsKeeper(CompStats).global_stats.computed_tasks,
+                         n_expected)
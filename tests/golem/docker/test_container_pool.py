@@ -0,0 +1,392 @@
+import itertools
+import os
+from unittest import mock
+
+import docker.errors
+import requests
+
+from golem.docker.image import DockerImage
+from golem.docker.job import DockerJob
+from golem.docker.pool import ContainerPool, PooledDockerJob, \
+    WIPE_TMPFS_COMMAND
+from golem.testutils import TempDirFixture
+
+
+class SyncThread:
+    """ Runs the target when the thread is started """
+
+    def __init__(self, target, args=(), **_):
+        self.target = target
+        self.args = args
+
+    def start(self):
+        self.target(*self.args)
+
+
+class ContainerPoolTestBase(TempDirFixture):
+
+    def setUp(self):
+        super().setUp()
+        self.client = mock.MagicMock()
+        self.client.inspect_image.return_value = {
+            'Config': {'Entrypoint': ['/entrypoint.sh']}
+        }
+        self.client.top.return_value = {'Processes': [['1', 'tail']]}
+        self.client.diff.return_value = [
+            {'Path': '/home/task', 'Kind': 1},
+            {'Path': '/etc/passwd', 'Kind': 0},
+        ]
+        self.client.exec_create.return_value = {'Id': 'exec'}
+        self.client.exec_inspect.return_value = {
+            'Running': False,
+            'ExitCode': 0,
+        }
+
+        ids = ('container-{}'.format(i) for i in itertools.count())
+        patches = [
+            mock.patch('golem.docker.pool.local_client',
+                       return_value=self.client),
+            mock.patch('golem.docker.pool.threading.Thread', SyncThread),
+            mock.patch.object(DockerJob, 'create_container',
+                              side_effect=lambda *_, **__: {'Id': next(ids)}),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+        self.image = DockerImage('golemfactory/base', tag='1.2')
+        self.host_config = {'mem_limit': '1g'}
+        self.pool = ContainerPool(os.path.join(self.path, 'pool'), size=1)
+
+
+class TestContainerPool(ContainerPoolTestBase):
+
+    def test_acquire_creates_container(self):
+        container = self.pool.acquire(self.image, self.host_config)
+
+        assert container.container_id == 'container-0'
+        assert container.entrypoint == ['/entrypoint.sh']
+        assert container.uses == 1
+        for name in ('resources', 'work', 'output', 'logs'):
+            assert os.path.isdir(container.get_dir(name))
+        self.client.start.assert_called_once_with('container-0')
+        # the user running jobs is set up before the first one
+        self.client.exec_create.assert_called_once_with(
+            'container-0', cmd=['/entrypoint.sh', '-c', 'pass'])
+        assert container.changes == {('/home/task', 1), ('/etc/passwd', 0)}
+
+        stats = self.pool.get_stats()
+        assert stats['misses'] == 1
+        assert stats['created'] == 1
+        assert stats['busy'] == 1
+        assert stats['idle'] == 0
+
+    def test_acquire_takes_idle_container(self):
+        container = self.pool.acquire(self.image, self.host_config)
+        self.pool.release(container)
+
+        assert self.pool.acquire(self.image, self.host_config) is container
+        assert container.uses == 2
+        stats = self.pool.get_stats()
+        assert stats['hits'] == 1
+        assert stats['created'] == 1
+
+    def test_acquire_by_host_config(self):
+        container = self.pool.acquire(self.image, self.host_config)
+        self.pool.release(container)
+
+        container = self.pool.acquire(self.image, {'mem_limit': '2g'})
+
+        assert container.container_id == 'container-1'
+        assert self.pool.get_stats()['idle'] == 1
+
+    def test_acquire_fills_pool(self):
+        self.pool.size = 2
+        self.pool.acquire(self.image, self.host_config)
+
+        stats = self.pool.get_stats()
+        assert stats['created'] == 2
+        assert stats['busy'] == 1
+        assert stats['idle'] == 1
+        assert stats['pending'] == 0
+
+        assert self.pool.acquire(self.image, self.host_config) \
+            .container_id == 'container-1'
+        assert self.pool.get_stats()['created'] == 2
+
+    def test_fill_failure(self):
+        self.pool.size = 2
+        self.client.start.side_effect = [
+            None, requests.exceptions.ConnectionError]
+
+        self.pool.acquire(self.image, self.host_config)
+
+        stats = self.pool.get_stats()
+        assert stats['created'] == 1
+        assert stats['busy'] == 1
+        assert stats['idle'] == 0
+        assert stats['pending'] == 0
+
+    def test_acquire_skips_dead_containers(self):
+        container = self.pool.acquire(self.image, self.host_config)
+        self.pool.release(container)
+        self.client.top.side_effect = [docker.errors.APIError('not running')]
+
+        container = self.pool.acquire(self.image, self.host_config)
+
+        assert container.container_id == 'container-1'
+        self.client.remove_container.assert_called_once_with(
+            'container-0', force=True)
+
+    def test_acquire_removes_expired_containers(self):
+        container = self.pool.acquire(self.image, self.host_config)
+        self.pool.release(container)
+        self.pool.idle_timeout = -1
+
+        container = self.pool.acquire(self.image, self.host_config)
+
+        assert container.container_id == 'container-1'
+        self.client.remove_container.assert_called_once_with(
+            'container-0', force=True)
+        assert self.pool.get_stats()['misses'] == 2
+
+    def test_create_failure(self):
+        self.client.start.side_effect = requests.exceptions.ConnectionError
+
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self.pool.acquire(self.image, self.host_config)
+
+        self.client.remove_container.assert_called_once_with(
+            'container-0', force=True)
+        assert not os.listdir(self.pool.root_dir)
+
+    def test_release_recycles_container(self):
+        first = self.pool.acquire(self.image, self.host_config)
+        second = self.pool.acquire(self.image, self.host_config)
+        open(os.path.join(second.get_dir('output'), 'result'), 'w').close()
+        os.mkdir(os.path.join(second.get_dir('work'), 'tmp'))
+
+        # created on demand above the size of the pool
+        self.pool.release(first)
+        self.pool.release(second)
+
+        assert not os.path.exists(first.slot_dir)
+        assert not os.listdir(second.get_dir('output'))
+        assert not os.listdir(second.get_dir('work'))
+        stats = self.pool.get_stats()
+        assert stats['recycled'] == 1
+        assert stats['removed'] == 1
+        assert stats['busy'] == 0
+        assert stats['idle'] == 1
+
+    def test_release_not_reusable(self):
+        container = self.pool.acquire(self.image, self.host_config)
+
+        self.pool.release(container, reusable=False)
+
+        assert not os.path.exists(container.slot_dir)
+        assert 'recycled' not in self.pool.get_stats()
+
+    def test_release_with_processes_left(self):
+        container = self.pool.acquire(self.image, self.host_config)
+        self.client.top.return_value = {
+            'Processes': [['1', 'tail'], ['2', 'python']]
+        }
+
+        self.pool.release(container)
+
+        self.client.remove_container.assert_called_once_with(
+            'container-0', force=True)
+        assert self.pool.get_stats()['idle'] == 0
+
+    def test_release_modified_container(self):
+        container = self.pool.acquire(self.image, self.host_config)
+        # e.g. a startup script left for the next job
+        self.client.diff.return_value = self.client.diff.return_value + [
+            {'Path': '/home/task/.config', 'Kind': 1},
+            {'Path': '/home/task/.config/blender/startup.py', 'Kind': 1},
+        ]
+
+        self.pool.release(container)
+
+        self.client.remove_container.assert_called_once_with(
+            'container-0', force=True)
+        assert self.pool.get_stats()['idle'] == 0
+        assert 'recycled' not in self.pool.get_stats()
+
+    def test_release_wipes_tmpfs(self):
+        container = self.pool.acquire(self.image, self.host_config)
+        self.client.exec_create.reset_mock()
+
+        self.pool.release(container)
+
+        self.client.exec_create.assert_called_once_with(
+            'container-0', cmd=WIPE_TMPFS_COMMAND, user='root')
+        self.client.exec_start.assert_called_with('exec')
+        assert self.pool.get_stats()['recycled'] == 1
+
+    def test_release_tmpfs_not_wiped(self):
+        container = self.pool.acquire(self.image, self.host_config)
+        # e.g. files in /dev/shm which the task user cannot remove
+        self.client.exec_inspect.return_value = {
+            'Running': False,
+            'ExitCode': 1,
+        }
+
+        self.pool.release(container)
+
+        self.client.remove_container.assert_called_once_with(
+            'container-0', force=True)
+        assert 'recycled' not in self.pool.get_stats()
+
+    def test_release_after_max_uses(self):
+        self.pool.max_uses = 1
+        container = self.pool.acquire(self.image, self.host_config)
+
+        self.pool.release(container)
+
+        self.client.remove_container.assert_called_once_with(
+            'container-0', force=True)
+        assert self.pool.get_stats()['idle'] == 0
+
+    def test_close(self):
+        self.pool.size = 2
+        container = self.pool.acquire(self.image, self.host_config)
+        self.pool.close()
+        assert self.pool.get_stats()['idle'] == 0
+
+        self.pool.release(container)
+        assert self.client.remove_container.call_count == 2
+        assert self.pool.get_stats()['removed'] == 2
+
+
+class TestPooledDockerJob(ContainerPoolTestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.resources_dir = os.path.join(self.path, 'resources')
+        self.work_dir = os.path.join(self.path, 'work')
+        self.output_dir = os.path.join(self.path, 'output')
+        for path in (self.resources_dir, self.work_dir, self.output_dir):
+            os.makedirs(path)
+        os.makedirs(os.path.join(self.resources_dir, 'scene'))
+        with open(os.path.join(self.resources_dir, 'scene', 'a.blend'),
+                  'w') as f:
+            f.write('scene')
+
+    def _create_job(self):
+        return PooledDockerJob(
+            self.pool,
+            image=self.image,
+            script_src='print("Adventure Time!")\n',
+            parameters={'frames': [1]},
+            resources_dir=self.resources_dir,
+            work_dir=self.work_dir,
+            output_dir=self.output_dir,
+            host_config=self.host_config,
+        )
+
+    def test_run(self):
+        job = self._create_job()
+
+        with job:
+            slot = job.pooled
+            assert job.get_status() == job.STATE_CREATED
+            with open(os.path.join(slot.get_dir('resources'), 'scene',
+                                   'a.blend')) as f:
+                assert f.read() == 'scene'
+            assert os.path.exists(os.path.join(slot.get_dir('work'),
+                                               job.PARAMS_FILE))
+            cmd = self.client.exec_create.call_args[1]['cmd']
+            assert cmd[-2:] == ['/entrypoint.sh', '/golem/work/job.py']
+
+            self.client.exec_inspect.return_value = {
+                'Running': True,
+                'ExitCode': None,
+            }
+            job.start()
+            self.client.exec_start.assert_called_with('exec', detach=True)
+            assert job.get_status() == job.STATE_RUNNING
+
+            # the script writes its result and logs
+            with open(os.path.join(slot.get_dir('output'), 'result.png'),
+                      'w') as f:
+                f.write('result')
+            with open(os.path.join(slot.get_dir('logs'), 'stdout.log'),
+                      'w') as f:
+                f.write('Adventure Time!')
+            self.client.exec_inspect.return_value = {
+                'Running': False,
+                'ExitCode': 0,
+            }
+
+            assert job.wait() == 0
+            stdout = os.path.join(self.path, 'stdout.log')
+            stderr = os.path.join(self.path, 'stderr.log')
+            job.dump_logs(stdout, stderr)
+            with open(stdout) as f:
+                assert f.read() == 'Adventure Time!'
+            assert os.path.getsize(stderr) == 0
+
+        with open(os.path.join(self.output_dir, 'result.png')) as f:
+            assert f.read() == 'result'
+        assert os.path.exists(os.path.join(self.work_dir, job.PARAMS_FILE))
+        assert job.get_status() == job.STATE_REMOVED
+        # the container has been recycled, its slot cleared
+        assert not os.listdir(slot.get_dir('output'))
+        assert not os.listdir(slot.get_dir('resources'))
+        stats = self.pool.get_stats()
+        assert stats['recycled'] == 1
+        assert stats['jobs'] == 1
+        for name in ('acquire_time', 'dispatch_time', 'compute_time',
+                     'collect_time', 'create_time', 'start_time'):
+            assert name in stats
+
+    def test_wait_timeout(self):
+        self.client.exec_inspect.return_value = {
+            'Running': True,
+            'ExitCode': None,
+        }
+        with self._create_job() as job:
+            job.start()
+            with self.assertRaises(requests.exceptions.ReadTimeout):
+                job.wait(timeout=0.1)
+
+        self.client.remove_container.assert_called_with(
+            'container-0', force=True)
+
+    def test_failed_job_not_reused(self):
+        self.client.exec_inspect.return_value = {
+            'Running': False,
+            'ExitCode': 1,
+        }
+        with self._create_job() as job:
+            job.start()
+            assert job.wait() == 1
+
+        self.client.remove_container.assert_called_once_with(
+            'container-0', force=True)
+
+    def test_kill(self):
+        self.client.exec_inspect.return_value = {
+            'Running': True,
+            'ExitCode': None,
+        }
+        with self._create_job() as job:
+            job.start()
+            job.kill()
+            self.client.kill.assert_called_once_with('container-0')
+
+        assert job.killed
+        self.client.remove_container.assert_called_once_with(
+            'container-0', force=True)
+
+    def test_prepare_failure(self):
+        self.client.exec_create.side_effect = docker.errors.APIError('error')
+
+        with self.assertRaises(docker.errors.APIError):
+            with self._create_job():
+                pass
+
+        self.client.remove_container.assert_called_once_with(
+            'container-0', force=True)
@@ -40,3 +40,22 @@ class TestDockerConfigManager(unittest.TestCase):
 
         self.assertFalse('cpuset' in cm.container_host_config)
         self.assertFalse('mem_limit' in cm.container_host_config)
+
+    def test_slot_host_config(self):
+        cm = DockerConfigManager()
+        cm.container_host_config.update(
+            cpuset='0,1,2,3',
+            mem_limit=str(4096 * 1024),
+        )
+
+        assert cm.get_slot_host_config(0, 1) == cm.container_host_config
+
+        first = cm.get_slot_host_config(0, 2)
+        second = cm.get_slot_host_config(1, 2)
+        assert first['cpuset'] == '0,1'
+        assert second['cpuset'] == '2,3'
+        assert first['mem_limit'] == second['mem_limit'] == str(2048 * 1024)
+        assert cm.container_host_config['cpuset'] == '0,1,2,3'
+
+        # more slots than cpus
+        assert cm.get_slot_host_config(5, 8)['cpuset'] == '1'
@@ -50,8 +50,7 @@ class TestDockerTaskThread(TestDockerJob, TestWithDatabase):
             tt = DockerTaskThread("subtask_id", [image],
                                   script, None,
                                   "test task thread", dir_mapping, timeout=30)
-            task_computer.counting_thread = tt
-            task_computer.counting_task = True
+            task_computer.counting_threads["subtask_id"] = tt
             tt.setDaemon(True)
             tt.start()
             time.sleep(1)
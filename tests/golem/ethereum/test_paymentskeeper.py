@@ -75,3 +75,28 @@ class TestPaymentsDatabase(TestWithDatabase):
 
         payments = pd.get_subtasks_payments(['id1', 'id4', 'id2'])
         assert self._get_ids(payments) == ['id1', 'id2']
+
+    def test_tasks_payments_totals(self):
+        pd = PaymentsDatabase()
+        sent = dict(status=PaymentStatus.sent)
+        self._create_payment(subtask='id1', value=2 ** 70, **sent)
+        self._create_payment(subtask='id2', value=3, **sent,
+                             details__fee=5)
+        self._create_payment(subtask='id3', value=1,
+                             status=PaymentStatus.confirmed, details__fee=7)
+        self._create_payment(subtask='id4', value=1)
+
+        assert pd.get_tasks_payments_totals({}) == {}
+
+        totals = pd.get_tasks_payments_totals({
+            'id1': 'task1',
+            'id2': 'task1',
+            'id3': 'task2',
+            'id4': 'task3',
+            'id5': 'task4',
+        })
+        fee1 = pd.get_subtasks_payments(['id1'])[0].details.fee
+        assert totals == {
+            'task1': (2 ** 70 + 3, fee1 + 5),
+            'task2': (1, 7),
+        }
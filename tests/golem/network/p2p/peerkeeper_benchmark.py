@@ -0,0 +1,45 @@
+import os
+import random
+
+import pytest
+
+from golem.network.p2p.peerkeeper import PeerKeeper, K_SIZE
+from tests.factories import p2p as p2p_factories
+
+MESSAGES = 100000
+
+
+def skip_benchmarks():
+    if os.environ.get('benchmarks', False):
+        return False
+    return True
+
+
+def random_key():
+    return '{:0{}x}'.format(random.getrandbits(K_SIZE), K_SIZE // 4)
+
+
+def create_peer_keeper(num_peers: int):
+    peer_keeper = PeerKeeper(random_key())
+    keys = []
+    for _ in range(num_peers):
+        key = random_key()
+        peer_keeper.add_peer(p2p_factories.Node(key=key))
+        keys.append(key)
+    return peer_keeper, keys
+
+
+def receive_messages(peer_keeper: PeerKeeper, keys):
+    for i in range(MESSAGES):
+        key = keys[i % len(keys)]
+        peer_keeper.set_last_message_time(key)
+        if i % 100 == 0:
+            peer_keeper.neighbours(int(key, 16))
+
+
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.parametrize("num_peers", [1000, 5000, 20000])
+@pytest.mark.benchmark(min_rounds=5, warmup=False)
+def test_message_rate(benchmark, num_peers: int):
+    peer_keeper, keys = create_peer_keeper(num_peers)
+    benchmark(receive_messages, peer_keeper, keys)
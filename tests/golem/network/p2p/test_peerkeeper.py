@@ -100,6 +100,33 @@ class TestPeerKeeper(unittest.TestCase, testutils.PEP8MixIn):
         neighs = self.peer_keeper.neighbours(not_added_peer.key_num ^ 1)
         assert not_added_peer == neighs[0]
 
+    def test_bucket_for_peer(self):
+        for _ in range(256):
+            self.peer_keeper.add_peer(MockPeer(random_key(self.n_bytes)))
+        assert len(self.peer_keeper.buckets) > 1
+
+        for bucket in self.peer_keeper.buckets:
+            for key_num in (bucket.start, bucket.end - 1):
+                assert self.peer_keeper.bucket_for_peer(key_num) is bucket
+            for peer in bucket.peers:
+                assert self.peer_keeper.bucket_for_peer(peer.key_num) \
+                    is bucket
+        assert self.peer_keeper.bucket_for_peer(2 ** K_SIZE) is None
+
+    def test_set_last_message_time(self):
+        for _ in range(256):
+            self.peer_keeper.add_peer(MockPeer(random_key(self.n_bytes)))
+        for bucket in self.peer_keeper.buckets:
+            bucket.last_updated = 0
+
+        peer = next(p for b in self.peer_keeper.buckets for p in b.peers)
+        self.peer_keeper.set_last_message_time(peer.key)
+        self.peer_keeper.set_last_message_time('not a key')
+        self.peer_keeper.set_last_message_time(None)
+
+        updated = [b for b in self.peer_keeper.buckets if b.last_updated]
+        assert updated == [self.peer_keeper.bucket_for_peer(peer.key_num)]
+
     def test_estimated_network_size_buckets_bigger_than_k(self):
         for _ in range(self.peer_keeper.k):
             self.peer_keeper.buckets[0].peers.append(
@@ -24,6 +24,7 @@ from golem.network.p2p.peersession import (logger, PeerSession, PeerSessionInfo)
 from golem.tools.assertlogs import LogTestCase
 from tests.factories import p2p as p2p_factories
 from tests.factories import taskserver as task_server_factory
+from tests.factories.task import taskbase as taskbase_factories
 
 
 def fill_slots(msg):
@@ -536,25 +537,25 @@ class TestPeerSession(testutils.DatabaseFixture, LogTestCase,
     def test_react_to_remove_task_wrong_task_owner(self):
         msg, task_id, previous_ka = \
             self._gen_data_for_test_react_to_remove_task()
-        th_mock = MagicMock()
-        th_mock.task_owner.key = "UNKNOWNKEY"
+        header = taskbase_factories.TaskHeader(task_id=task_id)
+        header.task_owner.key = "UNKNOWNKEY"
         task_server = self.peer_session.p2p_service.task_server
-        task_server.task_keeper.task_headers[task_id] = th_mock
+        task_server.task_keeper.task_headers[task_id] = header
         with self.assertLogs(logger, level="INFO") as log:
             self.peer_session._react_to_remove_task(msg)
         assert "Someone tries to remove task header: " in log.output[0]
         assert task_id in log.output[0]
-        assert task_server.task_keeper.task_headers[task_id] == th_mock
+        assert task_server.task_keeper.get_owner(task_id) == "UNKNOWNKEY"
         self.peer_session.p2p_service.keys_auth = previous_ka
 
     def test_react_to_remove_task_broadcast(self):
         msg, task_id, previous_ka = \
             self._gen_data_for_test_react_to_remove_task()
-        th_mock = MagicMock()
+        header = taskbase_factories.TaskHeader(task_id=task_id)
         keys_auth = self.peer_session.p2p_service.keys_auth
-        th_mock.task_owner.key = keys_auth.key_id
+        header.task_owner.key = keys_auth.key_id
         task_server = self.peer_session.p2p_service.task_server
-        task_server.task_keeper.task_headers[task_id] = th_mock
+        task_server.task_keeper.task_headers[task_id] = header
         msg.serialize()
         with self.assertNoLogs(logger, level="INFO"):
             self.peer_session._react_to_remove_task(msg)
@@ -1,6 +1,7 @@
 # pylint: disable=protected-access
 import datetime
 import queue
+import time
 import uuid
 import unittest
 import unittest.mock as mock
@@ -54,7 +55,8 @@ class TestMessageHistoryService(DatabaseFixture):
         msg = self._build_msg()
 
         self.service.add(msg)
-        assert self.service._save_queue.get(block=False) is msg
+        _, queued_msg = self.service._save_queue.get(block=False)
+        assert queued_msg is msg
 
         self.service.add(None)
         with self.assertRaises(queue.Empty):
@@ -82,6 +84,36 @@ class TestMessageHistoryService(DatabaseFixture):
         self.service.add_sync(msg_dict)
         assert message_count() == 1
 
+    def test_add_many_sync(self):
+        queued = [(time.time(), self._build_dict()) for _ in range(3)]
+        self.service.add_many_sync(queued)
+        assert message_count() == 3
+
+        stats = self.service.get_stats()
+        assert stats['saved_messages'] == 3
+        assert stats['last_batch_size'] == 3
+        assert stats['last_save_latency'] >= 0
+        assert stats['save_queue_size'] == 0
+
+    def test_add_many_sync_invalid_message(self):
+        msg_dicts = [self._build_dict() for _ in range(3)]
+        msg_dicts[1]['local_role'] = None
+
+        self.service.add_many_sync([(time.time(), m) for m in msg_dicts])
+        assert message_count() == 2
+        assert self.service._save_queue.empty()
+
+    def test_add_many_sync_temporary_error(self):
+        queued = [(time.time(), self._build_dict()) for _ in range(3)]
+
+        with mock.patch('peewee.InsertQuery.execute',
+                        side_effect=PeeweeException):
+            self.service.add_many_sync(queued)
+
+        assert message_count() == 0
+        assert self.service._save_queue.qsize() == 3
+        assert self.service.get_stats()['saved_messages'] == 0
+
     def test_remove(self):
         task = str(uuid.uuid4())
         params = dict(subtask=str(uuid.uuid4()))
@@ -198,6 +230,22 @@ class TestMessageHistoryService(DatabaseFixture):
         self.service._sweep()
         assert message_count() == 2
 
+    def test_sweep_in_chunks(self):
+        date = (
+            datetime.datetime.now()
+            - self.service.MESSAGE_LIFETIME
+            - datetime.timedelta(hours=5)
+        )
+        for _ in range(5):
+            msg = self._build_dict()
+            msg['msg_date'] = date
+            self.service.add_sync(msg)
+        self.service.add_sync(self._build_dict())
+
+        with mock.patch.object(self.service, 'SWEEP_BATCH_SIZE', 2):
+            self.service._sweep()
+        assert message_count() == 1
+
     def test_loop_sweep(self):
         self.service._sweep = mock.Mock()
         self.service._queue_timeout = 0.1
@@ -212,24 +260,43 @@ class TestMessageHistoryService(DatabaseFixture):
     def test_loop_add_sync(self):
         self.service._sweep = mock.Mock()
         self.service._queue_timeout = 0.1
-        self.service.add_sync = mock.Mock()
+        self.service.add_many_sync = mock.Mock()
 
         # No message
         self.service._loop()
-        assert not self.service.add_sync.called
+        assert not self.service.add_many_sync.called
 
         # Add message
         msg = self._build_dict()
-        self.service._save_queue.put(msg)
+        self.service.add(msg)
 
         # With message
         self.service._loop()
-        assert self.service.add_sync.called
+        self.service.add_many_sync.assert_called_once_with([(mock.ANY, msg)])
 
         # No message again, since it was popped from the queue
-        self.service.add_sync.reset_mock()
+        self.service.add_many_sync.reset_mock()
         self.service._loop()
-        assert not self.service.add_sync.called
+        assert not self.service.add_many_sync.called
+
+    @mock.patch(
+        'golem.network.history.MessageHistoryService.SAVE_BATCH_SIZE',
+        2,
+    )
+    def test_loop_add_batches(self):
+        self.service._sweep = mock.Mock()
+        self.service._queue_timeout = 0.1
+        msgs = [self._build_dict() for _ in range(3)]
+        for msg in msgs:
+            self.service.add(msg)
+
+        self.service._loop()
+        assert message_count() == 2
+        assert self.service.get_stats()['save_queue_size'] == 1
+
+        self.service._loop()
+        assert message_count() == 3
+        assert self.service.get_stats()['saved_messages'] == 3
 
     def test_loop_remove_sync(self):
         self.service._sweep = mock.Mock()
@@ -254,6 +321,26 @@ class TestMessageHistoryService(DatabaseFixture):
         self.service._loop()
         assert not self.service.remove_sync.called
 
+    def test_loop_remove_coalesced(self):
+        self.service._sweep = mock.Mock()
+        self.service._queue_timeout = 0.1
+        self.service.remove_sync = mock.Mock()
+
+        self.service.remove('task_1', subtask='subtask_1')
+        self.service.remove('task_1', subtask='subtask_1')
+        self.service.remove('task_1', subtask='subtask_2')
+        self.service.remove('task_2', subtask='subtask_3')
+        self.service.remove('task_2')
+        self.service.remove('task_2', subtask='subtask_4')
+
+        self.service._loop()
+        assert self.service.remove_sync.call_args_list == [
+            mock.call('task_1', subtask='subtask_1'),
+            mock.call('task_1', subtask='subtask_2'),
+            mock.call('task_2'),
+        ]
+        assert self.service.get_stats()['remove_queue_size'] == 0
+
 
 @mock.patch("golem.network.history.MessageHistoryService.add")
 class TestAdd(unittest.TestCase):
@@ -2,8 +2,10 @@ from unittest import TestCase, mock
 
 from freezegun import freeze_time
 from token_bucket import MemoryStorage
+from twisted.internet.defer import CancelledError, Deferred
 
-from golem.network.transport.limiter import CallRateLimiter
+from golem.network.transport.limiter import CallRateLimiter, \
+    ConcurrencyLimiter
 
 
 @mock.patch('twisted.internet.reactor', create=True)
@@ -44,3 +46,71 @@ class TestCallRateLimiter(TestCase):
         for _ in range(n):
             limiter.call(fn)
         assert reactor.callLater.called
+
+
+class TestConcurrencyLimiter(TestCase):
+
+    def setUp(self):
+        self.limiter = ConcurrencyLimiter(2)
+        self.calls = []
+
+    def fn(self, *args):
+        deferred = Deferred()
+        self.calls.append((args, deferred))
+        return deferred
+
+    def test_limit(self):
+        results = [self.limiter.run(self.fn, i) for i in range(4)]
+        assert [args for args, _ in self.calls] == [(0,), (1,)]
+        assert self.limiter.running == 2
+        assert self.limiter.waiting == 2
+
+        self.calls[1][1].callback('one')
+        assert results[1].result == 'one'
+        assert [args for args, _ in self.calls] == [(0,), (1,), (2,)]
+
+        self.calls[0][1].errback(ValueError())
+        self.assertIsInstance(results[0].result.value, ValueError)
+        results[0].addErrback(lambda _: None)
+        assert len(self.calls) == 4
+        assert self.limiter.waiting == 0
+
+        self.calls[2][1].callback(None)
+        self.calls[3][1].callback(None)
+        assert self.limiter.running == 0
+
+    def test_synchronous_result(self):
+        fn = mock.Mock(return_value='result')
+        for _ in range(3):
+            result = self.limiter.run(fn)
+            assert result.result == 'result'
+        assert fn.call_count == 3
+        assert self.limiter.running == 0
+
+    def test_cancel_waiting(self):
+        self.limiter.run(self.fn, 0)
+        self.limiter.run(self.fn, 1)
+        waiting = self.limiter.run(self.fn, 2)
+        failures = []
+        waiting.addErrback(failures.append)
+
+        waiting.cancel()
+        assert failures[0].type is CancelledError
+        assert self.limiter.waiting == 0
+
+        self.calls[0][1].callback(None)
+        assert len(self.calls) == 2
+        assert self.limiter.running == 1
+
+    def test_cancel_running(self):
+        result = self.limiter.run(self.fn, 0)
+        self.limiter.run(self.fn, 1)
+        self.limiter.run(self.fn, 2)
+        failures = []
+        result.addErrback(failures.append)
+
+        result.cancel()
+        assert failures[0].type is CancelledError
+        assert self.calls[0][1].called
+        assert [args for args, _ in self.calls][-1] == (2,)
+        assert self.limiter.running == 2
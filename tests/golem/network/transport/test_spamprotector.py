@@ -0,0 +1,59 @@
+from unittest import TestCase
+
+from freezegun import freeze_time
+from golem_messages import message
+
+from golem.diag.service import DiagnosticsOutputFormat
+from golem.network.transport.spamprotector import (
+    SpamDiagnosticsProvider, SpamProtector)
+
+
+class TestSpamProtector(TestCase):
+
+    def setUp(self):
+        SpamProtector.dropped_messages.clear()
+        SpamProtector.offenders = 0
+        self.protector = SpamProtector(
+            rate_limits={message.p2p.GetTasks: (1 / 2, 3)},
+            max_dropped=2)
+        self.get_tasks = message.p2p.GetTasks().serialize()
+
+    def test_not_limited(self):
+        data = message.base.Disconnect(reason=None).serialize()
+        assert all(self.protector.check_msg(data) for _ in range(100))
+        assert self.protector.check_msg(None) is False
+
+    def test_token_bucket(self):
+        with freeze_time("2018-01-01 00:00:00") as frozen_time:
+            # burst
+            for _ in range(3):
+                assert self.protector.check_msg(self.get_tasks)
+            assert not self.protector.check_msg(self.get_tasks)
+
+            # one token per two seconds
+            frozen_time.move_to("2018-01-01 00:00:03")
+            assert self.protector.check_msg(self.get_tasks)
+            assert not self.protector.check_msg(self.get_tasks)
+            frozen_time.move_to("2018-01-01 00:00:04")
+            assert self.protector.check_msg(self.get_tasks)
+
+            # no more tokens than the burst size
+            frozen_time.move_to("2018-01-01 00:01:00")
+            for _ in range(3):
+                assert self.protector.check_msg(self.get_tasks)
+            assert not self.protector.check_msg(self.get_tasks)
+
+    def test_offender(self):
+        with freeze_time("2018-01-01 00:00:00"):
+            for _ in range(5):
+                self.protector.check_msg(self.get_tasks)
+            assert not self.protector.should_disconnect
+            self.protector.check_msg(self.get_tasks)
+            assert self.protector.should_disconnect
+            self.protector.check_msg(self.get_tasks)
+
+        assert SpamDiagnosticsProvider().get_diagnostics(
+            DiagnosticsOutputFormat.data) == {
+                'dropped_messages': {'GetTasks': 4},
+                'offenders': 1,
+            }
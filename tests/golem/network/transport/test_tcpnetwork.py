@@ -6,6 +6,8 @@ from unittest import mock
 import golem_messages
 import semantic_version
 from freezegun import freeze_time
+from twisted.internet.defer import Deferred, fail
+from twisted.internet.task import Clock
 from golem_messages import exceptions as msg_exceptions
 from golem_messages import message
 from golem_messages import factories as msg_factories
@@ -13,7 +15,8 @@ from golem_messages import factories as msg_factories
 from golem import testutils
 from golem.network.transport import tcpnetwork
 from golem.network.transport.tcpnetwork import (SafeProtocol, SocketAddress,
-                                                MAX_MESSAGE_SIZE, TCPNetwork)
+                                                MAX_MESSAGE_SIZE, TCPNetwork,
+                                                ConnectionRace)
 from golem.network.transport.tcpnetwork_helpers import TCPConnectInfo
 from golem.tools.assertlogs import LogTestCase
 from tests.factories import p2p as p2p_factories
@@ -57,6 +60,22 @@ class TestBasicProtocol(LogTestCase):
         self.protocol.dataReceived(packed_data)
         self.assertEqual(self.protocol.session.interpret.call_args[0][0], m)
 
+    @mock.patch('golem_messages.load')
+    def test_dataReceived_chunks(self, load_mock):
+        m = message.base.Disconnect(reason=None)
+        data = m.serialize()
+        packed_data = struct.pack("!L", len(data)) + data
+        load_mock.return_value = m
+        self.protocol.opened = True
+
+        for i in range(0, len(packed_data), 4):
+            self.protocol.dataReceived(packed_data[i:i + 4])
+        self.protocol.dataReceived(packed_data)
+
+        load_mock.assert_has_calls([mock.call(data, None, None)] * 2)
+        self.assertEqual(self.protocol.session.interpret.call_count, 2)
+        self.assertEqual(self.protocol.db.data_size(), 0)
+
     @mock.patch(
         'golem.network.transport.tcpnetwork.BasicProtocol._load_message'
     )
@@ -120,7 +139,7 @@ class SafeProtocolTestCase(unittest.TestCase):
             data = msg.serialize()
             packed_data = struct.pack("!L", len(data)) + data
             load_mock.return_value = msg
-            for _ in range(0, 100):
+            for _ in range(0, 10):
                 self.protocol.dataReceived(packed_data)
             self.protocol.session.interpret.assert_called_once_with(msg)
             frozen_datetime.move_to("2017-01-14 10:30:45")
@@ -128,6 +147,23 @@ class SafeProtocolTestCase(unittest.TestCase):
             self.protocol.dataReceived(packed_data)
             self.protocol.session.interpret.assert_called_once_with(msg)
 
+    @mock.patch('golem_messages.load')
+    def test_disconnect_spammer(self, load_mock):
+        msg = message.p2p.GetTasks()
+        data = msg.serialize()
+        packed_data = struct.pack("!L", len(data)) + data
+        load_mock.return_value = msg
+        self.protocol.transport = mock.MagicMock()
+
+        with freeze_time("2017-01-14 10:30:20"):
+            self.protocol.dataReceived(packed_data * 100)
+
+        # 5 messages pass, the connection is closed after 51 are dropped
+        assert self.protocol.session.interpret.call_count == 5
+        assert self.protocol.spam_protector.dropped == 51
+        assert not self.protocol.opened
+        self.protocol.transport.abortConnection.assert_called_once_with()
+
 
 class TestSocketAddress(unittest.TestCase):
 
@@ -194,3 +230,119 @@ class TestTCPNetworkConnections(unittest.TestCase):
         connect_all(TCPConnectInfo(self.addresses, mock.Mock(), mock.Mock()))
         assert not connect.called
         assert call.called
+
+    def test_parallel_connect(self):
+        factory = mock.Mock()
+        network = TCPNetwork(factory, limit_connection_rate=True,
+                             parallel_connect=True)
+
+        call = mock.Mock()
+        connect = mock.Mock()
+        network._TCPNetwork__try_to_connect_to_address = connect
+        network.rate_limiter.call = call
+
+        connect_info = TCPConnectInfo(self.addresses, mock.Mock(), mock.Mock())
+        network._TCPNetwork__try_to_connect_to_addresses(connect_info)
+        assert not connect.called
+        call.assert_called_once_with(
+            network._TCPNetwork__race_addresses,
+            connect_info,
+            self.addresses,
+        )
+
+    def test_race_failure(self):
+        network = TCPNetwork(mock.Mock(), parallel_connect=True)
+        network.reactor = Clock()
+        failure_callback = mock.Mock()
+
+        with mock.patch.object(network, '_TCPNetwork__connect_endpoint',
+                               side_effect=ConnectionRefusedError):
+            network.connect(TCPConnectInfo(self.addresses, mock.Mock(),
+                                           failure_callback))
+
+        failure_callback.assert_called_once_with()
+        assert TCPNetwork.connect_limiter.running == 0
+
+
+class TestConnectionRace(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = Clock()
+        self.addresses = ['a', 'b', 'c']
+        self.attempts = {}
+        self.cancelled = []
+
+    def connect(self, address):
+        self.attempts[address] = Deferred(
+            canceller=lambda _: self.cancelled.append(address))
+        return self.attempts[address]
+
+    def race(self):
+        race = ConnectionRace(self.addresses, self.connect, 0.25, self.clock)
+        return race, race.start()
+
+    def test_stagger(self):
+        _, result = self.race()
+        assert list(self.attempts) == ['a']
+        self.clock.advance(0.25)
+        assert list(self.attempts) == ['a', 'b']
+        self.clock.advance(0.25)
+        assert list(self.attempts) == ['a', 'b', 'c']
+        assert not self.clock.getDelayedCalls()
+        assert not result.called
+
+    def test_failure_starts_next(self):
+        self.race()
+        self.attempts['a'].errback(ConnectionRefusedError())
+        assert list(self.attempts) == ['a', 'b']
+        self.clock.advance(0.2)
+        assert list(self.attempts) == ['a', 'b']
+        self.clock.advance(0.05)
+        assert list(self.attempts) == ['a', 'b', 'c']
+
+    def test_winner_cancels_losers(self):
+        _, result = self.race()
+        self.clock.advance(0.25)
+        conn = mock.Mock()
+        self.attempts['b'].callback(conn)
+
+        assert result.result is conn
+        assert self.cancelled == ['a']
+        assert not self.clock.getDelayedCalls()
+        assert 'c' not in self.attempts
+
+    def test_late_connection_closed(self):
+        race, result = self.race()
+        self.clock.advance(0.25)
+        winner, late = mock.Mock(), mock.Mock()
+        self.attempts['b'].callback(winner)
+        assert result.result is winner
+
+        attempt = Deferred()
+        race._attempts.append(attempt)
+        race._succeeded(late, attempt)
+        late.close_now.assert_called_once_with()
+        winner.close_now.assert_not_called()
+
+    def test_all_failed(self):
+        _, result = self.race()
+        self.clock.advance(0.5)
+        for address in self.addresses:
+            assert not result.called
+            self.attempts[address].errback(ConnectionRefusedError())
+
+        failures = []
+        result.addErrback(failures.append)
+        assert failures[0].type is ConnectionRefusedError
+
+    def test_synchronous_failures(self):
+        race = ConnectionRace(
+            self.addresses,
+            lambda _: fail(ConnectionRefusedError()),
+            0.25,
+            self.clock,
+        )
+        failures = []
+        race.start().addErrback(failures.append)
+        assert failures[0].type is ConnectionRefusedError
+        assert not self.clock.getDelayedCalls()
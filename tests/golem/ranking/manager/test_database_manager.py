@@ -1,9 +1,21 @@
+from unittest.mock import patch
+
+from golem.model import LocalRank
 from golem.ranking.helper.trust import Trust
 from golem.ranking.manager import database_manager as dm
 from golem.testutils import DatabaseFixture
 
 
 class TestDatabaseManager(DatabaseFixture):
+    def setUp(self):
+        super().setUp()
+        # Updates buffered by other tests would go to this test's database
+        dm.local_rank_buffer.clear()
+
+    def tearDown(self):
+        dm.local_rank_buffer.clear()
+        super().tearDown()
+
     def test_should_update_database_records(self):
         """Should update database records
         for COMPUTED increase, decrease;
@@ -247,6 +259,54 @@ class TestDatabaseManager(DatabaseFixture):
             self.assertAlmostEqual(getattr(dm.get_local_rank(case['node_name']), case['attribute']), case['total'],
                                    7, "Test no. " + case['test_no'] + " failed.")
 
+    def _test_flush(self):
+        dm.increase_positive_computed('alpha', 0.5)
+        dm.increase_negative_payment('alpha', 0.1)
+        self.assertEqual(LocalRank.select().count(), 0)
+        self.assertAlmostEqual(dm.get_local_rank('alpha').positive_computed,
+                               0.5)
+
+        dm.flush_local_ranks()
+        self.assertEqual(dm.local_rank_buffer.pending('alpha'), {})
+        local_rank = LocalRank.get(LocalRank.node_id == 'alpha')
+        self.assertAlmostEqual(local_rank.positive_computed, 0.5)
+        self.assertAlmostEqual(local_rank.negative_payment, 0.1)
+
+        dm.increase_positive_computed('alpha', 0.25)
+        dm.increase_positive_computed('beta', 1.0)
+        self.assertAlmostEqual(dm.get_local_rank('alpha').positive_computed,
+                               0.75)
+
+        dm.flush_local_ranks()
+        local_rank = LocalRank.get(LocalRank.node_id == 'alpha')
+        self.assertAlmostEqual(local_rank.positive_computed, 0.75)
+        self.assertAlmostEqual(local_rank.negative_payment, 0.1)
+        local_rank = LocalRank.get(LocalRank.node_id == 'beta')
+        self.assertAlmostEqual(local_rank.positive_computed, 1.0)
+
+    def test_flush(self):
+        self._test_flush()
+
+    @patch('golem.ranking.manager.database_manager.SQLITE_UPSERT', False)
+    def test_flush_without_upsert(self):
+        self._test_flush()
+
+    @patch('golem.ranking.manager.database_manager.LocalRankBuffer._upsert',
+           side_effect=Exception)
+    def test_flush_failed(self, _):
+        dm.increase_positive_computed('alpha', 0.5)
+        dm.flush_local_ranks()
+        dm.increase_positive_computed('alpha', 0.25)
+        self.assertEqual(dm.local_rank_buffer.pending('alpha'),
+                         {'positive_computed': 0.75})
+
+    def test_clear(self):
+        dm.increase_positive_computed('alpha', 0.5)
+        dm.local_rank_buffer.clear()
+        dm.flush_local_ranks()
+        self.assertEqual(dm.local_rank_buffer.pending('alpha'), {})
+        self.assertEqual(LocalRank.select().count(), 0)
+
     def test_should_throw_exception(self):
         """Should throw exception for WRONG_COMPUTED increase."""
         with self.assertRaises(KeyError):
@@ -1,16 +1,29 @@
 from threading import Thread
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
+
+import numpy as np
 
 from golem.client import Client
 from golem.ranking.helper.trust import Trust
 from golem.ranking.manager import database_manager as dm
-from golem.ranking.ranking import Ranking
+from golem.ranking.ranking import Ranking, vec_to_trust
 from golem.tools.assertlogs import LogTestCase
 from golem.tools.testwithdatabase import TestWithDatabase
 from golem.testutils import PEP8MixIn
 
 
-class TestRankingDatabase(TestWithDatabase):
+class RankingDatabaseFixture(TestWithDatabase):
+    def setUp(self):
+        super().setUp()
+        # Updates buffered by other tests would go to this test's database
+        dm.local_rank_buffer.clear()
+
+    def tearDown(self):
+        dm.local_rank_buffer.clear()
+        super().tearDown()
+
+
+class TestRankingDatabase(RankingDatabaseFixture):
     def test_local_rank(self):
         self.assertIsNone(dm.get_local_rank("ABC"))
         dm.increase_positive_computed("ABC", 2)
@@ -74,6 +87,27 @@ class TestRankingDatabase(TestWithDatabase):
         self.assertEqual(gr.gossip_weight_computing, 0.9)
         self.assertEqual(gr.gossip_weight_requesting, 0.8)
 
+    def test_global_ranks(self):
+        dm.upsert_global_rank("ABC", 0.3, 0.2, 1.0, 1.0)
+        dm.upsert_global_ranks([])
+        for upsert in (True, False):
+            with patch('golem.ranking.manager.database_manager.SQLITE_UPSERT',
+                       upsert):
+                dm.upsert_global_ranks([
+                    ("ABC", 0.4, 0.1, 0.8, 0.7),
+                    ("DEF", -0.1, -0.2, 0.9, 0.8),
+                ])
+            gr = dm.get_global_rank("ABC")
+            self.assertEqual(gr.computing_trust_value, 0.4)
+            self.assertEqual(gr.requesting_trust_value, 0.1)
+            self.assertEqual(gr.gossip_weight_computing, 0.8)
+            self.assertEqual(gr.gossip_weight_requesting, 0.7)
+            gr = dm.get_global_rank("DEF")
+            self.assertEqual(gr.computing_trust_value, -0.1)
+            self.assertEqual(gr.requesting_trust_value, -0.2)
+            self.assertEqual(gr.gossip_weight_computing, 0.9)
+            self.assertEqual(gr.gossip_weight_requesting, 0.8)
+
     def test_neighbour_rank(self):
         self.assertIsNone(dm.get_neighbour_loc_rank("ABC", "DEF"))
         dm.upsert_neighbour_loc_rank("ABC", "DEF", (0.2, 0.3))
@@ -96,7 +130,7 @@ class TestRankingDatabase(TestWithDatabase):
         self.assertEqual(nr.requesting_trust_value, -0.2)
 
 
-class TestRanking(TestWithDatabase, LogTestCase, PEP8MixIn):
+class TestRanking(RankingDatabaseFixture, LogTestCase, PEP8MixIn):
     PEP8_FILES = [
         'golem/ranking/ranking.py',
         'golem/ranking/manager/trust_manager.py',
@@ -114,6 +148,14 @@ class TestRanking(TestWithDatabase, LogTestCase, PEP8MixIn):
         result = min_max_utility.count_trust(1, 999999999)
         self.assertGreaterEqual(result, min_max_utility.MIN_TRUST)
 
+    def test_vec_to_trust(self):
+        from golem.ranking.helper import min_max_utility
+
+        vecs = [[0.2, 0.4], [0.0, 0.3], [0.3, 0.0], [0.9, 0.3], [-0.1, 0.3]]
+        np.testing.assert_array_equal(
+            vec_to_trust(np.array(vecs)),
+            [min_max_utility.vec_to_trust(vec) for vec in vecs])
+
     def test_increase_trust_thread_safety(self):
         c = MagicMock(spec=Client)
         r = Ranking(c)
@@ -174,6 +216,13 @@ class TestRanking(TestWithDatabase, LogTestCase, PEP8MixIn):
 
     def test_without_reactor(self):
         r = Ranking(MagicMock(spec=Client))
+
+        def working_vec(node_id):
+            return r.working_vec[r.node_index[node_id]]
+
+        def prev_rank(node_id):
+            return r.prevRank[r.node_index[node_id]]
+
         r.client.get_neighbours_degree.return_value = \
             {'ABC': 4, 'JKL': 2, 'MNO': 5}
         r.client.collect_stopped_peers.return_value = \
@@ -199,27 +248,27 @@ class TestRanking(TestWithDatabase, LogTestCase, PEP8MixIn):
         assert not r.global_finished
         assert r.step == 0
         assert len(r.finished_neighbours) == 0
-        for v in list(r.working_vec.values()):
+        for v in r.working_vec:
             assert v[0][1] == 1.0
             assert v[1][1] == 1.0
 
-        assert r.working_vec["ABC"][0][0] == 0.02
-        assert r.working_vec["ABC"][1][0] == 0.0
-        assert r.working_vec["DEF"][0][0] == 0.0
-        assert r.working_vec["DEF"][1][0] == 0.02
-        assert r.working_vec["GHI"][0][0] == 0.0
-        assert r.working_vec["GHI"][1][0] == 0.0
-        assert r.working_vec["XYZ"][0][0] == 0.0
-        assert r.working_vec["XYZ"][1][0] == 0.0
-
-        assert r.prevRank["ABC"][0] == 0.02
-        assert r.prevRank["ABC"][1] == 0
-        assert r.prevRank["DEF"][0] == 0
-        assert r.prevRank["DEF"][1] == 0.02
-        assert r.prevRank["GHI"][0] == 0
-        assert r.prevRank["GHI"][1] == 0
-        assert r.prevRank["XYZ"][0] == 0
-        assert r.prevRank["XYZ"][1] == 0
+        assert working_vec("ABC")[0][0] == 0.02
+        assert working_vec("ABC")[1][0] == 0.0
+        assert working_vec("DEF")[0][0] == 0.0
+        assert working_vec("DEF")[1][0] == 0.02
+        assert working_vec("GHI")[0][0] == 0.0
+        assert working_vec("GHI")[1][0] == 0.0
+        assert working_vec("XYZ")[0][0] == 0.0
+        assert working_vec("XYZ")[1][0] == 0.0
+
+        assert prev_rank("ABC")[0] == 0.02
+        assert prev_rank("ABC")[1] == 0
+        assert prev_rank("DEF")[0] == 0
+        assert prev_rank("DEF")[1] == 0.02
+        assert prev_rank("GHI")[0] == 0
+        assert prev_rank("GHI")[1] == 0
+        assert prev_rank("XYZ")[0] == 0
+        assert prev_rank("XYZ")[1] == 0
 
         r._Ranking__new_round()
         assert set(r.neighbours) == {'ABC', 'JKL', 'MNO'}
@@ -231,10 +280,10 @@ class TestRanking(TestWithDatabase, LogTestCase, PEP8MixIn):
             if gossip[0] == "DEF":
                 found = True
                 assert gossip[1][0][0] == 0
-                assert gossip[1][0][0] == r.working_vec["DEF"][0][0]
+                assert gossip[1][0][0] == working_vec("DEF")[0][0]
                 assert gossip[1][0][1] == 0.5
                 assert gossip[1][1][0] > 0
-                assert gossip[1][0][0] < r.working_vec["DEF"][1][0]
+                assert gossip[1][0][0] < working_vec("DEF")[1][0]
                 assert gossip[1][0][1] == 0.5
         assert found
         assert r.client.send_gossip.called
@@ -253,8 +302,8 @@ class TestRanking(TestWithDatabase, LogTestCase, PEP8MixIn):
         assert len(r.prevRank) == 4
         assert len(r.received_gossip) == 0
         assert len(r.working_vec) == 5
-        assert r.working_vec["ABC"][0][0] > r.prevRank["ABC"][0]
-        assert r.working_vec["MNO"][1][0] < 0.0
+        assert working_vec("ABC")[0][0] > prev_rank("ABC")[0]
+        assert working_vec("MNO")[1][0] < 0.0
         assert not r.finished
         assert not r.global_finished
 
@@ -0,0 +1,72 @@
+import os
+import time
+import tracemalloc
+import uuid
+
+import pytest
+
+import golem
+from golem.task.headerstore import TaskHeaderStore
+from golem.task.masking import Mask
+from golem.task.taskbase import TaskHeader
+
+HEADERS = 50000
+
+
+def skip_benchmarks():
+    if os.environ.get('benchmarks', False):
+        return False
+    return True
+
+
+def make_header(index: int) -> TaskHeader:
+    return TaskHeader.from_dict({
+        'fixed_header': {
+            "task_id": str(uuid.uuid4()),
+            "task_owner": {
+                "node_name": "node {}".format(index % 1000),
+                "key": '{:0128x}'.format(index % 1000),
+                "pub_addr": "10.10.10.10",
+                "pub_port": 40102,
+                "prv_addresses": ["10.0.0.10"],
+            },
+            "environment": "BLENDER",
+            "last_checking": time.time(),
+            "deadline": time.time() + 3600,
+            "subtask_timeout": 600,
+            "subtasks_count": 10,
+            "max_price": 10 ** 18 + index,
+            "min_version": golem.__version__,
+            "resource_size": 1024 * 1024,
+            "estimated_memory": 0,
+        },
+        'mask': {
+            'byte_repr': Mask().to_bytes()
+        },
+        'timestamp': time.time(),
+        'signature': os.urandom(65),
+    })
+
+
+def fill(store, headers: int):
+    for index in range(headers):
+        header = make_header(index)
+        store[header.task_id] = header
+    return store
+
+
+@pytest.mark.skipif(skip_benchmarks(), reason="skip benchmarks by default")
+@pytest.mark.parametrize("store_cls", [dict, TaskHeaderStore])
+@pytest.mark.benchmark(min_rounds=1, warmup=False)
+def test_task_headers_memory(benchmark, store_cls):
+    def run():
+        # Memory retained by the store; headers received from the network
+        # are not referenced by anything else
+        tracemalloc.start()
+        store = fill(store_cls(), HEADERS)
+        benchmark.extra_info['memory_mb'] = \
+            tracemalloc.get_traced_memory()[0] / 2 ** 20
+        tracemalloc.stop()
+        return store
+
+    benchmark.pedantic(run, rounds=1)
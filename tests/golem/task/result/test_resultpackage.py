@@ -3,7 +3,7 @@ import os
 
 from pathlib import Path
 
-from golem.core.fileencrypt import FileEncryptor
+from golem.core.fileencrypt import AESFileEncryptor, FileEncryptor
 from golem.resource.dirmanager import DirManager
 from golem.task.result.resultpackage import EncryptingPackager, \
     EncryptingTaskResultPackager, ExtractedPackage, ZipPackager, backup_rename
@@ -150,6 +150,19 @@ class TestEncryptingPackager(PackageDirContentsFixture):
 
         self.assertTrue(len(files) == len(self.all_files))
 
+    def testPackageAndHash(self):
+        ep = EncryptingPackager(self.secret)
+        path, sha1 = ep.create(self.out_path, self.disk_files)
+        pkg_path = ep.package_name(self.out_path)
+
+        self.assertEqual(sha1, ep.compute_sha1(pkg_path))
+
+        decrypted_path = self.out_path + '.dec'
+        AESFileEncryptor.decrypt(path, decrypted_path, secret=self.secret)
+        with open(decrypted_path, 'rb') as decrypted, \
+                open(pkg_path, 'rb') as pkg:
+            self.assertEqual(decrypted.read(), pkg.read())
+
 
 class TestEncryptingTaskResultPackager(PackageDirContentsFixture):
 
@@ -0,0 +1,52 @@
+from unittest import TestCase
+
+from golem.task.deadlineindex import DeadlineIndex
+
+
+class TestDeadlineIndex(TestCase):
+
+    def setUp(self):
+        self.index = DeadlineIndex()
+
+    def test_pop_expired(self):
+        self.index.add(30, 'task')
+        self.index.add(10, 'task', 'subtask_1')
+        self.index.add(20, 'task', 'subtask_2')
+        assert len(self.index) == 3
+
+        assert self.index.pop_expired(10) == []
+        assert self.index.pop_expired(21) == [
+            (10, 'task', 'subtask_1'),
+            (20, 'task', 'subtask_2'),
+        ]
+        assert len(self.index) == 1
+        assert ('task', None) in self.index
+        assert ('task', 'subtask_1') not in self.index
+
+    def test_remove(self):
+        self.index.add(10, 'task', 'subtask_1')
+        self.index.add(20, 'task', 'subtask_2')
+        self.index.remove('task', 'subtask_1')
+        self.index.remove('task', 'unknown')
+
+        assert len(self.index) == 1
+        assert self.index.pop_expired(100) == [(20, 'task', 'subtask_2')]
+
+    def test_replace(self):
+        self.index.add(10, 'task')
+        self.index.add(50, 'task')
+
+        assert self.index.pop_expired(20) == []
+        assert self.index.pop_expired(100) == [(50, 'task', None)]
+
+    def test_rebuild(self):
+        for i in range(100):
+            self.index.add(i, 'task', str(i))
+        for i in range(0, 100, 2):
+            self.index.remove('task', str(i))
+        self.index.remove('task', '1')
+
+        # invalid entries are dropped once they outnumber the live ones
+        assert len(self.index._heap) == len(self.index) == 49
+        assert [e[2] for e in self.index.pop_expired(100)] == \
+            [str(i) for i in range(3, 100, 2)]
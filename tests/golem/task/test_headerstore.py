@@ -0,0 +1,82 @@
+from unittest import TestCase
+
+from golem.task.headerstore import HeaderSummary, IndexedSet, TaskHeaderStore
+from tests.factories.task import taskbase as taskbase_factories
+
+
+class TestIndexedSet(TestCase):
+
+    def test_add_discard(self):
+        elements = IndexedSet(['a', 'b', 'c'])
+        elements.add('b')
+        assert len(elements) == 3
+        assert list(elements) == ['a', 'b', 'c']
+
+        elements.discard('a')
+        elements.discard('unknown')
+        assert len(elements) == 2
+        assert 'a' not in elements
+        assert set(elements) == {'b', 'c'}
+        assert elements[0] == 'c'
+
+        elements.discard('b')
+        elements.discard('c')
+        assert not elements
+        elements.add('d')
+        assert list(elements) == ['d']
+
+    def test_remove(self):
+        elements = IndexedSet(range(5))
+        elements.remove(4)
+        with self.assertRaises(KeyError):
+            elements.remove(4)
+        assert sorted(elements) == [0, 1, 2, 3]
+        assert [elements[i] for i in range(len(elements))] == list(elements)
+
+    def test_clear(self):
+        elements = IndexedSet(range(5))
+        elements.clear()
+        assert not elements
+        assert 1 not in elements
+
+
+class TestTaskHeaderStore(TestCase):
+
+    def setUp(self):
+        self.store = TaskHeaderStore()
+        self.header = taskbase_factories.TaskHeader(
+            max_price=10, deadline=1000., signature=b'sig')
+
+    def test_summary(self):
+        summary = HeaderSummary(self.header)
+        assert summary.task_id == self.header.task_id
+        assert summary.owner_key == self.header.task_owner.key
+        assert summary.max_price == 10
+        assert summary.deadline == 1000.
+        assert summary.signature == b'sig'
+        assert summary.checksum == self.header.checksum
+        header_dict = summary.to_dict()
+        assert header_dict['fixed_header']['task_id'] == self.header.task_id
+        assert header_dict['signature'] == b'sig'
+
+    def test_get_set(self):
+        task_id = self.header.task_id
+        self.store[task_id] = self.header
+
+        assert task_id in self.store
+        assert len(self.store) == 1
+        assert list(self.store) == [task_id]
+        assert self.store.get_summary(task_id).task_id == task_id
+
+        header = self.store[task_id]
+        assert header is not self.header
+        assert header.task_id == task_id
+        assert header.task_owner.key == self.header.task_owner.key
+        assert header.signature == b'sig'
+        assert header.last_checking == self.header.last_checking
+        assert header.checksum == self.header.checksum
+
+        del self.store[task_id]
+        assert task_id not in self.store
+        assert self.store.get(task_id) is None
+        assert self.store.get_summary(task_id) is None
@@ -0,0 +1,55 @@
+from unittest import TestCase
+
+from golem.task.priorityindex import TaskPriorityIndex
+
+
+class TestTaskPriorityIndex(TestCase):
+
+    def setUp(self):
+        self.index = TaskPriorityIndex()
+
+    def test_peek(self):
+        assert self.index.peek() is None
+        self.index.add('low', 1., 100)
+        self.index.add('high', 3., 100)
+        self.index.add('late', 2., 200)
+        self.index.add('early', 2., 100)
+        assert len(self.index) == 4
+
+        assert self.index.peek() == 'high'
+        self.index.remove('high')
+        # equal scores, the later deadline first
+        assert self.index.peek() == 'late'
+        self.index.remove('late')
+        assert self.index.peek() == 'early'
+        assert 'early' in self.index
+        assert 'high' not in self.index
+
+    def test_replace(self):
+        self.index.add('task_1', 1., 100)
+        self.index.add('task_2', 2., 100)
+        self.index.add('task_1', 3., 100)
+
+        assert len(self.index) == 2
+        assert self.index.peek() == 'task_1'
+        self.index.remove('task_1')
+        assert self.index.peek() == 'task_2'
+        self.index.remove('task_2')
+        assert self.index.peek() is None
+
+    def test_clear(self):
+        self.index.add('task', 1., 100)
+        self.index.clear()
+        assert not self.index
+        assert self.index.peek() is None
+
+    def test_rebuild(self):
+        for i in range(100):
+            self.index.add(str(i), i, 100)
+        for i in range(0, 100, 2):
+            self.index.remove(str(i))
+        self.index.remove('1')
+
+        # invalid entries are dropped once they outnumber the live ones
+        assert len(self.index._heap) == len(self.index) == 49
+        assert self.index.peek() == '99'
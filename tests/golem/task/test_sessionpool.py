@@ -0,0 +1,71 @@
+import time
+from unittest import TestCase
+from unittest.mock import Mock
+
+from golem.task.server.sessionpool import TaskSessionPool
+
+
+def make_session(key_id='node', verified=True, opened=True, idle=0.):
+    session = Mock(key_id=key_id, verified=verified)
+    session.conn.opened = opened
+    session.last_message_time = time.time() - idle
+    return session
+
+
+class TestTaskSessionPool(TestCase):
+
+    def setUp(self):
+        self.pool = TaskSessionPool(idle_timeout=10)
+
+    def test_get(self):
+        assert self.pool.get('node') is None
+
+        session = make_session()
+        self.pool.add(session)
+        assert 'node' in self.pool
+        assert self.pool.get('node') is session
+        assert self.pool.get('node') is session
+        assert self.pool.reused == 2
+
+    def test_get_in_use(self):
+        session = make_session()
+        self.pool.add(session)
+
+        assert self.pool.get('node', in_use={session}) is None
+        assert 'node' in self.pool
+        assert self.pool.get('node', in_use=set()) is session
+        assert self.pool.reused == 1
+
+    def test_add_without_key(self):
+        self.pool.add(make_session(key_id=None))
+        assert not self.pool
+
+    def test_replace(self):
+        old, new = make_session(), make_session()
+        self.pool.add(old)
+        self.pool.add(new)
+        assert self.pool.get('node') is new
+
+        self.pool.remove(old)
+        assert self.pool.get('node') is new
+        self.pool.remove(new)
+        assert self.pool.get('node') is None
+
+    def test_get_dead(self):
+        for session in (make_session(verified=False),
+                        make_session(opened=False),
+                        make_session(idle=20)):
+            self.pool.add(session)
+            assert self.pool.get('node') is None
+            assert 'node' not in self.pool
+        assert self.pool.reused == 0
+
+    def test_pop_idle(self):
+        active = make_session(key_id='active')
+        idle = make_session(key_id='idle', idle=20)
+        self.pool.add(active)
+        self.pool.add(idle)
+
+        assert self.pool.pop_idle() == [idle]
+        assert len(self.pool) == 1
+        assert self.pool.get('active') is active
@@ -0,0 +1,46 @@
+from unittest import TestCase
+
+from golem.task.signaturecache import HeaderSignatureCache
+from tests.golem.task.test_taskserver import get_example_task_header
+
+
+class TestHeaderSignatureCache(TestCase):
+
+    def setUp(self):
+        self.cache = HeaderSignatureCache(max_size=2)
+
+    def test_key(self):
+        header = get_example_task_header(b'key_id')
+        header['signature'] = b'signature'
+        key = self.cache.key(header)
+        assert key[0] == header['fixed_header']['task_id']
+        assert self.cache.key(dict(header)) == key
+
+        # a known signature attached to a modified header
+        header['timestamp'] = 1
+        assert self.cache.key(header) != key
+
+    def test_get_and_put(self):
+        assert self.cache.get(('task', b'1')) is None
+        self.cache.put(('task', b'1'), True)
+        self.cache.put(('task', b'2'), False)
+        assert self.cache.get(('task', b'1')) is True
+        assert self.cache.get(('task', b'2')) is False
+        assert self.cache.get_stats() == {
+            'size': 2,
+            'hits': 2,
+            'misses': 1,
+            'unchanged': 0,
+            'hit_rate': 2 / 3,
+        }
+
+    def test_lru(self):
+        self.cache.put(('task', b'1'), True)
+        self.cache.put(('task', b'2'), True)
+        self.cache.get(('task', b'1'))
+        self.cache.put(('task', b'3'), True)
+
+        assert len(self.cache) == 2
+        assert self.cache.get(('task', b'2')) is None
+        assert self.cache.get(('task', b'1')) is True
+        assert self.cache.get(('task', b'3')) is True
@@ -11,6 +11,7 @@ from golem.client import ClientTaskComputerEventListener
 from golem.clientconfigdescriptor import ClientConfigDescriptor
 from golem.core.common import timeout_to_deadline
 from golem.core.deferred import sync_wait
+from golem.docker.task_thread import DockerTaskThread
 from golem.network.p2p.node import Node as P2PNode
 from golem.task.taskcomputer import TaskComputer, PyTaskThread, logger
 from golem.testutils import DatabaseFixture
@@ -51,8 +52,6 @@ class TestTaskComputer(DatabaseFixture, LogTestCase):
         task_server.request_task = mock.MagicMock()
         task_server.config_desc.accept_tasks = False
         tc2 = TaskComputer(task_server, use_docker_manager=False)
-        tc2.counting_task = None
-        tc2.counting_thread = None
         tc2.waiting_for_task = None
         tc2.last_task_request = 0
 
@@ -62,10 +61,8 @@ class TestTaskComputer(DatabaseFixture, LogTestCase):
         tc2.runnable = True
         tc2.compute_tasks = True
         tc2.waiting_for_task = False
-        tc2.counting_task = None
 
         tc2.last_task_request = 0
-        tc2.counting_thread = None
 
         tc2.run()
 
@@ -80,6 +77,21 @@ class TestTaskComputer(DatabaseFixture, LogTestCase):
         tc2.run()
         tc2.session_timeout()
 
+    def test_flush_stats(self):
+        tc = TaskComputer(self.task_server, use_docker_manager=False)
+        tc.stats = mock.Mock()
+
+        tc.run()
+        tc.stats.flush.assert_not_called()
+
+        tc.last_stats_flush = 0
+        tc.run()
+        tc.stats.flush.assert_called_once_with()
+        assert tc.last_stats_flush > 0
+
+        tc.quit()
+        assert tc.stats.flush.call_count == 2
+
     def test_resource_failure(self):
         task_server = self.task_server
 
@@ -91,13 +103,14 @@ class TestTaskComputer(DatabaseFixture, LogTestCase):
         tc.task_resource_failure(task_id, 'reason')
         assert not task_server.send_task_failed.called
 
-        tc.assigned_subtask = ComputeTaskDef(
+        tc.assigned_subtasks[subtask_id] = ComputeTaskDef(
             task_id=task_id,
             subtask_id=subtask_id,
         )
 
         tc.task_resource_failure(task_id, 'reason')
         assert task_server.send_task_failed.called
+        assert not tc.assigned_subtasks
 
     def test_computation(self):
         p2p_node = P2PNode()
@@ -129,10 +142,10 @@ class TestTaskComputer(DatabaseFixture, LogTestCase):
         tc = TaskComputer(task_server, use_docker_manager=False,
                           finished_cb=mock_finished)
 
-        self.assertEqual(tc.assigned_subtask, None)
+        self.assertEqual(tc.assigned_subtasks, {})
         tc.task_given(ctd)
-        self.assertEqual(tc.assigned_subtask, ctd)
-        self.assertLessEqual(tc.assigned_subtask['deadline'],
+        self.assertEqual(tc.assigned_subtasks, {"xxyyzz": ctd})
+        self.assertLessEqual(tc.assigned_subtasks["xxyyzz"]['deadline'],
                              timeout_to_deadline(10))
         tc.task_server.request_resource.assert_called_with(
             "xyz", "xxyyzz")
@@ -141,7 +154,7 @@ class TestTaskComputer(DatabaseFixture, LogTestCase):
         tc.task_server.unpack_delta.assert_called_with(
             tc.dir_manager.get_task_resource_dir("xyz"), None, "xyz")
         assert tc.counting_thread is None
-        assert tc.assigned_subtask is None
+        assert not tc.assigned_subtasks
         task_server.send_task_failed.assert_called_with(
             "xxyyzz", "xyz", "Host direct task not supported")
 
@@ -159,7 +172,7 @@ class TestTaskComputer(DatabaseFixture, LogTestCase):
         prev_task_failed_count = task_server.send_task_failed.call_count
         self.assertIsNone(tc.counting_task)
         self.assertIsNone(tc.counting_thread)
-        self.assertIsNone(tc.assigned_subtask)
+        self.assertEqual(tc.assigned_subtasks, {})
         assert task_server.send_task_failed.call_count == prev_task_failed_count
         self.assertTrue(task_server.send_results.called)
         args = task_server.send_results.call_args[0]
@@ -173,8 +186,8 @@ class TestTaskComputer(DatabaseFixture, LogTestCase):
         ctd['src_code'] = "raise Exception('some exception')"
         ctd['deadline'] = timeout_to_deadline(5)
         tc.task_given(ctd)
-        self.assertEqual(tc.assigned_subtask, ctd)
-        self.assertLessEqual(tc.assigned_subtask['deadline'],
+        self.assertEqual(tc.assigned_subtasks, {"aabbcc": ctd})
+        self.assertLessEqual(tc.assigned_subtasks["aabbcc"]['deadline'],
                              timeout_to_deadline(5))
         tc.task_server.request_resource.assert_called_with(
             "xyz", "aabbcc")
@@ -183,7 +196,7 @@ class TestTaskComputer(DatabaseFixture, LogTestCase):
 
         self.assertIsNone(tc.counting_task)
         self.assertIsNone(tc.counting_thread)
-        self.assertIsNone(tc.assigned_subtask)
+        self.assertEqual(tc.assigned_subtasks, {})
         task_server.send_task_failed.assert_called_with(
             "aabbcc", "xyz", 'some exception')
         mock_finished.assert_called_once_with()
@@ -244,14 +257,105 @@ class TestTaskComputer(DatabaseFixture, LogTestCase):
         tc.use_docker_manager = True
         tc.docker_manager.update_config = lambda x, y, z: x()
 
-        tc.counting_task = True
+        tc.counting_threads['xxyyzz'] = mock.Mock()
         tc.change_config(mock.Mock(), in_background=False)
 
         tc.docker_manager.update_config = lambda x, y, z: y(False)
 
-        tc.counting_task = None
+        tc.counting_threads.clear()
         tc.change_config(mock.Mock(), in_background=False)
 
+    def test_max_assigned_tasks(self):
+        config_desc = ClientConfigDescriptor()
+        config_desc.num_cores = 8
+        config_desc.max_memory_size = 4 * 1024 * 1024
+        config_desc.max_concurrent_subtasks = 1
+        get_max = TaskComputer._get_max_assigned_tasks
+
+        assert get_max(config_desc) == 1
+
+        config_desc.max_concurrent_subtasks = 16
+        # limited by memory
+        assert get_max(config_desc) == 4
+
+        config_desc.max_memory_size = 32 * 1024 * 1024
+        # limited by cpu cores
+        assert get_max(config_desc) == 8
+
+        config_desc.num_cores = 0
+        assert get_max(config_desc) == 1
+
+        assert get_max(mock.Mock()) == 1
+
+    def test_container_pool(self):
+        tc = TaskComputer(self.task_server, use_docker_manager=False)
+        assert DockerTaskThread.container_pool is None
+
+        config_desc = ClientConfigDescriptor()
+        config_desc.container_pool_size = 2
+        tc._update_container_pool(config_desc)
+        # only used with Docker
+        assert DockerTaskThread.container_pool is None
+
+        tc.use_docker_manager = True
+        tc._update_container_pool(config_desc)
+        pool = DockerTaskThread.container_pool
+        assert pool.size == 2
+        assert pool.root_dir.startswith(self.path)
+
+        config_desc.container_pool_size = 3
+        tc._update_container_pool(config_desc)
+        assert DockerTaskThread.container_pool is pool
+        assert pool.size == 3
+
+        with mock.patch.object(pool, 'close') as close:
+            config_desc.container_pool_size = 0
+            tc._update_container_pool(config_desc)
+        assert DockerTaskThread.container_pool is None
+        close.assert_called_once_with()
+
+    def test_concurrent_slots(self):
+        task_server = self.task_server
+        task_server.config_desc.num_cores = 4
+        task_server.config_desc.max_memory_size = 4 * 1024 * 1024
+        task_server.config_desc.max_concurrent_subtasks = 2
+        task_server.config_desc.accept_tasks = True
+        task_server.config_desc.task_request_interval = 0
+        task_server.request_task.return_value = 'xyz'
+
+        tc = TaskComputer(task_server, use_docker_manager=False)
+        assert tc.max_assigned_tasks == 2
+
+        def ctd(subtask_id):
+            return ComputeTaskDef(task_id='xyz', subtask_id=subtask_id)
+
+        tc.run()
+        assert tc.waiting_for_task == 'xyz'
+
+        assert tc.task_given(ctd('first'))
+        task_server.request_resource.assert_called_once_with('xyz', 'first')
+        # the first request has been fulfilled, a slot is still free
+        assert tc.waiting_for_task is None
+        tc.last_task_request = 0
+        tc.run()
+        assert task_server.request_task.call_count == 2
+
+        # resources of the same task are already being downloaded
+        assert tc.task_given(ctd('second'))
+        task_server.request_resource.assert_called_once_with('xyz', 'first')
+        assert set(tc.assigned_subtasks) == {'first', 'second'}
+        assert tc.get_assigned_task_ids() == {'xyz'}
+
+        # all slots are taken
+        assert not tc.task_given(ctd('third'))
+        tc.last_task_request = 0
+        tc.run()
+        assert task_server.request_task.call_count == 2
+
+        tc.task_resource_failure('xyz', 'reason')
+        assert task_server.send_task_failed.call_count == 2
+        assert not tc.assigned_subtasks
+
     def test_event_listeners(self):
         client = mock.Mock()
         task_server = self.task_server
@@ -285,10 +389,15 @@ class TestTaskComputer(DatabaseFixture, LogTestCase):
         task_computer.lock = Lock()
         task_computer.dir_lock = Lock()
 
-        task_computer.assigned_subtask = ComputeTaskDef(
+        subtask = ComputeTaskDef(
             task_id=task_id,
             subtask_id=subtask_id,
         )
+        task_computer.assigned_subtasks = {subtask_id: subtask}
+        task_computer.counting_threads = {}
+        task_computer.slots = {}
+        task_computer.max_assigned_tasks = 1
+        task_computer._free_slot_index.return_value = 0
         task_computer.task_server.task_keeper.task_headers = {
             task_id: None
         }
@@ -304,14 +413,18 @@ class TestTaskComputer(DatabaseFixture, LogTestCase):
         compute_task(*args, **kwargs)
         assert task_computer.session_closed.called
         assert not start.called
+        assert not task_computer.assigned_subtasks
 
         header = mock.Mock(deadline=time.time() + 3600)
         task_computer.task_server.task_keeper.task_headers[task_id] = header
         task_computer.session_closed.reset_mock()
+        task_computer.assigned_subtasks = {subtask_id: subtask}
 
         compute_task(*args, **kwargs)
         assert not task_computer.session_closed.called
         assert start.called
+        assert subtask_id in task_computer.counting_threads
+        assert task_computer.slots == {subtask_id: 0}
 
     @staticmethod
     def __wait_for_tasks(tc):
@@ -335,7 +448,6 @@ class TestTaskThread(DatabaseFixture):
         ts.benchmark_manager.benchmarks_needed.return_value = False
 
         tc = TaskComputer(ts, use_docker_manager=False)
-        tc.counting_task = True
         tc.waiting_for_task = None
 
         tt = self._new_task_thread(tc)
@@ -415,7 +527,7 @@ class TestTaskMonitor(DatabaseFixture):
             task_server\
                 .task_keeper.task_headers[subtask_id].subtask_timeout = duration
 
-            task.assigned_subtask = subtask
+            task.assigned_subtasks = {subtask_id: subtask}
             task_thread.subtask_id = subtask_id
 
         def check(expected):
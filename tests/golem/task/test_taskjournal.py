@@ -0,0 +1,108 @@
+from unittest.mock import patch
+
+from twisted.internet.defer import succeed
+
+from golem.task.taskjournal import TaskJournal
+from golem.testutils import TempDirFixture
+
+
+def defer_to_thread(fn, *args, **kwargs):
+    return succeed(fn(*args, **kwargs))
+
+
+class TestTaskJournal(TempDirFixture):
+
+    def setUp(self):
+        super().setUp()
+        self.journal = TaskJournal(self.new_path, compact_threshold=3)
+        self.task_id = 'task_id'
+
+    def test_snapshot(self):
+        assert not self.journal.has_snapshot(self.task_id)
+        self.journal.write_snapshot(self.task_id, ('task', 'state'))
+        assert self.journal.has_snapshot(self.task_id)
+        assert not self.journal.read(self.task_id)
+
+    def test_append_and_read(self):
+        records = [{'subtask_id': str(i)} for i in range(3)]
+        for record in records:
+            self.journal.append(self.task_id, record)
+
+        assert self.journal.read(self.task_id) == records
+
+        # a new snapshot drops the journal
+        self.journal.write_snapshot(self.task_id, ('task', 'state'))
+        assert not self.journal.journal_path(self.task_id).exists()
+        assert not self.journal.read(self.task_id)
+
+    def test_read_incomplete_record(self):
+        self.journal.append(self.task_id, {'subtask_id': 'first'})
+        self.journal.append(self.task_id, {'subtask_id': 'second'})
+
+        path = self.journal.journal_path(self.task_id)
+        path.write_bytes(path.read_bytes()[:-2])
+
+        assert self.journal.read(self.task_id) == [{'subtask_id': 'first'}]
+
+    def test_needs_compaction(self):
+        for i in range(2):
+            self.journal.append(self.task_id, {'subtask_id': str(i)})
+        assert not self.journal.needs_compaction(self.task_id)
+        self.journal.append(self.task_id, {'subtask_id': 'last'})
+        assert self.journal.needs_compaction(self.task_id)
+
+    @patch('golem.task.taskjournal.deferToThread', defer_to_thread)
+    def test_compact(self):
+        for i in range(3):
+            self.journal.append(self.task_id, {'subtask_id': str(i)})
+
+        self.journal.compact(self.task_id, ('task', 'state'))
+
+        assert self.journal.has_snapshot(self.task_id)
+        assert not self.journal.compacting_path(self.task_id).exists()
+        assert not self.journal.read(self.task_id)
+        assert not self.journal.needs_compaction(self.task_id)
+
+    @patch('golem.task.taskjournal.deferToThread')
+    def test_compact_in_progress(self, defer_mock):
+        self.journal.append(self.task_id, {'subtask_id': 'old'})
+        self.journal.compact(self.task_id, ('task', 'state'))
+        # records appended during compaction go to a new journal
+        self.journal.append(self.task_id, {'subtask_id': 'new'})
+
+        assert self.journal.compacting_path(self.task_id).exists()
+        assert self.journal.read(self.task_id) == [
+            {'subtask_id': 'old'},
+            {'subtask_id': 'new'},
+        ]
+
+        # the background write completes
+        _, args, _ = defer_mock.mock_calls[0]
+        args[0](*args[1:])
+
+        assert self.journal.has_snapshot(self.task_id)
+        assert self.journal.read(self.task_id) == [{'subtask_id': 'new'}]
+
+    @patch('golem.task.taskjournal.deferToThread')
+    def test_outdated_compaction(self, defer_mock):
+        self.journal.append(self.task_id, {'subtask_id': 'old'})
+        self.journal.compact(self.task_id, ('old_task', 'old_state'))
+        self.journal.write_snapshot(self.task_id, ('task', 'state'))
+        snapshot = self.journal.snapshot_path(self.task_id).read_bytes()
+
+        _, args, _ = defer_mock.mock_calls[0]
+        args[0](*args[1:])
+
+        assert self.journal.snapshot_path(self.task_id).read_bytes() \
+            == snapshot
+        assert list(self.new_path.iterdir()) == \
+            [self.journal.snapshot_path(self.task_id)]
+
+    def test_remove(self):
+        self.journal.write_snapshot(self.task_id, ('task', 'state'))
+        self.journal.append(self.task_id, {'subtask_id': 'first'})
+        self.journal.remove(self.task_id)
+        assert not list(self.new_path.iterdir())
+
+        with self.assertRaises(FileNotFoundError):
+            self.journal.remove(self.task_id)
@@ -198,6 +198,136 @@ class TestTaskHeaderKeeper(LogTestCase):
         assert isinstance(th.task_owner, Node)
         self.assertEqual(task_header2.to_dict(), th.to_dict())
 
+    def test_get_task_by_score(self):
+        trust = {}
+        tk = TaskHeaderKeeper(
+            environments_manager=EnvironmentsManager(),
+            node=p2p.Node(),
+            min_price=10,
+            requestor_trust=trust.get)
+        e = Environment()
+        e.accept_tasks = True
+        tk.environments_manager.add_environment(e)
+
+        cheap = get_task_header("cheap")
+        expensive = get_task_header("expensive")
+        expensive.fixed_header.max_price = 20
+        assert tk.add_task_header(cheap)
+        assert tk.add_task_header(expensive)
+        assert tk.get_task() is expensive
+
+        # results rejected by the requestor lower the score of its tasks
+        for _ in range(3):
+            tk.add_requestor_result(expensive.task_owner.key, accepted=False)
+        assert tk.get_task() is cheap
+        tk.add_requestor_result(cheap.task_owner.key, accepted=True)
+        assert tk.get_task() is cheap
+
+        # trust is taken into account when the header is updated
+        trust[cheap.task_owner.key] = -1.
+        updated = copy.deepcopy(cheap)
+        updated.timestamp += 1
+        updated.signature = b'new'
+        assert tk.add_task_header(updated)
+        assert tk.get_task() is expensive
+
+        tk.skip_task(expensive.task_id)
+        assert tk.get_task() is updated
+        tk.remove_task_header(cheap.task_id)
+        assert tk.get_task() is None
+        assert expensive.task_id in tk.supported_tasks
+
+    def test_get_task_deadline(self):
+        tk = TaskHeaderKeeper(
+            environments_manager=EnvironmentsManager(),
+            node=p2p.Node(),
+            min_price=10)
+        e = Environment()
+        e.accept_tasks = True
+        tk.environments_manager.add_environment(e)
+
+        task_header = get_task_header("late")
+        task_header2 = get_task_header("early")
+        task_header2.fixed_header.max_price = 20
+        # too little time left to compute a subtask
+        task_header2.fixed_header.deadline = timeout_to_deadline(60)
+        assert tk.add_task_header(task_header)
+        assert tk.add_task_header(task_header2)
+
+        assert tk.get_task() is task_header
+        assert task_header2.task_id not in tk.task_index
+
+    def test_score_task_not_benchmarked(self):
+        performances = {'slow': 100., 'fast': 300., 'new': None}
+        em = mock.Mock()
+        em.get_environments.return_value = dict.fromkeys(performances)
+        tk = TaskHeaderKeeper(
+            environments_manager=em,
+            node=p2p.Node(),
+            min_price=10,
+            env_performance=performances.get)
+
+        def score(env_id):
+            return tk.score_task(mock.Mock(
+                environment=env_id, owner_key='owner', max_price=10))
+
+        assert score('slow') < score('new') < score('fast')
+        # the median of benchmarked environments
+        assert score('new') == score('slow') * 2
+
+        # nothing has been benchmarked yet
+        performances.update(slow=None, fast=None)
+        assert score('new') == score('slow') == score('fast') > 0
+
+    def test_get_task_exclude(self):
+        tk = TaskHeaderKeeper(
+            environments_manager=EnvironmentsManager(),
+            node=p2p.Node(),
+            min_price=10)
+        e = Environment()
+        e.accept_tasks = True
+        tk.environments_manager.add_environment(e)
+
+        cheap = get_task_header("cheap")
+        expensive = get_task_header("expensive")
+        expensive.fixed_header.max_price = 20
+        assert tk.add_task_header(cheap)
+        assert tk.add_task_header(expensive)
+
+        assert tk.get_task(exclude={expensive.task_id}) is cheap
+        assert tk.get_task(exclude={cheap.task_id, expensive.task_id}) \
+            is None
+        # excluded tasks stay in the index
+        assert tk.get_task() is expensive
+
+    @freeze_time(as_arg=True)
+    def test_skip_task_timeout(frozen_time, _):  # noqa pylint: disable=no-self-argument
+        tk = TaskHeaderKeeper(
+            environments_manager=EnvironmentsManager(),
+            node=p2p.Node(),
+            min_price=10)
+        e = Environment()
+        e.accept_tasks = True
+        tk.environments_manager.add_environment(e)
+        task_header = get_task_header()
+        assert tk.add_task_header(task_header)
+
+        # e.g. the requestor is still waiting for this node's results
+        tk.skip_task(task_header.task_id, timeout=tk.waiting_task_timeout)
+        assert tk.get_task() is None
+
+        # an updated header does not end the timeout
+        updated = copy.deepcopy(task_header)
+        updated.timestamp += 1
+        updated.signature = b'new'
+        assert tk.add_task_header(updated)
+        assert tk.get_task() is None
+
+        frozen_time.tick(  # pylint: disable=no-member
+            timedelta(seconds=tk.waiting_task_timeout + 1))
+        assert tk.get_task() is updated
+        assert not tk.skipped_tasks
+
     @freeze_time(as_arg=True)
     def test_old_tasks(frozen_time, _):  # pylint: disable=no-self-argument
         tk = TaskHeaderKeeper(
@@ -258,8 +388,8 @@ class TestTaskHeaderKeeper(LogTestCase):
         assert not tk.add_task_header(task_header)
         assert task_id in tk.supported_tasks
 
-        tk.task_headers = {}
-        tk.supported_tasks = []
+        tk.task_headers.clear()
+        tk.supported_tasks.clear()
 
         assert tk.add_task_header(task_header)
         assert task_id not in tk.supported_tasks
@@ -244,6 +244,37 @@ class TestTaskManager(LogTestCase, TestDirFixtureWithReactor,
                 assert restored_task.header.task_id == task_id
                 assert original_state.__dict__ == restored_state.__dict__
 
+    def test_journal_and_restore(self):
+        task_id = "xyz"
+        task = self._get_test_dummy_task(task_id)
+        self.tm.add_new_task(task)
+        self.tm.start_task(task_id)
+
+        with patch.object(self.tm, 'dump_task') as dump_mock:
+            ctd = self.tm.get_next_subtask(
+                "DEF", "DEF", task_id, 1000, 10, 5, 10, 2, "10.10.10.10")
+            assert not dump_mock.called
+
+        subtask_id = ctd['subtask_id']
+        journal = self.tm.task_journal
+        assert journal.journal_path(task_id).exists()
+        assert [r['subtask_id'] for r in journal.read(task_id)] == \
+            [subtask_id]
+
+        self.tm.task_result_incoming(subtask_id)
+
+        fresh_tm = TaskManager("ABC", Node(), keys_auth=Mock(),
+                               root_path=self.path, task_persistence=True)
+        restored_task = fresh_tm.tasks[task_id]
+        restored_state = fresh_tm.tasks_states[task_id]
+
+        assert fresh_tm.subtask2task_mapping[subtask_id] == task_id
+        assert restored_state.subtask_states[subtask_id].subtask_status == \
+            SubtaskStatus.downloading
+        assert restored_task.subtasks_given[subtask_id]['status'] == \
+            SubtaskStatus.downloading
+        assert restored_task.last_task == task.last_task
+
     def test_remove_wrong_task_during_restore(self):
         broken_pickle_file = self.tm.tasks_dir / "broken.pickle"
         with broken_pickle_file.open('w') as f:
@@ -806,6 +837,30 @@ class TestTaskManager(LogTestCase, TestDirFixtureWithReactor,
                      ("qwe", None, TaskOp.TIMEOUT)])
             del handler
 
+    @patch('golem.task.taskbase.Task.needs_computation', return_value=True)
+    def test_deadline_index(self, *_):
+        index = self.tm.deadline_index
+        t = self._get_task_mock(subtask_timeout=0.1)
+        self.tm.add_new_task(t)
+        assert not index
+        self.tm.start_task("xyz")
+        assert ("xyz", None) in index
+
+        self.tm.get_next_subtask("ABC", "ABC", "xyz", 1000, 10, 5, 10, 2,
+                                 "10.10.10.10")
+        assert ("xyz", "xxyyzz") in index
+        self.tm.restart_subtask("xxyyzz")
+        assert ("xyz", "xxyyzz") not in index
+
+        # restarted subtasks do not time out
+        time.sleep(0.1)
+        assert self.tm.check_timeouts() == []
+        assert self.tm.tasks_states["xyz"].subtask_states[
+            "xxyyzz"].subtask_status == SubtaskStatus.restarted
+
+        self.tm.delete_task("xyz")
+        assert not index
+
     def test_task_event_listener(self):
         self.tm.notice_task_updated = Mock()
         assert isinstance(self.tm, TaskEventListener)
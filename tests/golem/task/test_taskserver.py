@@ -2,6 +2,7 @@
 import os
 import random
 import tempfile
+import time
 import uuid
 from collections import deque
 from math import ceil
@@ -220,6 +221,134 @@ class TestTaskServer(TaskServerTestBase):  # noqa pylint: disable=too-many-publi
             ),
         )
 
+    @patch(
+        "golem.task.taskserver.TaskServer.should_accept_requestor",
+        return_value=SupportStatus(True),
+    )
+    def test_request_task_rejected_retried(self, *_):
+        self.ts.client.concent_service.enabled = True
+        keys_auth = KeysAuth(self.path, 'prv_key', '')
+        task_dict = get_example_task_header(keys_auth.public_key)
+        task_dict['fixed_header']['concent_enabled'] = False
+        task_id = task_dict['fixed_header']['task_id']
+        self.ts.add_task_header(task_dict)
+        self.ts._add_pending_request = Mock()
+
+        self.assertIsNone(self.ts.request_task())
+        self.ts.client.concent_service.enabled = False
+        # skipped for a while, the header is not re-signed
+        self.assertIsNone(self.ts.request_task())
+
+        timeout = self.ts.task_keeper.rejected_task_timeout
+        with patch('golem.task.taskkeeper.time') as time_mock:
+            time_mock.time.return_value = time.time() + timeout + 1
+            self.assertEqual(self.ts.request_task(), task_id)
+        self.ts._add_pending_request.assert_called_once_with(
+            TASK_CONN_TYPES['task_request'], ANY,
+            prv_port=ANY, pub_port=ANY, args=ANY)
+
+    @patch(
+        "golem.task.taskserver.TaskServer.should_accept_requestor",
+        return_value=SupportStatus(True),
+    )
+    def test_request_task_busy(self, *_):
+        keys_auth = KeysAuth(self.path, 'prv_key', '')
+        task_dict = get_example_task_header(keys_auth.public_key)
+        task_id = task_dict['fixed_header']['task_id']
+        self.ts.verify_header_sig = lambda x: True
+        self.ts.add_task_header(task_dict)
+        self.ts._add_pending_request = Mock()
+
+        # a subtask of the task is being computed
+        self.ts.task_computer.assigned_subtasks['xxyyzz'] = {
+            'task_id': task_id}
+        self.assertIsNone(self.ts.request_task())
+        del self.ts.task_computer.assigned_subtasks['xxyyzz']
+
+        # the result of a subtask has not been sent yet
+        self.ts.results_to_send['xxyyzz'] = Mock(task_id=task_id)
+        self.assertIsNone(self.ts.request_task())
+        self.ts._add_pending_request.assert_not_called()
+        del self.ts.results_to_send['xxyyzz']
+
+        self.assertEqual(self.ts.request_task(), task_id)
+
+    @patch(
+        "golem.task.taskserver.TaskServer.should_accept_requestor",
+        return_value=SupportStatus(True),
+    )
+    def test_request_task_pooled_session(self, *_):
+        keys_auth = KeysAuth(self.path, 'prv_key', '')
+        task_dict = get_example_task_header(keys_auth.public_key)
+        task_id = task_dict['fixed_header']['task_id']
+        self.ts.verify_header_sig = lambda x: True
+        self.ts.add_task_header(task_dict)
+        self.ts._add_pending_request = Mock()
+
+        session = MagicMock(key_id=keys_auth.key_id,
+                            last_message_time=time.time())
+        self.ts.session_pool.add(session)
+
+        self.assertEqual(self.ts.request_task(), task_id)
+        self.ts._add_pending_request.assert_not_called()
+        session.send_hello.assert_not_called()
+        session.request_task.assert_called_once_with(
+            self.ts.config_desc.node_name, task_id, ANY, ANY, ANY, ANY, ANY)
+        assert self.ts.task_sessions[task_id] is session
+        assert self.ts.session_pool.reused == 1
+
+    @patch(
+        "golem.task.taskserver.TaskServer.should_accept_requestor",
+        return_value=SupportStatus(True),
+    )
+    def test_pooled_session_not_shared(self, *_):
+        keys_auth = KeysAuth(self.path, 'prv_key', '')
+        task_dict = get_example_task_header(keys_auth.public_key)
+        task_id = task_dict['fixed_header']['task_id']
+        self.ts.verify_header_sig = lambda x: True
+        self.ts.add_task_header(task_dict)
+        self.ts._add_pending_request = Mock()
+
+        # The task request opens a new session
+        self.assertEqual(self.ts.request_task(), task_id)
+        self.ts._add_pending_request.assert_called_once_with(
+            TASK_CONN_TYPES['task_request'], ANY,
+            prv_port=ANY, pub_port=ANY, args=ANY)
+        session = MagicMock(key_id=None, address='10.10.10.10',
+                            port=40102, last_message_time=time.time())
+        self.ts.new_session_prepare(session, task_id, keys_auth.key_id,
+                                    'conn_id')
+
+        # A result for the same requestor needs a session of its own
+        # while the request is in flight
+        subtask_id = 'xxyyzz'
+        wtr = Mock(already_sending=False, last_sending_trial=0,
+                   delay_time=0, subtask_id=subtask_id)
+        wtr.owner.key = keys_auth.key_id
+        self.ts.results_to_send[subtask_id] = wtr
+        self.ts._TaskServer__send_waiting_results()
+
+        session.send_report_computed_task.assert_not_called()
+        self.ts._add_pending_request.assert_called_with(
+            TASK_CONN_TYPES['task_result'], wtr.owner,
+            prv_port=ANY, pub_port=ANY,
+            args={'waiting_task_result': wtr})
+        assert session.task_id == task_id
+        assert self.ts.session_pool.reused == 0
+
+        # Once the request has been handled, the session is reused
+        self.ts.release_task_session(session)
+        wtr.already_sending = False
+        wtr.last_sending_trial = 0
+        self.ts._TaskServer__send_waiting_results()
+
+        session.send_report_computed_task.assert_called_once_with(
+            wtr, ANY, ANY, ANY)
+        assert self.ts._add_pending_request.call_count == 2
+        assert session.task_id == subtask_id
+        assert self.ts.task_sessions[subtask_id] is session
+        assert self.ts.session_pool.reused == 1
+
     @patch("golem.task.taskserver.Trust")
     def test_send_results(self, trust, *_):
         ccd = ClientConfigDescriptor()
@@ -336,8 +465,14 @@ class TestTaskServer(TaskServerTestBase):  # noqa pylint: disable=too-many-publi
         self.assertTrue(ts.add_task_header(task_header))
         self.assertEqual(len(ts.get_others_tasks_headers()), 2)
 
-        self.assertTrue(ts.add_task_header(task_header))
+        # The same header is neither deserialized nor verified again
+        with patch.object(ts, 'verify_header_sig') as verify, \
+                patch.object(TaskHeader, 'from_dict') as from_dict:
+            self.assertTrue(ts.add_task_header(task_header))
+        verify.assert_not_called()
+        from_dict.assert_not_called()
         self.assertEqual(len(ts.get_others_tasks_headers()), 2)
+        self.assertEqual(ts.get_header_signature_stats()['unchanged'], 1)
 
         new_header = dict(task_header)
         new_header["fixed_header"]["task_owner"]["pub_port"] = 9999
@@ -459,7 +594,17 @@ class TestTaskServer(TaskServerTestBase):  # noqa pylint: disable=too-many-publi
         self.assertEqual(ts.failures_to_send, {})
 
         ts._add_pending_request.reset_mock()
+        session = ts.task_sessions.pop(subtask_id)
+
+        # The session with the node is still open
+        ts.failures_to_send[subtask_id] = wtf
+        ts.sync_network()
+        ts._add_pending_request.assert_not_called()
+        session.send_task_failure.assert_called_with(subtask_id, wtf.err_msg)
+        self.assertEqual(ts.failures_to_send, {})
+
         ts.task_sessions.pop(subtask_id)
+        session.conn.opened = False
 
         ts.failures_to_send[subtask_id] = wtf
         ts.sync_network()
@@ -1179,3 +1324,17 @@ class TaskVerificationResultTest(TaskServerTestBase):
             pc.final_failure.func.__name__,
             '__connection_for_task_verification_result_failure',
         )
+
+    def test_verify_results_pooled_session(self, *_):
+        rct = msg_factories.tasks.ReportComputedTaskFactory(
+            node_info=self.ts.node.to_dict())
+        session = MagicMock(key_id=rct.key_id, last_message_time=time.time())
+        self.ts.session_pool.add(session)
+        extracted_package = ExtractedPackageFactory()
+
+        self.ts.verify_results(rct, extracted_package)
+        assert not self.ts.pending_connections
+        session.send_hello.assert_not_called()
+        session.result_received.assert_called_once_with(
+            rct.subtask_id, extracted_package.get_full_path_files())
+        assert self.ts.task_sessions[rct.subtask_id] is session
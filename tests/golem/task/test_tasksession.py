@@ -804,6 +804,7 @@ class TestTaskSession(ConcentMessageMixin, LogTestCase,
         self.assertFalse(cancel.called)
         session._react_to_reject_report_computed_task(msg_rej)
         self.assertFalse(cancel.called)
+        session.task_server.release_task_session.assert_not_called()
 
         # Save subtask information
         task_owner = Node(key='owner_id')
@@ -823,11 +824,15 @@ class TestTaskSession(ConcentMessageMixin, LogTestCase,
         self.assertTrue(cancel.called)
         self.assert_concent_cancel(
             cancel.call_args[0], subtask_id, 'ForceReportComputedTask')
+        # The session may be reused for the next exchange
+        session.task_server.release_task_session.assert_called_once_with(
+            session)
 
         cancel.reset_mock()
         session._react_to_reject_report_computed_task(msg_ack)
         self.assert_concent_cancel(
             cancel.call_args[0], subtask_id, 'ForceReportComputedTask')
+        assert session.task_server.release_task_session.call_count == 2
 
     def test_react_to_resource_list(self):
         task_server = self.task_session.task_server
@@ -845,6 +850,8 @@ class TestTaskSession(ConcentMessageMixin, LogTestCase,
         assert task_server.get_download_options.called
         assert task_server.pull_resources.called
         assert isinstance(call_options['client_options'], Mock)
+        task_server.release_task_session.assert_called_once_with(
+            self.task_session)
 
         # Use download options built by TaskServer
         client_options = ClientOptions(client, version,
@@ -894,6 +901,21 @@ class TestTaskSession(ConcentMessageMixin, LogTestCase,
         self.task_session._react_to_cannot_assign_task(msg_cat)
         assert task_keeper.active_tasks["abc"].requests == expected_requests
 
+    def test_react_to_waiting_for_results(self):
+        ts = self.task_session
+        ts.task_id = "abc"
+        task_keeper = ts.task_server.task_keeper
+        task_keeper.waiting_task_timeout = 300
+        ts.disconnect = Mock()
+
+        ts._react_to_waiting_for_results(message.tasks.WaitingForResults())
+
+        # the task is not requested again until the timeout passes
+        task_keeper.skip_task.assert_called_once_with("abc", timeout=300)
+        ts.task_computer.session_closed.assert_called_once_with()
+        ts.disconnect.assert_called_once_with(
+            message.base.Disconnect.REASON.NoMoreMessages)
+
     def test_react_to_want_to_compute_no_handshake(self):
         mock_msg = Mock()
         mock_msg.concent_enabled = False
@@ -19,7 +19,7 @@ from twisted.internet.defer import Deferred
 from golem import model
 from golem import testutils
 from golem.client import Client, ClientTaskComputerEventListener, \
-    DoWorkService, MonitoringPublisherService, \
+    DoWorkService, LocalRankFlushService, MonitoringPublisherService, \
     NetworkConnectionPublisherService, \
     ResourceCleanerService, TaskArchiverService, \
     TaskCleanerService
@@ -35,7 +35,7 @@ from golem.resource.dirmanager import DirManager
 from golem.rpc.mapping.rpceventnames import UI, Environment
 from golem.task.acl import Acl
 from golem.task.taskserver import TaskServer
-from golem.task.taskstate import TaskTestStatus
+from golem.task.taskstate import TaskStatus, TaskTestStatus
 from golem.tools import testwithreactor
 from golem.tools.assertlogs import LogTestCase
 
@@ -503,7 +503,7 @@ class TestMonitoringPublisherService(testwithreactor.TestWithReactor):
     def setUp(self):
         task_server = Mock()
         task_server.task_keeper = Mock()
-        task_server.task_keeper.get_all_tasks.return_value = list()
+        task_server.task_keeper.task_headers = dict()
         task_server.task_keeper.supported_tasks = list()
         task_server.task_computer.stats = dict()
         self.service = MonitoringPublisherService(
@@ -551,6 +551,23 @@ class TestTaskArchiverService(testwithreactor.TestWithReactor):
         self.task_archiver.do_maintenance.assert_called()
 
 
+class TestLocalRankFlushService(testwithreactor.TestWithReactor):
+
+    def setUp(self):
+        self.service = LocalRankFlushService()
+
+    @patch('golem.ranking.manager.database_manager.flush_local_ranks')
+    def test_run(self, flush):
+        self.service._run()
+        flush.assert_called_once_with()
+
+    @patch('golem.ranking.manager.database_manager.flush_local_ranks')
+    def test_stop(self, flush):
+        self.service.start(now=False)
+        self.service.stop()
+        flush.assert_called_once_with()
+
+
 class TestResourceCleanerService(testwithreactor.TestWithReactor):
 
     def setUp(self):
@@ -831,6 +848,57 @@ class TestClientRPCMethods(TestClientBase, LogTestCase):
         assert c.task_server.task_manager.delete_task.called
         c.remove_task.assert_called_with(task_id)
 
+    def test_get_tasks(self, *_):
+        c = self.client
+        c.task_server = Mock()
+        c.transaction_system = Mock()
+        task_manager = c.task_server.task_manager
+
+        statuses = {
+            'task1': TaskStatus.computing,
+            'task2': TaskStatus.finished,
+            'task3': TaskStatus.computing,
+        }
+        task_manager.tasks = dict.fromkeys(statuses)
+        task_manager.tasks_states = {
+            task_id: Mock(status=status,
+                          subtask_states={task_id + '-subtask': Mock()})
+            for task_id, status in statuses.items()
+        }
+        task_manager.get_task_dict.side_effect = lambda task_id: {
+            'id': task_id,
+            'estimated_cost': 10 ** 20,
+            'estimated_fee': None,
+        }
+        get_totals = c.transaction_system.get_tasks_payments_totals
+        get_totals.return_value = {'task2': (10 ** 20, 3)}
+
+        tasks = c.get_tasks()
+        get_totals.assert_called_once_with({
+            'task1-subtask': 'task1',
+            'task2-subtask': 'task2',
+            'task3-subtask': 'task3',
+        })
+        assert [t['id'] for t in tasks] == ['task1', 'task2', 'task3']
+        assert tasks[0]['cost'] is None
+        assert tasks[0]['fee'] is None
+        assert tasks[0]['estimated_cost'] == str(10 ** 20)
+        assert tasks[1]['cost'] == str(10 ** 20)
+        assert tasks[1]['fee'] == '3'
+
+        tasks = c.get_tasks(status=TaskStatus.computing.value)
+        assert [t['id'] for t in tasks] == ['task1', 'task3']
+        tasks = c.get_tasks(status=[TaskStatus.finished.value], offset=1)
+        assert tasks == []
+        tasks = c.get_tasks(offset=1, limit=1)
+        assert [t['id'] for t in tasks] == ['task2']
+
+        assert c.get_task('task2')['cost'] == str(10 ** 20)
+        task_manager.get_task_dict.side_effect = None
+        task_manager.get_task_dict.return_value = None
+        assert c.get_task('task2') is None
+        assert c.get_tasks() == []
+
     def test_get_unsupport_reasons(self, *_):
         c = self.client
         c.task_server.task_keeper.get_unsupport_reasons = Mock()
@@ -1040,8 +1108,9 @@ class TestClientRPCMethods(TestClientBase, LogTestCase):
             'end_task': 1,
             'total_tasks': 1,
         }
-        task_computer.get_progress.return_value = \
+        task_computer.get_progress.return_value = [
             ComputingSubtaskStateSnapshot(**state_snapshot_dict)
+        ]
         self.client.task_server.task_computer = task_computer
 
         # environment
@@ -1056,6 +1125,7 @@ class TestClientRPCMethods(TestClientBase, LogTestCase):
             'environment': environment,
             'status': 'Computing',
             'subtask': state_snapshot_dict,
+            'subtasks': [state_snapshot_dict],
         }
         assert status == expected_status
 
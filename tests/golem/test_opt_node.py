@@ -795,7 +795,7 @@ class TestOptNode(TempDirFixture):
         self.node.client.task_server.task_computer = mock_tc
 
         mock_tm.get_progresses = Mock(return_value={})
-        mock_tc.assigned_subtask = None
+        mock_tc.assigned_subtasks = {}
 
         result = self.node._is_task_in_progress()
 